@@ -0,0 +1,78 @@
+# benchmarks/render_path.py
+
+"""
+Microbenchmark of the frame -> display conversion, in milliseconds per frame.
+
+    python benchmarks/render_path.py [--frames 200]
+
+"old" is the previous path (INTER_AREA resize, BGR->RGB copy, RGB888 QImage, QPixmap);
+"new" is FrameRenderer (cached geometry, 2x INTER_AREA steps into reused buffers, one
+INTER_LINEAR step, BGRA output wrapped as RGB32) followed by the same QPixmap conversion.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import cv2
+import numpy as np
+from PyQt5.QtGui import QImage, QPixmap
+from PyQt5.QtWidgets import QApplication
+from player.frame_decoder import FrameRenderer, fit_size
+
+CASES = [
+    # (frame w, frame h, label w, label h)
+    (1920, 1080, 640, 360),
+    (1920, 1080, 633, 356),
+    (1280, 720, 480, 270),
+    (2560, 1440, 398, 224),
+    (640, 480, 800, 600),
+]
+
+
+def old_path(frame, label_w, label_h):
+    h, w, _ = frame.shape
+    new_w, new_h = fit_size(w, h, label_w, label_h)
+    resized = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_AREA)
+    rgb = cv2.cvtColor(resized, cv2.COLOR_BGR2RGB)
+    image = QImage(rgb.data, new_w, new_h, 3 * new_w, QImage.Format_RGB888)
+    return QPixmap.fromImage(image), rgb
+
+
+def new_path(renderer, frame, label_w, label_h):
+    image, buffer = renderer.render(frame, label_w, label_h)
+    return QPixmap.fromImage(image), buffer
+
+
+def ms_per_frame(fn, frames):
+    fn(frames[0])
+    t0 = time.perf_counter()
+    for f in frames:
+        fn(f)
+    return (time.perf_counter() - t0) / len(frames) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--frames", type=int, default=200)
+    args = parser.parse_args(argv)
+    # QPixmap needs a QApplication; the local reference keeps it alive until main returns.
+    app = QApplication.instance() or QApplication([])
+    rng = np.random.default_rng(0)
+    print(f"{'frame':>10} {'label':>9} {'old ms':>8} {'new ms':>8} {'speedup':>8}")
+    for fw, fh, lw, lh in CASES:
+        base = rng.integers(0, 255, (fh // 8, fw // 8, 3), dtype=np.uint8)
+        frames = [cv2.resize(np.roll(base, k, axis=1), (fw, fh)) for k in range(8)]
+        frames = [frames[i % len(frames)] for i in range(args.frames)]
+        renderer = FrameRenderer()
+        old = ms_per_frame(lambda f: old_path(f, lw, lh), frames)
+        new = ms_per_frame(lambda f: new_path(renderer, f, lw, lh), frames)
+        print(f"{fw}x{fh:<5} {lw}x{lh:<5} {old:8.2f} {new:8.2f} {old / new:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,484 @@
+# benchmarks/run_benchmarks.py
+
+"""
+Headless benchmark suite on synthetic timestamped multi-camera footage.
+
+    python benchmarks/run_benchmarks.py [--cameras 4] [--size 1280x720] [--seconds 60]
+        [--gop 12] [--drift 0.002] [--drop FRAME:SECS ...] [--output results.json]
+    python benchmarks/run_benchmarks.py --compare BASE.json NEW.json
+
+Generates the cameras with benchmarks/synthetic.py (camera k starts k seconds later and has
+its own background), then measures:
+
+  playback     sequential FrameDecoder playback of all cameras in lockstep, per decode
+               backend: frames/s and ms per frame (decode, scale, QImage)
+  seek         SequentialReader reads of random frames with the scanned keyframe index:
+               latency percentiles
+  ocr          crops/s and accuracy against the ground truth for every OCR backend; the
+               template backend is first trained on a few ground-truth crops, backends
+               that cannot run (no tesseract) report their error
+  jump         jump-to-time error of the OCR timestamp index (built in-process with the
+               template backend, including adaptive refinement) and of the old linear
+               first-frame mapping, against the true clock; the suite fails if the index
+               does worse than the linear mapping, and warns if its error is well above
+               the error it predicts
+  screenshots  ScreenshotWriter throughput per image format
+
+Results are written as JSON; --compare prints every metric of two result files side by side.
+The exit status is 1 when a check failed.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import cv2
+import numpy as np
+from PyQt5.QtWidgets import QApplication
+from benchmarks.synthetic import generate, load_truth, parse_drop, parse_size, truth_path
+from player.frame_decoder import DECODE_BACKENDS, create_decoder
+from player.screenshot_writer import ScreenshotWriter
+from utils.image_formats import IMAGE_FORMATS
+from utils.keyframe_index import scan_keyframes
+from utils.ocr_backends import BACKENDS, TemplateBackend, measure_throughput
+from utils.ocr_index import OCR_ROI, REFINE_ROUNDS, TimestampIndex, sample_frames, sample_step
+from utils.ocr_utils import confirmed_time_text, create_ocr_backend, extract_times_from_rois, prepare_roi
+from utils.time_sync import TIME_FORMAT, first_frame_time_range, locate_time
+from utils.video_reader import SequentialReader
+
+LABEL_SIZE = (640, 360)
+# Decoder startup (a spawned worker process imports cv2 and numpy).
+START_TIMEOUT = 30.0
+# Ground-truth crops the template backend learns from before it is measured.
+TEMPLATE_TRAINING = 20
+OCR_CROPS = 200
+OCR_BATCH = 32
+JUMP_TARGETS = 200
+# Both mappings land on whole frames, so the index fails the jump check only when its mean
+# error exceeds the linear mapping's by more than this many frame periods.
+JUMP_TOLERANCE_FRAMES = 0.5
+# Warn when the index's mean error is more than this multiple of its predicted error.
+JUMP_CALIBRATION = 2.0
+PERCENTILES = (50, 95, 99)
+
+
+def percentiles(values_ms):
+    values = np.asarray(values_ms, dtype=np.float64)
+    if not len(values):
+        return {}
+    result = {f"p{p}_ms": round(float(np.percentile(values, p)), 3) for p in PERCENTILES}
+    result["mean_ms"] = round(float(values.mean()), 3)
+    result["max_ms"] = round(float(values.max()), 3)
+    return result
+
+
+def error_stats(errors):
+    errors = np.abs(np.asarray(errors, dtype=np.float64))
+    return {
+        "mean_s": round(float(errors.mean()), 4),
+        "p95_s": round(float(np.percentile(errors, 95)), 4),
+        "max_s": round(float(errors.max()), 4),
+    }
+
+
+def read_frames(video_path, frame_indices, keyframes=None):
+    """
+    Returns [(frame_idx, frame)] for the readable frames among frame_indices (sorted).
+    """
+    cap = cv2.VideoCapture(video_path)
+    reader = SequentialReader(cap, keyframes=keyframes)
+    try:
+        frames = [(i, reader.read(i)) for i in frame_indices]
+    finally:
+        cap.release()
+    return [(i, f) for i, f in frames if f is not None]
+
+
+# ---------- Footage ----------
+def prepare_cameras(data_dir, args):
+    """
+    Generates the cameras (or reuses them if data_dir already has them with the same
+    settings); returns [(video_path, truth, KeyframeIndex)].
+    """
+    frames = int(args.seconds * args.fps)
+    cameras = []
+    for k in range(args.cameras):
+        path = os.path.join(data_dir, f"cam{k}" + (".avi" if args.gop == 1 else ".mp4"))
+        start = datetime(2024, 12, 5, 9, 0, 0) + timedelta(seconds=k)
+        wanted = {"width": args.size[0], "height": args.size[1], "fps": args.fps, "frames": frames,
+                  "gop_requested": args.gop, "drift": args.drift,
+                  "drops": [list(d) for d in args.drop], "start": start.strftime(TIME_FORMAT)}
+        truth = load_truth(path) if os.path.exists(truth_path(path)) else None
+        if not truth or any(truth.get(key) != value for key, value in wanted.items()):
+            t0 = time.perf_counter()
+            truth = generate(path, *args.size, fps=args.fps, frames=frames, gop=args.gop,
+                             drift=args.drift, drops=args.drop, start=start, seed=k)
+            print(f"generated {path} in {time.perf_counter() - t0:.1f}s")
+        cameras.append((path, truth, scan_keyframes(path)))
+    return cameras
+
+
+# ---------- Playback ----------
+def bench_playback(cameras, backend, frames):
+    """
+    Plays all cameras in lockstep through their decoders, waiting for every frame.
+    """
+    decoders = []
+    t0 = time.perf_counter()
+    for path, truth, keyframes in cameras:
+        decoder = create_decoder(backend, path, truth["frames"], (truth["width"], truth["height"]))
+        decoder.set_keyframes(keyframes)
+        decoder.set_target_size(*LABEL_SIZE)
+        decoder.set_playing(True)
+        decoder.start()
+        decoders.append(decoder)
+    try:
+        started = all(d.wait_for(0, START_TIMEOUT) is not None for d in decoders)
+        startup = time.perf_counter() - t0
+        if not started:
+            return {"error": "decoder did not start"}
+        frames = min(frames, min(len(kf) for _, _, kf in cameras))
+        missing = 0
+        t0 = time.perf_counter()
+        cpu0 = time.process_time()
+        for i in range(1, frames):
+            for decoder in decoders:
+                if decoder.wait_for(i) is None:
+                    missing += 1
+        secs = time.perf_counter() - t0
+        cpu = time.process_time() - cpu0
+    finally:
+        for decoder in decoders:
+            decoder.stop()
+    shown = len(decoders) * (frames - 1)
+    return {
+        "cameras": len(decoders),
+        "frames": shown,
+        "missing": missing,
+        "startup_s": round(startup, 3),
+        "fps": round(shown / secs, 1),
+        "fps_per_camera": round((frames - 1) / secs, 1),
+        "ms_per_frame": round(secs / shown * 1000, 3),
+        "process_cpu_ms_per_frame": round(cpu / shown * 1000, 3),
+    }
+
+
+# ---------- Random seek ----------
+def bench_seek(camera, count, seed=0):
+    path, truth, keyframes = camera
+    total = len(keyframes) if keyframes else truth["frames"]
+    targets = random.Random(seed).sample(range(total), min(count, total))
+    cap = cv2.VideoCapture(path)
+    reader = SequentialReader(cap, keyframes=keyframes)
+    latencies = []
+    failed = 0
+    try:
+        reader.read(0)
+        for idx in targets:
+            t0 = time.perf_counter()
+            frame = reader.read(idx)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            failed += frame is None
+    finally:
+        cap.release()
+    result = {"reads": len(targets), "failed": failed, "max_gop": truth.get("max_gop")}
+    result.update(percentiles(latencies))
+    result["reader"] = reader.seek_stats()
+    return result
+
+
+# ---------- OCR ----------
+def truth_text(truth, frame_idx):
+    start = datetime.strptime(truth["start"], TIME_FORMAT)
+    secs = int(np.floor(truth["clock_secs"][frame_idx]))
+    return (start + timedelta(seconds=secs)).strftime(TIME_FORMAT)
+
+
+def train_template(crops, texts):
+    # Spread over the whole video, so that every digit has been seen.
+    step = max(1, len(crops) // TEMPLATE_TRAINING)
+    backend = TemplateBackend()
+    for crop, text in zip(crops[::step], texts[::step]):
+        backend.learn(crop, text)
+    return backend
+
+
+def accuracy(backend, crops, texts):
+    reads = []
+    for i in range(0, len(crops), OCR_BATCH):
+        reads.extend(backend.read_batch(crops[i:i + OCR_BATCH]))
+    correct = sum(confirmed_time_text(r) == t for r, t in zip(reads, texts))
+    return correct / len(texts)
+
+
+def bench_ocr(camera):
+    path, truth, keyframes = camera
+    total = len(keyframes) if keyframes else truth["frames"]
+    indices = sorted(set(np.linspace(0, total - 1, OCR_CROPS).astype(int).tolist()))
+    frames = read_frames(path, indices, keyframes)
+    crops = [prepare_roi(f, OCR_ROI) for _, f in frames]
+    texts = [truth_text(truth, i) for i, _ in frames]
+    results = {}
+    for name in BACKENDS:
+        if name == TemplateBackend.name:
+            backend = train_template(crops, texts)
+            entry = {"trained_on": len(crops[::max(1, len(crops) // TEMPLATE_TRAINING)]),
+                     "trained": backend.is_trained()}
+        else:
+            backend = create_ocr_backend(name)
+            entry = {}
+        try:
+            entry["accuracy"] = round(accuracy(backend, crops, texts), 4)
+            entry["crops_per_s"] = round(measure_throughput(backend, crops), 1)
+        except Exception as e:
+            entry = {"error": f"{type(e).__name__}: {e}".strip()}
+        entry["crops"] = len(crops)
+        results[name] = entry
+    return results, train_template(crops, texts)
+
+
+# ---------- Jump to time ----------
+def ocr_samples(video_path, frame_indices, keyframes, backend):
+    frames = read_frames(video_path, sorted(frame_indices), keyframes)
+    samples = []
+    for i in range(0, len(frames), OCR_BATCH):
+        chunk = frames[i:i + OCR_BATCH]
+        times = extract_times_from_rois([f for _, f in chunk], roi=OCR_ROI, backend=backend)
+        samples.extend((idx, t) for (idx, _), t in zip(chunk, times))
+    return samples
+
+
+def build_index(camera, backend):
+    """
+    In-process equivalent of utils.ocr_index.build_index with a given (trained) backend.
+    """
+    path, truth, keyframes = camera
+    total = len(keyframes) if keyframes else truth["frames"]
+    fps = truth["fps"]
+    frames = sample_frames(total, fps)
+    tried = set(frames)
+    samples = ocr_samples(path, frames, keyframes, backend)
+    for _ in range(REFINE_ROUNDS):
+        index = TimestampIndex.from_samples(samples, total, fps)
+        extra = index.model.refinement_frames(tried, sample_step(fps)) if len(index) else []
+        if not extra:
+            break
+        tried.update(extra)
+        samples.extend(ocr_samples(path, extra, keyframes, backend))
+    index = TimestampIndex.from_samples(samples, total, fps)
+    index.refined = len(tried) - len(frames)
+    return index, samples
+
+
+def bench_jump(camera, backend, targets=JUMP_TARGETS, seed=0):
+    """
+    Jumps to times inside recorded stretches (a random frame's clock plus up to one frame
+    period) and measures how far, on the true clock, the frame found is from the target.
+    """
+    path, truth, keyframes = camera
+    total = len(keyframes) if keyframes else truth["frames"]
+    clock = np.asarray(truth["clock_secs"][:total])
+    start = datetime.strptime(truth["start"], TIME_FORMAT)
+    t0 = time.perf_counter()
+    index, samples = build_index(camera, backend)
+    build_secs = time.perf_counter() - t0
+    if not len(index):
+        return {"error": "no OCR samples"}
+    first = dict(samples).get(0) or index.start_time
+    linear_start, linear_end = first_frame_time_range(first, total, truth["fps"])
+    rng = random.Random(seed)
+    model_err, linear_err, predicted = [], [], []
+    for _ in range(targets):
+        secs = clock[rng.randrange(total)] + rng.random() / truth["fps"]
+        target = start + timedelta(seconds=float(secs))
+        frame, err, _ = locate_time(target, None, None, total, index)
+        model_err.append(clock[frame] - secs)
+        predicted.append(err)
+        frame, _, _ = locate_time(target, linear_start, linear_end, total, None)
+        # The player clamps the result to the video, as here.
+        linear_err.append(clock[min(max(frame, 0), total - 1)] - secs)
+    result = {
+        "samples": len(samples),
+        "refined": index.refined,
+        "build_s": round(build_secs, 3),
+        "model": error_stats(model_err),
+        "linear": error_stats(linear_err),
+        "predicted_mean_s": round(float(np.mean(predicted)), 4),
+        "model_description": index.describe(),
+        "failures": [],
+        "warnings": [],
+    }
+    model_mean, linear_mean = result["model"]["mean_s"], result["linear"]["mean_s"]
+    if model_mean > linear_mean + JUMP_TOLERANCE_FRAMES / truth["fps"]:
+        result["failures"].append(f"jump: index error {model_mean:.3f}s is worse than the linear "
+                                  f"mapping's {linear_mean:.3f}s")
+    if model_mean > JUMP_CALIBRATION * result["predicted_mean_s"]:
+        result["warnings"].append(f"jump: index error {model_mean:.3f}s is more than "
+                                  f"{JUMP_CALIBRATION:g}x the predicted {result['predicted_mean_s']:.3f}s")
+    return result
+
+
+# ---------- Screenshots ----------
+def bench_screenshots(camera, count, out_dir):
+    path, truth, keyframes = camera
+    frames = [f for _, f in read_frames(path, range(min(count, truth["frames"])), keyframes)]
+    writer = ScreenshotWriter()
+    results = {}
+    try:
+        for fmt in IMAGE_FORMATS:
+            writer.set_format(fmt)
+            target_dir = os.path.join(out_dir, fmt.split()[0].lower())
+            os.makedirs(target_dir, exist_ok=True)
+            t0 = time.perf_counter()
+            batch = writer.begin_batch(fmt)
+            for i, frame in enumerate(frames):
+                writer.submit(batch, frame, os.path.join(target_dir, f"shot_{i}{writer.extension()}"),
+                              block=True)
+            writer.end_batch(batch)
+            while True:
+                with batch.lock:
+                    if batch.is_done():
+                        break
+                time.sleep(0.001)
+            secs = time.perf_counter() - t0
+            results[fmt] = {
+                "images": batch.written,
+                "failed": batch.failed,
+                "images_per_s": round(batch.written / secs, 1),
+                "mb_per_image": round(batch.bytes / max(1, batch.written) / 1e6, 3),
+                "ms_per_image": round(secs / max(1, batch.written) * 1000, 3),
+            }
+    finally:
+        writer.shutdown()
+    return results
+
+
+# ---------- Reporting ----------
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def flatten(data, prefix=""):
+    items = {}
+    for key, value in data.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            items.update(flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            items[name] = value
+    return items
+
+
+def format_metric(value):
+    return "-" if value is None else f"{value:.4g}"
+
+
+def compare(base_path, new_path):
+    with open(base_path, encoding="utf-8") as f:
+        base = flatten(json.load(f)["results"])
+    with open(new_path, encoding="utf-8") as f:
+        new = flatten(json.load(f)["results"])
+    width = max(len(k) for k in list(base) + list(new))
+    print(f"{'metric':<{width}} {'base':>12} {'new':>12} {'change':>8}")
+    for key in sorted(set(base) | set(new)):
+        a, b = base.get(key), new.get(key)
+        change = f"{(b - a) / abs(a) * 100:+7.1f}%" if a and b is not None else ""
+        print(f"{key:<{width}} {format_metric(a):>12} {format_metric(b):>12} {change:>8}")
+
+
+def run(args):
+    data_dir = args.data or tempfile.mkdtemp(prefix="multicam-bench-")
+    os.makedirs(data_dir, exist_ok=True)
+    results = {}
+    try:
+        cameras = prepare_cameras(data_dir, args)
+        results["footage"] = {"cameras": len(cameras), "frames": cameras[0][1]["frames"],
+                              "size": f"{args.size[0]}x{args.size[1]}",
+                              "codec": cameras[0][1]["codec"], "max_gop": cameras[0][1]["max_gop"]}
+        results["playback"] = {}
+        for backend in args.decoders:
+            print(f"playback ({backend})...")
+            results["playback"][backend] = bench_playback(cameras, backend, args.playback_frames)
+        print("seek...")
+        results["seek"] = bench_seek(cameras[0], args.seeks)
+        print("ocr...")
+        results["ocr"], template = bench_ocr(cameras[0])
+        print("jump to time...")
+        results["jump"] = bench_jump(cameras[-1], template)
+        print("screenshots...")
+        results["screenshots"] = bench_screenshots(cameras[0], args.screenshots,
+                                                   os.path.join(data_dir, "screenshots"))
+    finally:
+        if not args.data:
+            shutil.rmtree(data_dir, ignore_errors=True)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"))
+    parser.add_argument("--cameras", type=int, default=4)
+    parser.add_argument("--size", type=parse_size, default=(1280, 720))
+    parser.add_argument("--fps", type=float, default=25)
+    parser.add_argument("--seconds", type=float, default=60)
+    parser.add_argument("--gop", type=int, default=12)
+    parser.add_argument("--drift", type=float, default=0.002)
+    parser.add_argument("--drop", type=parse_drop, action="append", default=[],
+                        help="FRAME:SECS recording gap (repeatable)")
+    parser.add_argument("--decoders", nargs="+", default=list(DECODE_BACKENDS), choices=DECODE_BACKENDS)
+    parser.add_argument("--playback-frames", type=int, default=300)
+    parser.add_argument("--seeks", type=int, default=100)
+    parser.add_argument("--screenshots", type=int, default=40)
+    parser.add_argument("--data", help="keep (and reuse) the generated footage in this folder")
+    parser.add_argument("--output", default="benchmark_results.json")
+    args = parser.parse_args(argv)
+    if args.compare:
+        compare(*args.compare)
+        return
+    app = QApplication.instance() or QApplication([])
+    started = time.time()
+    results = run(args)
+    report = {
+        "meta": {
+            "date": datetime.now().strftime(TIME_FORMAT),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "opencv": cv2.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "duration_s": round(time.time() - started, 1),
+            "args": {k: v for k, v in vars(args).items() if k not in ("compare", "output")},
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(results, indent=2))
+    print(f"written to {args.output}")
+    failures = [f for r in results.values() if isinstance(r, dict) for f in r.get("failures", [])]
+    for w in (w for r in results.values() if isinstance(r, dict) for w in r.get("warnings", [])):
+        print(f"WARNING {w}")
+    for f in failures:
+        print(f"FAILED {f}")
+    if failures:
+        sys.exit(1)
+    return app
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+# benchmarks/synthetic.py
+
+"""
+Synthetic camera footage with a burned-in "YYYY-MM-DD HH:MM:SS" clock and a ground-truth
+sidecar, for the benchmark suite (benchmarks/run_benchmarks.py).
+
+    python benchmarks/synthetic.py OUT.mp4 [--size 1280x720] [--fps 25] [--seconds 60]
+        [--gop 12] [--drift 0.002] [--drop FRAME:SECS ...]
+
+The camera clock runs (1 + drift) seconds per second of video, and every --drop makes it
+jump SECS seconds forward at FRAME (frames lost while recording). The overlay shows the
+clock truncated to whole seconds, like real cameras; OUT.truth.json holds the exact clock
+of every frame.
+
+GOP length: --gop 1 writes all-intra MJPG (use an .avi path); anything else writes MPEG-4
+part 2 and asks the writer for that key interval. OpenCV's FFmpeg writer ignores the
+request on many builds (MPEG-4 is then written with a fixed GOP of 12), so the sidecar
+records the GOP actually found in the file (max_gop).
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import numpy as np
+from utils.keyframe_index import scan_keyframes
+from utils.time_sync import TIME_FORMAT
+
+DEFAULT_START = datetime(2024, 12, 5, 9, 0, 0)
+# Overlay placement inside the default OCR ROI (0, 0, 250, 40).
+OVERLAY_BOX = (0, 0, 250, 40)
+OVERLAY_ORIGIN = (5, 28)
+OVERLAY_SCALE = 0.7
+# Horizontal motion of the background, in pixels per frame.
+PAN_PIXELS = 4
+
+
+def clock_secs(frames, fps, drift=0.0, drops=()):
+    """
+    Camera clock of every frame, in seconds since the first frame.
+    drops: (frame, secs) pairs; the clock jumps secs forward at frame.
+    """
+    secs = np.arange(frames, dtype=np.float64) / fps * (1.0 + drift)
+    for frame, jump in drops:
+        if 0 <= frame < frames:
+            secs[frame:] += jump
+    return secs
+
+
+def overlay_text(start, secs):
+    # Cameras show the clock truncated to whole seconds.
+    return (start + timedelta(seconds=int(np.floor(secs)))).strftime(TIME_FORMAT)
+
+
+def draw_overlay(frame, text):
+    x, y, w, h = OVERLAY_BOX
+    frame[y:y + h, x:x + w] = 0
+    cv2.putText(frame, text, OVERLAY_ORIGIN, cv2.FONT_HERSHEY_SIMPLEX, OVERLAY_SCALE,
+                (255, 255, 255), 2, cv2.LINE_AA)
+
+
+def truth_path(video_path):
+    return os.path.splitext(video_path)[0] + ".truth.json"
+
+
+def generate(video_path, width=1280, height=720, fps=25, frames=1500, gop=12, drift=0.0,
+             drops=(), start=DEFAULT_START, seed=0):
+    """
+    Writes the video and its ground-truth sidecar; returns the sidecar dict.
+    """
+    fourcc = "MJPG" if gop == 1 else "mp4v"
+    writer = cv2.VideoWriter(video_path, cv2.CAP_FFMPEG, cv2.VideoWriter_fourcc(*fourcc), fps,
+                             (width, height), [cv2.VIDEOWRITER_PROP_KEY_INTERVAL, max(1, gop)])
+    if not writer.isOpened():
+        raise RuntimeError(f"Cannot write {video_path} with {fourcc}")
+    rng = np.random.default_rng(seed)
+    # Smooth noise, panned across the frame: every frame differs, as in real footage.
+    base = cv2.resize(rng.integers(0, 255, (height // 8, width // 8, 3), dtype=np.uint8),
+                      (width, height), interpolation=cv2.INTER_LINEAR)
+    secs = clock_secs(frames, fps, drift, drops)
+    frame = np.empty_like(base)
+    try:
+        for i in range(frames):
+            shift = (i * PAN_PIXELS) % width
+            frame[:, :width - shift] = base[:, shift:]
+            frame[:, width - shift:] = base[:, :shift]
+            draw_overlay(frame, overlay_text(start, secs[i]))
+            writer.write(frame)
+    finally:
+        writer.release()
+    keyframes = scan_keyframes(video_path)
+    truth = {
+        "video": os.path.abspath(video_path),
+        "width": width,
+        "height": height,
+        "fps": fps,
+        "frames": frames,
+        "codec": fourcc,
+        "gop_requested": gop,
+        "max_gop": keyframes.max_gop() if keyframes else None,
+        "drift": drift,
+        "drops": [list(d) for d in drops],
+        "start": start.strftime(TIME_FORMAT),
+        "clock_secs": [round(float(s), 6) for s in secs],
+    }
+    with open(truth_path(video_path), "w", encoding="utf-8") as f:
+        json.dump(truth, f)
+    return truth
+
+
+def load_truth(video_path):
+    with open(truth_path(video_path), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def parse_size(text):
+    w, h = text.lower().split("x")
+    return int(w), int(h)
+
+
+def parse_drop(text):
+    frame, secs = text.split(":")
+    return int(frame), float(secs)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("output")
+    parser.add_argument("--size", type=parse_size, default=(1280, 720))
+    parser.add_argument("--fps", type=float, default=25)
+    parser.add_argument("--seconds", type=float, default=60)
+    parser.add_argument("--gop", type=int, default=12)
+    parser.add_argument("--drift", type=float, default=0.0)
+    parser.add_argument("--drop", type=parse_drop, action="append", default=[])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    truth = generate(args.output, *args.size, fps=args.fps, frames=int(args.seconds * args.fps),
+                     gop=args.gop, drift=args.drift, drops=args.drop, seed=args.seed)
+    print(f"{args.output}: {truth['frames']} frames {truth['width']}x{truth['height']} "
+          f"{truth['codec']} max GOP {truth['max_gop']}, truth in {truth_path(args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,26 @@
 # main.py
 
+import os
 import sys
-from PyQt5.QtWidgets import QApplication
-from player.multi_video_player import MultiVideoPlayerWindow
 
 def main():
+    # `python main.py extract ...` runs headless (no Qt import at all).
+    if len(sys.argv) > 1 and sys.argv[1] == "extract":
+        from utils.headless_extract import main as extract_main
+        sys.exit(extract_main(sys.argv[2:]))
+    # `python main.py export ...` writes a mosaic video headless.
+    if len(sys.argv) > 1 and sys.argv[1] == "export":
+        from utils.headless_export import main as export_main
+        sys.exit(export_main(sys.argv[2:]))
+
+    from PyQt5.QtWidgets import QApplication
+    from player.multi_video_player import MultiVideoPlayerWindow
     app = QApplication(sys.argv)
     window = MultiVideoPlayerWindow()
     window.show()
+    # `python main.py review.mcsession` opens a saved session.
+    if len(sys.argv) > 1 and os.path.isfile(sys.argv[1]):
+        window.open_session(sys.argv[1])
     sys.exit(app.exec_())
 
 if __name__ == "__main__":
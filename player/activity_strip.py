@@ -0,0 +1,80 @@
+# player/activity_strip.py
+
+import cv2
+import numpy as np
+from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtGui import QColor, QImage, QPainter
+from PyQt5.QtWidgets import QWidget
+
+STRIP_HEIGHT = 10
+# Activity drawn at full heat: this many times the camera's event threshold.
+FULL_HEAT = 4.0
+
+class ActivityStrip(QWidget):
+    """
+    Heat strip of a utils.motion_index.MotionIndex under a VideoItem's slider: one column
+    per pixel with the peak activity of that part of the video (inferno colormap, black =
+    still), and the playhead as a white line. Clicking emits the position (0..1).
+    """
+    clicked = pyqtSignal(float)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setFixedHeight(STRIP_HEIGHT)
+        self.index = None
+        self.message = ""
+        self.position = None
+        self.image = None
+        self.buffer = None  # Memory behind self.image
+
+    def set_index(self, index):
+        self.index = index
+        self.message = ""
+        self.image = None
+        self.update()
+
+    def set_message(self, text):
+        self.message = text
+        self.setToolTip(text)
+        self.update()
+
+    def set_position(self, fraction):
+        if fraction != self.position:
+            self.position = fraction
+            self.update()
+
+    def render_image(self):
+        width = max(1, self.width())
+        values = self.index.strip(width)
+        heat = np.clip(values / (self.index.threshold * FULL_HEAT), 0, 1)
+        colors = cv2.applyColorMap((heat * 255).astype(np.uint8).reshape(1, -1), cv2.COLORMAP_INFERNO)
+        self.buffer = np.ascontiguousarray(cv2.cvtColor(colors, cv2.COLOR_BGR2RGB))
+        self.image = QImage(self.buffer.data, width, 1, 3 * width, QImage.Format_RGB888)
+        self.setToolTip(f"Activity: {self.index.describe()}")
+
+    def paintEvent(self, event):
+        p = QPainter(self)
+        if self.index is None or not len(self.index):
+            p.fillRect(self.rect(), QColor(60, 60, 60))
+            if self.message:
+                p.setPen(QColor(200, 200, 200))
+                font = p.font()
+                font.setPixelSize(max(6, self.height() - 2))
+                p.setFont(font)
+                p.drawText(self.rect(), Qt.AlignCenter, self.message)
+            return
+        if self.image is None or self.image.width() != max(1, self.width()):
+            self.render_image()
+        p.drawImage(self.rect(), self.image)
+        if self.position is not None:
+            x = int(self.position * (self.width() - 1))
+            p.setPen(QColor(255, 255, 255))
+            p.drawLine(x, 0, x, self.height())
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.image = None
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton and self.width() > 1:
+            self.clicked.emit(min(1.0, max(0.0, event.x() / (self.width() - 1))))
@@ -0,0 +1,175 @@
+# player/filmstrip.py
+
+from collections import OrderedDict
+from PyQt5.QtCore import Qt, QRect, QTimer, pyqtSignal
+from PyQt5.QtGui import QColor, QImage, QPainter, QPixmap
+from PyQt5.QtWidgets import (
+    QDialog, QLabel, QScrollBar, QStyle, QStyleOptionSlider, QVBoxLayout, QWidget
+)
+
+CAPTION_HEIGHT = 16
+TILE_GAP = 4
+# Decoded tiles kept by a filmstrip (a few screens' worth).
+TILE_CACHE = 256
+FOLLOW_MS = 200
+
+
+def slider_value_at(slider, x):
+    """
+    Value of a horizontal QSlider under widget x coordinate x (as the style maps it).
+    """
+    opt = QStyleOptionSlider()
+    slider.initStyleOption(opt)
+    style = slider.style()
+    groove = style.subControlRect(QStyle.CC_Slider, opt, QStyle.SC_SliderGroove, slider)
+    handle = style.subControlRect(QStyle.CC_Slider, opt, QStyle.SC_SliderHandle, slider)
+    span = max(1, groove.width() - handle.width())
+    pos = x - groove.x() - handle.width() // 2
+    return QStyle.sliderValueFromPosition(slider.minimum(), slider.maximum(), max(0, min(span, pos)), span)
+
+
+def rgb_to_qimage(rgb):
+    """
+    QImage over an RGB array; keep the array alive while the image is used.
+    """
+    h, w = rgb.shape[:2]
+    return QImage(rgb.data, w, h, 3 * w, QImage.Format_RGB888)
+
+
+class HoverPreview(QWidget):
+    """
+    Tooltip-style popup with a thumbnail and its time, shown above a slider while hovering.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent, Qt.ToolTip)
+        self.image_label = QLabel()
+        self.caption = QLabel()
+        self.caption.setAlignment(Qt.AlignCenter)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(2, 2, 2, 2)
+        layout.setSpacing(1)
+        layout.addWidget(self.image_label)
+        layout.addWidget(self.caption)
+
+    def show_image(self, rgb, text, global_pos):
+        # setPixmap copies the pixels, so rgb need not outlive the call.
+        self.image_label.setPixmap(QPixmap.fromImage(rgb_to_qimage(rgb)))
+        self.caption.setText(text)
+        self.adjustSize()
+        self.move(global_pos.x() - self.width() // 2, global_pos.y() - self.height() - 8)
+        self.show()
+
+
+class FilmstripView(QWidget):
+    """
+    Horizontal strip of a utils.thumbnail_index.ThumbnailIndex. Only the tiles on screen
+    are decoded (and a few hundred kept), so the strip costs the same for any length of
+    video. The tile of the current frame is outlined; clicking a tile emits its frame.
+    """
+    frame_clicked = pyqtSignal(int)
+
+    def __init__(self, thumbs, caption_func=None, parent=None):
+        super().__init__(parent)
+        self.thumbs = thumbs
+        self.caption_func = caption_func if caption_func else (lambda frame: f"frame {frame}")
+        self.current = 0  # thumbnail index of the current frame
+        self.tiles = OrderedDict()  # thumbnail index -> (QImage, RGB array behind it)
+        self.scrollbar = QScrollBar(Qt.Horizontal)
+        self.scrollbar.valueChanged.connect(self.update)
+        self.setMinimumHeight(thumbs.height + CAPTION_HEIGHT + 2 * TILE_GAP)
+
+    def tile_width(self):
+        return self.thumbs.width + TILE_GAP
+
+    def visible_tiles(self):
+        return max(1, self.width() // self.tile_width())
+
+    def update_range(self):
+        self.scrollbar.setRange(0, max(0, len(self.thumbs) - self.visible_tiles()))
+        self.scrollbar.setPageStep(self.visible_tiles())
+
+    def set_current_frame(self, frame_idx, follow=True):
+        current = self.thumbs.index_for(frame_idx)
+        if current == self.current:
+            return
+        self.current = current
+        first = self.scrollbar.value()
+        if follow and not first <= current < first + self.visible_tiles():
+            self.scrollbar.setValue(current - self.visible_tiles() // 2)
+        self.update()
+
+    def tile(self, i):
+        if i in self.tiles:
+            self.tiles.move_to_end(i)
+            return self.tiles[i][0]
+        rgb = self.thumbs.image(i)
+        if rgb is None:
+            return None
+        self.tiles[i] = (rgb_to_qimage(rgb), rgb)
+        while len(self.tiles) > TILE_CACHE:
+            self.tiles.popitem(last=False)
+        return self.tiles[i][0]
+
+    def paintEvent(self, event):
+        p = QPainter(self)
+        p.fillRect(self.rect(), QColor(30, 30, 30))
+        first = self.scrollbar.value()
+        tw = self.tile_width()
+        th = self.thumbs.height
+        for k in range(self.visible_tiles() + 1):
+            i = first + k
+            if i >= len(self.thumbs):
+                break
+            x = k * tw + TILE_GAP // 2
+            image = self.tile(i)
+            if image is not None:
+                p.drawImage(x, TILE_GAP, image)
+            if i == self.current:
+                p.setPen(QColor(255, 200, 0))
+                p.drawRect(x - 1, TILE_GAP - 1, self.thumbs.width + 1, th + 1)
+            p.setPen(QColor(220, 220, 220))
+            p.drawText(QRect(x, TILE_GAP + th, self.thumbs.width, CAPTION_HEIGHT), Qt.AlignCenter,
+                       self.caption_func(self.thumbs.frame_of(i)))
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.update_range()
+
+    def wheelEvent(self, event):
+        steps = event.angleDelta().y() // 120 or event.angleDelta().x() // 120
+        self.scrollbar.setValue(self.scrollbar.value() - steps * max(1, self.visible_tiles() // 2))
+
+    def mousePressEvent(self, event):
+        if event.button() != Qt.LeftButton:
+            return
+        i = self.scrollbar.value() + event.x() // self.tile_width()
+        if i < len(self.thumbs):
+            self.frame_clicked.emit(self.thumbs.frame_of(i))
+
+
+class FilmstripDialog(QDialog):
+    """
+    Filmstrip of one VideoItem: follows its playhead, clicking a tile seeks the item.
+    """
+    def __init__(self, item, parent=None):
+        super().__init__(parent)
+        self.item = item
+        self.setWindowTitle(f"Filmstrip - {item.log_source}")
+        self.resize(1000, item.thumbs.height + CAPTION_HEIGHT + 60)
+        self.view = FilmstripView(item.thumbs, caption_func=item.describe_frame)
+        self.view.frame_clicked.connect(item.show_frame)
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.view)
+        layout.addWidget(self.view.scrollbar)
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(lambda: self.view.set_current_frame(self.item.current_frame))
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.view.update_range()
+        self.view.set_current_frame(self.item.current_frame)
+        self.timer.start(FOLLOW_MS)
+
+    def hideEvent(self, event):
+        self.timer.stop()
+        super().hideEvent(event)
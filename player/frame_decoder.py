@@ -0,0 +1,536 @@
+# player/frame_decoder.py
+
+import threading
+from collections import deque, namedtuple
+import cv2
+from PyQt5.QtCore import QThread, pyqtSignal
+from PyQt5.QtGui import QImage
+from utils.decode_worker import DecodeWorker
+from utils.frame_cache import frame_cache
+from utils.frame_render import FrameScaler, fit_size
+from utils.perf_stats import perf_stats
+from utils.video_reader import SEEK_BACKOFF_FRAMES, SEQUENTIAL_GRAB_LIMIT, SequentialReader
+
+# Upper bound for the frames decoded ahead of the playhead, per video.
+RING_BUFFER_FRAMES = 8
+RING_BUFFER_BYTES = 96 * 1024 * 1024
+# While scrubbing, a cached frame this close to the target is shown instead of decoding.
+SCRUB_CACHE_RADIUS = 25
+# Review playback restarts at the playhead when decoding is this many steps ahead of it.
+REVIEW_LAG_STEPS = 4
+
+# index: frame number, frame: full-resolution BGR frame, image: display-ready QImage,
+# buffer: the BGRA array backing image (QImage does not own the memory).
+DecodedFrame = namedtuple("DecodedFrame", ["index", "frame", "image", "buffer"])
+
+
+class FrameRenderer:
+    """
+    Turns BGR frames into display-ready QImages for a given label size.
+
+    Scaling is done by a utils.frame_render.FrameScaler (cached geometry, reused
+    intermediate buffers), so the only allocation per frame is the output buffer, which
+    must live as long as its image (it ends up in the ring and frame cache). Output is
+    32-bit BGRA wrapped as QImage.Format_RGB32, the format Qt paints and converts to a
+    QPixmap without another conversion.
+
+    Not thread-safe: every thread gets its own renderer (frame_to_qimage).
+    """
+    def __init__(self):
+        self.scaler = FrameScaler()
+
+    def render(self, cv_frame, label_w, label_h):
+        out = self.scaler.scale(cv_frame, label_w, label_h)
+        return bgra_to_qimage(out), out
+
+
+def bgra_to_qimage(buffer):
+    """
+    Wraps an (h, w, 4) BGRA array as a QImage without copying; keep buffer alive.
+    """
+    h, w = buffer.shape[:2]
+    return QImage(buffer.data, w, h, buffer.strides[0], QImage.Format_RGB32)
+
+
+_renderers = threading.local()
+
+def frame_to_qimage(cv_frame, label_w, label_h):
+    """
+    Resizes a BGR frame to fit the label and converts it to a display-ready QImage, using
+    the calling thread's FrameRenderer. Returns (image, buffer); the caller must keep
+    buffer alive as long as image (or a QPixmap made from it) is used.
+    """
+    renderer = getattr(_renderers, "renderer", None)
+    if renderer is None:
+        renderer = _renderers.renderer = FrameRenderer()
+    return renderer.render(cv_frame, label_w, label_h)
+
+
+class FrameDecoder(QThread):
+    """
+    Decode worker owned by one VideoItem.
+
+    The worker opens its own capture and fills a bounded ring buffer with frames at and
+    ahead of the playhead, already resized and converted for display. The GUI thread only
+    picks up finished DecodedFrame entries (take / wait_for); frame_ready is emitted for
+    every new entry so the owner can refresh when the frame it is waiting for arrives.
+
+    Every decoded entry also goes into the shared FrameCache. Frames that are not in the
+    ring are looked up there first, so going back and forth over the same region is served
+    from memory. When the ring is full the worker prefetches into the cache: ahead of the
+    playhead, and while not playing also behind it (one seek, then a forward decode).
+
+    Scrubbing (scrub / end_scrub) is latest-wins: only the most recent target is kept,
+    and the worker decodes just the keyframe at or before it (no forward decode), which
+    is delivered through approx_ready. Ring filling and prefetching pause meanwhile; the
+    exact frame is requested with take/request once scrubbing ends.
+
+    Fast review playback (set_review) fills the ring with every step-th frame only: the
+    frames in between are grabbed without being retrieved or converted, or, with
+    keyframe seeks, skipped entirely by seeking to the frame SEEK_BACKOFF_FRAMES after
+    each keyframe (the cheapest seek target of the backend). take_review returns the
+    latest of those at or before the playhead, so a camera never shows a frame ahead of
+    the shared clock.
+    """
+    frame_ready = pyqtSignal(int)
+    approx_ready = pyqtSignal(int, object)  # scrub target, DecodedFrame shown for it
+    failed = pyqtSignal(str)  # error message; the decoder has stopped
+
+    def __init__(self, video_path, total_frames, frame_bytes=0, parent=None):
+        super().__init__(parent)
+        self.video_path = video_path
+        self.total_frames = total_frames
+        capacity = RING_BUFFER_FRAMES
+        if frame_bytes > 0:
+            capacity = max(2, min(RING_BUFFER_FRAMES, RING_BUFFER_BYTES // frame_bytes))
+        self.ring = deque(maxlen=capacity)
+        self.cond = threading.Condition()
+        self.running = True
+        self.playing = False
+        self.playhead = 0
+        self.next_decode = 0
+        self.seek_pending = True
+        self.generation = 0  # Bumped on every seek/resize; stale decodes are dropped.
+        self.target_size = (640, 480)
+        self.frame_bytes = frame_bytes
+        self.unreadable = set()  # Frames the worker failed to decode; never prefetched again.
+        self.keyframes = None  # utils.keyframe_index.KeyframeIndex, once scanned
+        self.reader = None
+        self.scrubbing = False
+        self.scrub_target = None  # Latest scrub position not yet picked up by the worker.
+        self.scrub_requests = 0
+        self.scrub_decoded = 0
+        self.scrub_dropped = 0  # Scrub targets superseded before the worker got to them.
+        self.review_step = 1  # Frames between ring entries (1: normal playback).
+        self.review_keyframes = False  # Ring entries are reached by keyframe seeks.
+        self.review_lead = 0  # Frames the playhead moves while one review frame decodes.
+        self.cache = frame_cache()
+        self.cache.register(video_path)
+        self.perf = perf_stats()
+
+    # ---------- GUI-side API ----------
+    def set_target_size(self, w, h):
+        with self.cond:
+            if (w, h) == self.target_size:
+                return
+            self.target_size = (w, h)
+            self._restart_at(self.playhead)
+
+    def set_keyframes(self, index):
+        """
+        Switches the worker to keyframe seeks and the scanned (true) frame count.
+        """
+        with self.cond:
+            self.keyframes = index
+            self.total_frames = len(index)
+            self.unreadable = {i for i in self.unreadable if i < self.total_frames}
+            if self.reader:
+                self.reader.keyframes = index
+            self.cond.notify_all()
+
+    def seek_stats(self):
+        return self.reader.seek_stats() if self.reader else None
+
+    def set_playing(self, playing):
+        """
+        While playing, prefetching behind the playhead is paused (it would cost a seek
+        away from the sequential playback position).
+        """
+        with self.cond:
+            self.playing = playing
+            self.cond.notify_all()
+
+    def set_review(self, step, keyframe_seeks=False):
+        """
+        Review playback with a ring entry every step frames (step 1 is normal playback);
+        keyframe_seeks needs the keyframe index and seeks to the first cheap frame after
+        each step instead of grabbing through it.
+        """
+        with self.cond:
+            step = max(1, int(step))
+            keyframe_seeks = bool(keyframe_seeks and step > 1 and self.keyframes is not None
+                                  and self.keyframes.has_keyframes())
+            if (step, keyframe_seeks) == (self.review_step, self.review_keyframes):
+                return
+            self.review_step = step
+            self.review_keyframes = keyframe_seeks
+            self.review_lead = 0
+            self._restart_at(self.playhead)
+
+    def take_review(self, frame_idx):
+        """
+        Review playback: removes and returns the latest ring entry at or before frame_idx,
+        or None if there is no new one. Decoding restarts at frame_idx when the ring is
+        more than REVIEW_LAG_STEPS steps ahead of it (after a jump back); falling behind
+        is caught up without a restart (see review_lead), so no decode in progress is
+        thrown away.
+        """
+        with self.cond:
+            self.playhead = frame_idx
+            self.scrubbing = False
+            while len(self.ring) > 1 and self.ring[1].index <= frame_idx:
+                self.ring.popleft()
+            entry = self.ring.popleft() if self.ring and self.ring[0].index <= frame_idx else None
+            window = self.review_step * REVIEW_LAG_STEPS
+            if self.review_keyframes:
+                window = max(window, 2 * self.keyframes.max_gop() + SEEK_BACKOFF_FRAMES)
+            first = self.ring[0].index if self.ring else self.next_decode
+            if first - frame_idx > window:
+                self._restart_at(frame_idx)
+            self.cond.notify_all()
+        return entry
+
+    def request(self, frame_idx):
+        """
+        Moves the playhead. Entries already buffered at or after frame_idx are kept;
+        otherwise the worker seeks and starts filling the buffer from frame_idx.
+        """
+        with self.cond:
+            self.playhead = frame_idx
+            self.scrubbing = False
+            self._schedule(frame_idx)
+
+    def scrub(self, frame_idx):
+        """
+        Moves the playhead while scrubbing. Returns a cached frame near frame_idx right
+        away if there is one; otherwise the keyframe before frame_idx is decoded and
+        delivered through approx_ready (unless a newer target supersedes it first).
+        """
+        with self.cond:
+            self.playhead = frame_idx
+            self.scrubbing = True
+            self.scrub_requests += 1
+            label_w, label_h = self.target_size
+        entry = self.cache.nearest(self.video_path, frame_idx, SCRUB_CACHE_RADIUS)
+        if entry is not None:
+            return self._fit_entry(entry, label_w, label_h)
+        with self.cond:
+            if self.scrub_target is not None:
+                self.scrub_dropped += 1
+            self.scrub_target = frame_idx
+            self.cond.notify_all()
+        return None
+
+    def end_scrub(self):
+        """
+        Leaves scrubbing mode. Returns (positions, keyframes decoded, stale targets dropped)
+        for this scrub and resets the counters.
+        """
+        with self.cond:
+            stats = (self.scrub_requests, self.scrub_decoded, self.scrub_dropped)
+            self.scrubbing = False
+            self.scrub_target = None
+            self.scrub_requests = self.scrub_decoded = self.scrub_dropped = 0
+            self.cond.notify_all()
+        return stats
+
+    def take(self, frame_idx):
+        """
+        Returns the DecodedFrame for frame_idx from the ring or the frame cache (or None)
+        without blocking.
+        """
+        with self.cond:
+            self.playhead = frame_idx
+            self.scrubbing = False
+            while self.ring and self.ring[0].index < frame_idx:
+                self.ring.popleft()
+            if self.ring and self.ring[0].index == frame_idx:
+                # Consumed entries free ring slots; let the worker refill.
+                self.cond.notify_all()
+                return self.ring[0]
+            label_w, label_h = self.target_size
+        entry = self.cache.get(self.video_path, frame_idx)
+        if entry is not None:
+            entry = self._fit_entry(entry, label_w, label_h)
+        with self.cond:
+            if entry is not None and self.playhead == frame_idx:
+                # Served from memory; keep decoding from the frame after it.
+                self._schedule(frame_idx + 1)
+            self.cond.notify_all()
+        return entry
+
+    def wait_for(self, frame_idx, timeout=5.0):
+        """
+        Blocks until frame_idx is decoded and returns it (or None on failure/timeout).
+        Only used where the caller needs the exact frame before continuing.
+        """
+        entry = self.take(frame_idx)
+        if entry is not None:
+            return entry
+        self.request(frame_idx)
+        with self.cond:
+            found = self.cond.wait_for(
+                lambda: not self.running or self._failed_at(frame_idx)
+                or (self.ring and self.ring[0].index == frame_idx),
+                timeout)
+            if found and self.ring and self.ring[0].index == frame_idx:
+                return self.ring[0]
+        return None
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+        self.wait()
+        self.cache.unregister(self.video_path)
+
+    # ---------- Worker ----------
+    def _schedule(self, frame_idx):
+        while self.ring and self.ring[0].index < frame_idx:
+            self.ring.popleft()
+        if self.ring and self.ring[0].index == frame_idx:
+            self.cond.notify_all()
+            return
+        if (not self.ring and not self.seek_pending
+                and 0 <= frame_idx - self.next_decode <= SEQUENTIAL_GRAB_LIMIT):
+            # Slightly ahead of the worker: let the decode in progress finish and
+            # skip forward with grab() instead of discarding it (frame dropping).
+            self.next_decode = frame_idx
+            self.cond.notify_all()
+            return
+        self._restart_at(frame_idx)
+
+    def _restart_at(self, frame_idx):
+        self.ring.clear()
+        self.next_decode = frame_idx
+        self.seek_pending = True
+        self.generation += 1
+        self.cond.notify_all()
+
+    def _failed_at(self, frame_idx):
+        return not self.seek_pending and self.next_decode > frame_idx and not self.ring
+
+    def _has_work(self):
+        return (not self.scrubbing and self.next_decode < self.total_frames
+                and len(self.ring) < self.ring.maxlen)
+
+    def _approx_frame(self, frame_idx):
+        if self.keyframes is not None and self.keyframes.has_keyframes():
+            return self.keyframes.keyframe_before(frame_idx)
+        return frame_idx
+
+    def _seek_target(self, frame_idx):
+        """
+        First frame at or after frame_idx that lies SEEK_BACKOFF_FRAMES after a keyframe
+        (None if there is none before the end).
+        """
+        keyframe = self.keyframes.keyframe_after(max(0, frame_idx - SEEK_BACKOFF_FRAMES))
+        if keyframe is None or keyframe + SEEK_BACKOFF_FRAMES >= self.total_frames:
+            return None
+        return keyframe + SEEK_BACKOFF_FRAMES
+
+    def _prefetch_target(self):
+        """
+        Next frame to decode into the cache only: the first uncached frame ahead of the
+        playhead, then (when not playing) the first uncached frame behind it.
+        """
+        n = self.cache.prefetch_frames(self.frame_bytes * 2)
+        if n <= 0 or self.scrubbing or self.review_step > 1:
+            return None
+        ahead = range(self.playhead + 1, min(self.total_frames, self.playhead + n + 1))
+        idx = self.cache.first_missing(self.video_path, ahead, self.unreadable)
+        if idx is None and not self.playing:
+            behind = range(max(0, self.playhead - n), self.playhead)
+            idx = self.cache.first_missing(self.video_path, behind, self.unreadable)
+        return idx
+
+    def _fit_entry(self, entry, label_w, label_h):
+        h, w = entry.frame.shape[:2]
+        if fit_size(w, h, label_w, label_h) == (entry.image.width(), entry.image.height()):
+            return entry
+        image, buffer = frame_to_qimage(entry.frame, label_w, label_h)
+        entry = DecodedFrame(entry.index, entry.frame, image, buffer)
+        self.cache.put(self.video_path, entry.index, entry, entry.frame.nbytes + buffer.nbytes)
+        return entry
+
+    # ---------- Frame source (overridden by ProcessFrameDecoder) ----------
+    def open_source(self):
+        """
+        Opens the worker's capture. Returns False if the video cannot be opened.
+        """
+        cap = cv2.VideoCapture(self.video_path)
+        if not cap.isOpened():
+            return False
+        with self.cond:
+            self.reader = SequentialReader(cap, keyframes=self.keyframes)
+        return True
+
+    def decode_entry(self, frame_idx, label_w, label_h):
+        """
+        Decodes frame_idx and renders it for the label. Returns a DecodedFrame or None.
+        """
+        t = self.perf.clock()
+        seeks = self.reader.seeks
+        frame = self.reader.read(frame_idx)
+        t = self.perf.lap(self.video_path, "seek" if self.reader.seeks != seeks else "read", t)
+        if frame is None:
+            return None
+        image, buffer = frame_to_qimage(frame, label_w, label_h)
+        self.perf.lap(self.video_path, "convert", t)
+        return DecodedFrame(frame_idx, frame, image, buffer)
+
+    def close_source(self):
+        if self.reader:
+            self.reader.cap.release()
+
+    def run(self):
+        try:
+            if not self.open_source():
+                with self.cond:
+                    stopped = not self.running
+                    # Callers blocked in wait_for give up instead of timing out.
+                    self.running = False
+                    self.cond.notify_all()
+                if not stopped:
+                    self.failed.emit(f"cannot open {self.video_path}")
+                return
+            while True:
+                with self.cond:
+                    prefetch = scrub = None
+                    while self.running and not self._has_work():
+                        if self.scrub_target is not None:
+                            scrub, self.scrub_target = self.scrub_target, None
+                            break
+                        prefetch = self._prefetch_target()
+                        if prefetch is not None:
+                            break
+                        self.cond.wait()
+                    if not self.running:
+                        break
+                    to_ring = prefetch is None and scrub is None
+                    if scrub is not None:
+                        idx = self._approx_frame(scrub)
+                    else:
+                        idx = self.next_decode if to_ring else prefetch
+                    if to_ring and self.review_step > 1:
+                        # Aim where the playhead will be once this frame is decoded.
+                        idx = max(idx, min(self.playhead + self.review_lead, self.total_frames - 1))
+                    if to_ring and self.review_keyframes:
+                        idx = self._seek_target(idx)
+                        if idx is None:
+                            self.next_decode = self.total_frames
+                            continue
+                    generation = self.generation
+                    started = self.playhead
+                    label_w, label_h = self.target_size
+                    if to_ring:
+                        self.seek_pending = False
+                entry = self.cache.peek(self.video_path, idx)
+                if entry is not None:
+                    entry = self._fit_entry(entry, label_w, label_h)
+                else:
+                    entry = self.decode_entry(idx, label_w, label_h)
+                    if entry is not None:
+                        self.cache.put(self.video_path, idx, entry, entry.frame.nbytes + entry.buffer.nbytes)
+                with self.cond:
+                    if entry is None:
+                        self.unreadable.add(idx)
+                    if scrub is not None:
+                        # Shown even if a newer target is queued: it is still the
+                        # closest frame available until that one is decoded.
+                        if entry is None or not self.scrubbing:
+                            continue
+                        self.scrub_decoded += 1
+                    elif not to_ring or generation != self.generation:
+                        continue
+                    elif entry is None:
+                        # Unreadable frame (often the tail of a file with an estimated
+                        # frame count); stop decoding ahead until the next request.
+                        self.next_decode = self.total_frames
+                    else:
+                        self.ring.append(entry)
+                        self.next_decode = max(self.next_decode, idx + self.review_step)
+                        if self.review_step > 1:
+                            self.review_lead = (self.review_lead + max(0, self.playhead - started)) // 2
+                    self.cond.notify_all()
+                if scrub is not None:
+                    self.approx_ready.emit(scrub, entry)
+                elif entry is not None:
+                    self.frame_ready.emit(idx)
+        finally:
+            self.close_source()
+
+
+class ProcessFrameDecoder(FrameDecoder):
+    """
+    FrameDecoder whose frames are decoded and scaled in a separate process
+    (utils.decode_worker.DecodeWorker) and handed over through shared memory, so cameras
+    decode in parallel on separate cores instead of contending for the GIL. Ring, cache,
+    scrubbing and prefetching work as in FrameDecoder; only the frame source differs.
+    """
+    def __init__(self, video_path, total_frames, frame_size, parent=None):
+        width, height = frame_size
+        super().__init__(video_path, total_frames, width * height * 3, parent)
+        self.frame_size = frame_size
+        self.worker = None
+        self.keyframes_sent = None
+        self.worker_seek_stats = None
+
+    def seek_stats(self):
+        return self.worker_seek_stats
+
+    def open_source(self):
+        self.worker = DecodeWorker(self.video_path, *self.frame_size)
+        return self.worker.wait_ready(lambda: self.running)
+
+    def decode_entry(self, frame_idx, label_w, label_h):
+        with self.cond:
+            keyframes = self.keyframes
+        if keyframes is not None and keyframes is not self.keyframes_sent:
+            self.worker.set_keyframes(keyframes)
+            self.keyframes_sent = keyframes
+        # "read"/"seek" is the round trip to the worker, which also scales the frame;
+        # "convert" only covers renderings that do not fit the shared-memory slot.
+        t = self.perf.clock()
+        seeks = self.worker_seek_stats["seeks"] if self.worker_seek_stats else 0
+        frame, buffer = self.worker.read(frame_idx, label_w, label_h, lambda: self.running)
+        self.worker_seek_stats = self.worker.seek_stats
+        seeked = self.worker_seek_stats is not None and self.worker_seek_stats["seeks"] != seeks
+        t = self.perf.lap(self.video_path, "seek" if seeked else "read", t)
+        if frame is None:
+            return None
+        if buffer is None:
+            image, buffer = frame_to_qimage(frame, label_w, label_h)
+            self.perf.lap(self.video_path, "convert", t)
+        else:
+            image = bgra_to_qimage(buffer)
+        return DecodedFrame(frame_idx, frame, image, buffer)
+
+    def close_source(self):
+        if self.worker:
+            self.worker.close()
+
+
+# Selectable decode backends (VideoItem.set_decode_backend).
+DECODE_BACKENDS = ("Threads", "Processes")
+
+def create_decoder(backend, video_path, total_frames, frame_size):
+    """
+    Decoder for the backend: "Threads" decodes in a QThread of this process, "Processes"
+    in a worker process (ProcessFrameDecoder). Falls back to threads when the frame size
+    is unknown (the shared-memory slots are sized from it).
+    """
+    w, h = frame_size
+    if backend == "Processes" and w > 0 and h > 0:
+        return ProcessFrameDecoder(video_path, total_frames, frame_size)
+    return FrameDecoder(video_path, total_frames, w * h * 3)
@@ -0,0 +1,21 @@
+# player/keyframe_indexer.py
+
+from player.ocr_indexer import BackgroundTask
+from utils.keyframe_index import save_keyframes, scan_keyframes
+
+def scan_and_save_keyframes(video_path):
+    index = scan_keyframes(video_path)
+    if index is None:
+        raise IOError(f"Failed to open video: {video_path}")
+    if len(index):
+        save_keyframes(video_path, index)
+    return index
+
+
+class KeyframeIndexThread(BackgroundTask):
+    """
+    Scans (and caches) the keyframe index of one video off the GUI thread.
+    """
+    def __init__(self, video_path):
+        super().__init__(scan_and_save_keyframes, video_path, key=video_path)
+        self.video_path = video_path
@@ -0,0 +1,130 @@
+# player/log_view.py
+
+import os
+from PyQt5.QtCore import QTimer
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QPlainTextEdit, QComboBox, QLabel, QPushButton,
+    QCheckBox, QFileDialog
+)
+from utils.log_sink import LEVELS, LOG_RING_RECORDS, log_sink
+
+# Records are moved from the sink to the widget (and log file) at most this often.
+FLUSH_MS = 200
+ALL_SOURCES = "All sources"
+DEFAULT_LOG_FILE = os.path.join("logs", "multicam.log")
+
+
+class LogView(QWidget):
+    """
+    Log panel fed by utils.log_sink. Logging never touches the widget: a timer appends
+    the records that arrived since the last flush in one document update, and
+    the document is capped at LOG_RING_RECORDS blocks, so appends and repaints stay cheap
+    however long the session runs. Changing the level or source filter re-renders from
+    the sink's ring.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.sink = log_sink()
+        self.text = QPlainTextEdit()
+        self.text.setReadOnly(True)
+        self.text.setMaximumBlockCount(LOG_RING_RECORDS)
+        self.combo_level = QComboBox()
+        self.combo_level.addItems(list(LEVELS))
+        self.combo_level.setCurrentText("Info")
+        self.combo_level.currentTextChanged.connect(self.rerender)
+        self.combo_source = QComboBox()
+        self.combo_source.addItem(ALL_SOURCES)
+        self.combo_source.currentTextChanged.connect(self.rerender)
+        self.check_file = QCheckBox("Log to file")
+        self.check_file.toggled.connect(self.on_file_toggled)
+        self.btn_clear = QPushButton("Clear")
+        self.btn_clear.clicked.connect(self.clear)
+        self.label_status = QLabel()
+
+        controls = QHBoxLayout()
+        controls.addWidget(QLabel("Level:"))
+        controls.addWidget(self.combo_level)
+        controls.addWidget(QLabel("Source:"))
+        controls.addWidget(self.combo_source)
+        controls.addWidget(self.check_file)
+        controls.addWidget(self.btn_clear)
+        controls.addStretch()
+        controls.addWidget(self.label_status)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addLayout(controls)
+        layout.addWidget(self.text)
+
+        self.shown_seq = 0  # Last record considered for the widget.
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.flush)
+        self.timer.start(FLUSH_MS)
+
+    def log(self, fragment, level=None, source=None):
+        self.sink.emit(fragment, level, source)
+
+    def min_level(self):
+        return LEVELS[self.combo_level.currentText()]
+
+    def source_filter(self):
+        source = self.combo_source.currentText()
+        return None if source == ALL_SOURCES else source
+
+    def flush(self):
+        self.sink.flush_file()
+        records, lost, self.shown_seq = self.sink.records_after(self.shown_seq, self.min_level(),
+                                                                 self.source_filter())
+        if lost:
+            self.text.appendHtml(f"<font color='gray'>... {lost} older record(s) not shown ...</font>")
+        if records:
+            self.append_records(records)
+        self.update_sources()
+
+    def append_records(self, records):
+        # One paragraph per record, one document update for the batch.
+        self.text.appendHtml("".join(f"<p>{r.html}</p>" for r in records))
+        bar = self.text.verticalScrollBar()
+        bar.setValue(bar.maximum())
+
+    def rerender(self):
+        self.text.clear()
+        self.shown_seq = 0
+        self.flush()
+
+    def update_sources(self):
+        names = self.sink.source_names()
+        if self.combo_source.count() - 1 == len(names):
+            return
+        current = self.combo_source.currentText()
+        self.combo_source.blockSignals(True)
+        self.combo_source.clear()
+        self.combo_source.addItems([ALL_SOURCES] + names)
+        self.combo_source.setCurrentText(current)
+        self.combo_source.blockSignals(False)
+
+    def clear(self):
+        self.sink.clear()
+        self.text.clear()
+
+    def on_file_toggled(self, checked):
+        path = None
+        if checked:
+            path, _ = QFileDialog.getSaveFileName(self, "Log File", DEFAULT_LOG_FILE,
+                                                  "Log Files (*.log);;All Files (*)")
+            if not path:
+                self.check_file.blockSignals(True)
+                self.check_file.setChecked(False)
+                self.check_file.blockSignals(False)
+                return
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        try:
+            self.sink.set_file(path)
+        except OSError as e:
+            self.log(f"<font color='red'>[Log] Cannot open log file: {e}</font>")
+            return
+        self.label_status.setText(f"Logging to {path}" if path else "")
+
+    def shutdown(self):
+        self.timer.stop()
+        self.flush()
+        self.sink.set_file(None)
@@ -0,0 +1,26 @@
+# player/mosaic_exporter.py
+
+from PyQt5.QtCore import pyqtSignal
+from player.ocr_indexer import BackgroundTask
+from utils.mosaic_export import export_mosaic
+
+class MosaicExportThread(BackgroundTask):
+    """
+    Runs utils.mosaic_export.export_mosaic off the GUI thread; done carries the output
+    path and the export stats. cancel() stops it after the current output frame.
+    """
+    progress = pyqtSignal(int, int)  # frames written, total
+
+    def __init__(self, sources, start_time, end_time, path, fps=None, cols=None):
+        super().__init__(self.export, key=path)
+        self.sources = sources  # utils.mosaic_export.ExportSource per camera
+        self.start_time = start_time
+        self.end_time = end_time
+        self.path = path
+        self.fps = fps
+        self.cols = cols
+
+    def export(self):
+        return export_mosaic(self.sources, self.start_time, self.end_time, self.path,
+                             fps=self.fps, cols=self.cols, progress=self.progress.emit,
+                             alive=lambda: self.running)
@@ -0,0 +1,86 @@
+# player/mosaic_view.py
+
+import math
+import os
+from PyQt5.QtCore import Qt, QRect
+from PyQt5.QtGui import QColor, QPainter
+from PyQt5.QtWidgets import QWidget
+
+class MosaicView(QWidget):
+    """
+    Single-widget display for many cameras: all streams are painted into one canvas of
+    `cols` columns (rows follow from the camera count).
+
+    The VideoItems stay the owners of playback; while attached they route displayed frames
+    here (VideoItem.set_display_sink) instead of to their own preview labels, and their
+    decoders resize to the tile size in the worker thread. Frames arriving in the same
+    event-loop pass are painted together, in one paintEvent.
+    """
+    def __init__(self, cols=4, parent=None):
+        super().__init__(parent)
+        self.cols = cols
+        self.items = []
+        self.images = {}  # VideoItem -> last displayed DecodedFrame (keeps its buffer alive)
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        self.setMinimumSize(320, 240)
+
+    def set_items(self, items):
+        for it in self.items:
+            if it not in items:
+                it.set_display_sink(None)
+        self.items = list(items)
+        self.images = {it: self.images[it] for it in self.items if it in self.images}
+        self.layout_tiles()
+
+    def set_cols(self, cols):
+        self.cols = max(1, cols)
+        self.layout_tiles()
+
+    def grid(self):
+        cols = max(1, min(self.cols, len(self.items)))
+        rows = max(1, math.ceil(len(self.items) / cols))
+        return cols, rows
+
+    def tile_rect(self, i):
+        cols, rows = self.grid()
+        w, h = self.width() // cols, self.height() // rows
+        return QRect((i % cols) * w, (i // cols) * h, w, h)
+
+    def layout_tiles(self):
+        """
+        Gives every attached item the current tile size (decoders re-render at it).
+        """
+        if not self.items:
+            self.update()
+            return
+        tile = self.tile_rect(0)
+        for it in self.items:
+            it.set_display_sink(self.on_frame, (max(1, tile.width() - 2), max(1, tile.height() - 2)))
+        self.update()
+
+    def on_frame(self, item, entry):
+        self.images[item] = entry
+        self.update()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.layout_tiles()
+
+    def paintEvent(self, event):
+        p = QPainter(self)
+        p.fillRect(self.rect(), Qt.black)
+        p.setPen(QColor(255, 255, 0))
+        for i, it in enumerate(self.items):
+            r = self.tile_rect(i)
+            if not r.intersects(event.rect()):
+                continue
+            shown = self.images.get(it)
+            if shown is not None:
+                image = shown.image
+                x = r.x() + (r.width() - image.width()) // 2
+                y = r.y() + (r.height() - image.height()) // 2
+                p.drawImage(x, y, image)
+            name = os.path.basename(it.video_path) if it.video_path else "Loading..."
+            p.drawText(r.adjusted(4, 2, -4, -2), Qt.AlignLeft | Qt.AlignBottom,
+                       f"{name}  {it.current_frame}/{it.total_frames}")
+        p.end()
@@ -0,0 +1,19 @@
+# player/motion_aligner.py
+
+from player.ocr_indexer import BackgroundTask
+from utils.alignment import SignatureSet, signature
+
+def align_signatures(indexes, among=None):
+    return SignatureSet([signature(index) for index in indexes]).align_all(among)
+
+
+class MotionAlignThread(BackgroundTask):
+    """
+    Cross-correlates the activity signatures of several cameras (utils.alignment) off the
+    GUI thread; only pairs with at least one camera in `among` are compared. done carries
+    {(a, b): Alignment}.
+    """
+    def __init__(self, indexes, among=None):
+        super().__init__(align_signatures, indexes, among)
+        self.indexes = indexes  # utils.motion_index.MotionIndex per camera
+        self.among = among
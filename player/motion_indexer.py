@@ -0,0 +1,21 @@
+# player/motion_indexer.py
+
+from player.ocr_indexer import BackgroundTask
+from utils.index_pool import index_pool
+from utils.motion_index import MotionIndex, index_and_cache
+
+def motion_index_in_pool(video_path):
+    data = index_pool().submit(index_and_cache, video_path).result()
+    if data is None:
+        raise IOError(f"Failed to open video: {video_path}")
+    return MotionIndex.from_json(data)
+
+
+class MotionIndexThread(BackgroundTask):
+    """
+    Waits for the activity index of one video, built (and cached) by a worker of the
+    shared index pool, so several videos are indexed in parallel.
+    """
+    def __init__(self, video_path):
+        super().__init__(motion_index_in_pool, video_path, key=video_path)
+        self.video_path = video_path
@@ -1,14 +1,40 @@
 # player/multi_video_player.py
 
+import logging
+import os
+import time
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QPushButton, QGridLayout, QVBoxLayout,
     QHBoxLayout, QScrollArea, QFileDialog, QSpinBox,
-    QLabel, QTextEdit, QSplitter, QLineEdit
+    QLabel, QSplitter, QLineEdit, QComboBox
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
+from player.frame_decoder import DECODE_BACKENDS
+from player.log_view import LogView
+from player.motion_aligner import MotionAlignThread
+from player.mosaic_exporter import MosaicExportThread
+from player.mosaic_view import MosaicView
+from player.ocr_indexer import BackgroundTask
+from player.perf_panel import PerfPanel
 from player.video_item import VideoItem
+from player.video_loader import load_pool
+from player.playback_clock import REVIEW_SPEEDS, MasterClock
+from player.screenshot_writer import IMAGE_FORMATS, screenshot_writer, shutdown_screenshot_writer
+from utils.alignment import MIN_CONFIDENCE, solve_offsets
+from utils.frame_cache import frame_cache
+from utils.handle_pool import DEFAULT_HANDLE_LIMIT, HandlePool
+from utils.index_pool import reset_index_pool
+from utils.mosaic_export import ExportSource
+from utils.session import SESSION_EXT, SessionError, load_session, save_session
+from utils.time_sync import VideoTiming, describe_location
 from datetime import datetime
 
+# Visibility changes (scrolling, resizing) closer together than this open captures once.
+VISIBILITY_SETTLE_MS = 100
+SESSION_FILTER = f"Sessions (*{SESSION_EXT});;All Files (*)"
+# Alignment waiting for activity indexes checks on them this often.
+ALIGN_POLL_MS = 500
+
 class MultiVideoPlayerWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -22,6 +48,18 @@ class MultiVideoPlayerWindow(QMainWindow):
         self.btn_play_all.clicked.connect(self.play_all)
         self.btn_pause_all = QPushButton("Pause All")
         self.btn_pause_all.clicked.connect(self.pause_all)
+        # Review speed: faster than real time, decoding only the frames shown.
+        self.combo_speed = QComboBox()
+        self.combo_speed.addItems([f"{s}x" for s in REVIEW_SPEEDS])
+        self.combo_speed.currentTextChanged.connect(self.on_speed_changed)
+        self.btn_stats = QPushButton("Playback Stats")
+        self.btn_stats.clicked.connect(self.log_playback_stats)
+        self.btn_perf = QPushButton("Performance")
+        self.btn_perf.clicked.connect(self.show_perf_panel)
+        self.btn_open_session = QPushButton("Open Session")
+        self.btn_open_session.clicked.connect(self.on_open_session_dialog)
+        self.btn_save_session = QPushButton("Save Session")
+        self.btn_save_session.clicked.connect(self.on_save_session_dialog)
         
         # Global navigation: one spinbox for offset used for both rewind and fast-forward.
         self.spin_offset_global = QSpinBox()
@@ -43,17 +81,63 @@ class MultiVideoPlayerWindow(QMainWindow):
         self.spin_intv = QSpinBox()
         self.spin_intv.setRange(1, 99999)
         self.spin_intv.setValue(1)
+        self.combo_format = QComboBox()
+        self.combo_format.addItems(list(IMAGE_FORMATS))
+        self.combo_format.currentTextChanged.connect(self.on_format_changed)
+        self.spin_level = QSpinBox()
+        self.spin_level.valueChanged.connect(self.on_level_changed)
         
         # Global Jump-to-Time row
         self.input_global_jump = QLineEdit("2024-12-05 09:30:00")
         self.btn_jump_all = QPushButton("Jump All to Time")
         self.btn_jump_all.clicked.connect(self.jump_all_to_time)
+        # Mosaic export (utils.mosaic_export): all cameras from the jump time to this one.
+        self.input_export_end = QLineEdit("2024-12-05 09:35:00")
+        self.btn_export = QPushButton("Export Mosaic")
+        self.btn_export.clicked.connect(self.export_mosaic)
+        # Activity events (utils.motion_index): jump all cameras to the previous/next one.
+        self.btn_prev_event = QPushButton("Previous Event")
+        self.btn_prev_event.clicked.connect(lambda: self.jump_to_event(forward=False))
+        self.btn_next_event = QPushButton("Next Event")
+        self.btn_next_event.clicked.connect(lambda: self.jump_to_event(forward=True))
+        self.btn_index_activity = QPushButton("Index Activity")
+        self.btn_index_activity.clicked.connect(self.index_activity)
+        # Motion alignment (utils.alignment): time mappings for cameras without a usable clock.
+        self.btn_align = QPushButton("Align Cameras")
+        self.btn_align.clicked.connect(lambda: self.align_cameras())
+
+        # Mosaic display: one canvas for all cameras instead of the per-item grid.
+        self.btn_mosaic = QPushButton("Mosaic View")
+        self.btn_mosaic.setCheckable(True)
+        self.btn_mosaic.toggled.connect(self.toggle_mosaic)
+        self.spin_mosaic_cols = QSpinBox()
+        self.spin_mosaic_cols.setRange(1, 10)
+        self.spin_mosaic_cols.setValue(4)
+        self.spin_mosaic_cols.valueChanged.connect(self.on_mosaic_cols_changed)
+
+        # Decode backend: worker threads in this process, or one process per video.
+        self.combo_decoder = QComboBox()
+        self.combo_decoder.addItems(list(DECODE_BACKENDS))
+        self.combo_decoder.currentTextChanged.connect(self.on_decoder_changed)
+
+        # Open captures: items are opened as they come into view (or are jumped to) and the
+        # least recently used ones beyond this limit are closed.
+        self.spin_handles = QSpinBox()
+        self.spin_handles.setRange(1, 256)
+        self.spin_handles.setValue(DEFAULT_HANDLE_LIMIT)
+        self.spin_handles.valueChanged.connect(self.on_handle_limit_changed)
         
         # Assemble top controls in two rows.
         top_row = QHBoxLayout()
         top_row.addWidget(self.btn_add_video)
+        top_row.addWidget(self.btn_open_session)
+        top_row.addWidget(self.btn_save_session)
         top_row.addWidget(self.btn_play_all)
         top_row.addWidget(self.btn_pause_all)
+        top_row.addWidget(QLabel("Speed:"))
+        top_row.addWidget(self.combo_speed)
+        top_row.addWidget(self.btn_stats)
+        top_row.addWidget(self.btn_perf)
         top_row.addWidget(QLabel("Global Offset:"))
         top_row.addWidget(self.spin_offset_global)
         top_row.addWidget(self.btn_global_rewind)
@@ -63,11 +147,29 @@ class MultiVideoPlayerWindow(QMainWindow):
         top_row.addWidget(self.btn_snap10)
         top_row.addWidget(self.label_intv)
         top_row.addWidget(self.spin_intv)
+        top_row.addWidget(QLabel("Format:"))
+        top_row.addWidget(self.combo_format)
+        top_row.addWidget(QLabel("Level/Quality:"))
+        top_row.addWidget(self.spin_level)
         
         jump_row = QHBoxLayout()
         jump_row.addWidget(QLabel("Global Jump Time:"))
         jump_row.addWidget(self.input_global_jump)
         jump_row.addWidget(self.btn_jump_all)
+        jump_row.addWidget(QLabel("Export Until:"))
+        jump_row.addWidget(self.input_export_end)
+        jump_row.addWidget(self.btn_export)
+        jump_row.addWidget(self.btn_prev_event)
+        jump_row.addWidget(self.btn_next_event)
+        jump_row.addWidget(self.btn_index_activity)
+        jump_row.addWidget(self.btn_align)
+        jump_row.addWidget(self.btn_mosaic)
+        jump_row.addWidget(QLabel("Mosaic Columns:"))
+        jump_row.addWidget(self.spin_mosaic_cols)
+        jump_row.addWidget(QLabel("Decoder:"))
+        jump_row.addWidget(self.combo_decoder)
+        jump_row.addWidget(QLabel("Open Videos:"))
+        jump_row.addWidget(self.spin_handles)
         
         top_control_layout = QVBoxLayout()
         top_control_layout.addLayout(top_row)
@@ -83,9 +185,8 @@ class MultiVideoPlayerWindow(QMainWindow):
         self.scroll_area.setWidgetResizable(True)
         self.scroll_area.setWidget(self.grid_widget)
         
-        # Log output panel
-        self.log_text = QTextEdit()
-        self.log_text.setReadOnly(True)
+        # Log output panel (bounded, flushed in batches; see player.log_view)
+        self.log_view = LogView()
         
         # Splitter to separate video area and log output
         self.splitter = QSplitter(Qt.Vertical)
@@ -93,8 +194,11 @@ class MultiVideoPlayerWindow(QMainWindow):
         top_area_layout = QVBoxLayout(top_area_widget)
         top_area_layout.addWidget(top_widget)
         top_area_layout.addWidget(self.scroll_area)
+        self.mosaic = MosaicView(cols=self.spin_mosaic_cols.value())
+        self.mosaic.hide()
+        top_area_layout.addWidget(self.mosaic)
         self.splitter.addWidget(top_area_widget)
-        self.splitter.addWidget(self.log_text)
+        self.splitter.addWidget(self.log_view)
         
         main_layout = QVBoxLayout()
         main_layout.addWidget(self.splitter)
@@ -103,34 +207,220 @@ class MultiVideoPlayerWindow(QMainWindow):
         self.setCentralWidget(container)
         
         self.video_items = []
+        self.clock = MasterClock(log_func=lambda html: self.log_html(html, source="Clock"), parent=self)
+        self.perf_panel = None
+        self.handles = HandlePool(self.spin_handles.value())
+        self.blocked_opens = 0  # Visible items last left closed by the handle limit.
+        self.visibility_timer = QTimer(self)
+        self.visibility_timer.setSingleShot(True)
+        self.visibility_timer.setInterval(VISIBILITY_SETTLE_MS)
+        self.visibility_timer.timeout.connect(self.open_visible_items)
+        self.pending_alignment = None  # Cameras to align once activity indexing finishes.
+        self.align_thread = None
+        self.export_thread = None
+        self.export_logged = 0  # Tenths of the running export already logged.
+        self.align_timer = QTimer(self)
+        self.align_timer.setInterval(ALIGN_POLL_MS)
+        self.align_timer.timeout.connect(self.check_pending_alignment)
+        self.scroll_area.verticalScrollBar().valueChanged.connect(self.schedule_visibility_check)
+        self.scroll_area.horizontalScrollBar().valueChanged.connect(self.schedule_visibility_check)
+        self.on_format_changed(self.combo_format.currentText())
     
-    def log_html(self, html):
-        self.log_text.append(html)
+    def log_html(self, html, level=None, source=None):
+        """
+        Logs an HTML fragment; level (logging.*) defaults from its color, source to "Player".
+        """
+        self.log_view.log(html, level, source)
+
+    def closeEvent(self, event):
+        # Stop the decoders and background passes before the widgets they report to go away.
+        for item in self.video_items:
+            item.close_capture()
+        BackgroundTask.cancel_all()
+        reset_index_pool(terminate=True)
+        BackgroundTask.wait_all()
+        load_pool().clear()
+        load_pool().waitForDone()
+        shutdown_screenshot_writer()
+        self.log_view.shutdown()
+        super().closeEvent(event)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.schedule_visibility_check()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.schedule_visibility_check()
     
     def on_add_video_dialog(self):
         paths, _ = QFileDialog.getOpenFileNames(self, "Select Videos", "",
                                                 "Video Files (*.mp4 *.avi *.mkv *.mov *.flv);;All Files (*)")
+        if paths:
+            self.log_html(f"<font color='black'>Loading {len(paths)} video(s) in the background...</font>")
         for p in paths:
             self.add_video_item(p)
     
-    def add_video_item(self, video_path):
+    def add_video_item(self, video_path, entry=None):
+        """
+        Adds a closed item for video_path (entry: utils.session.SessionEntry to restore);
+        its capture is opened once it is on screen.
+        """
         item = VideoItem(log_func=self.log_html)
         item.delete_callback = self.delete_video_item
-        item.load_video_manually(video_path)
+        item.acquire_handle = self.acquire_handle
+        item.release_handle = self.handles.release
+        item.opened_callback = self.on_item_opened
+        item.align_callback = lambda it: self.align_cameras([it])
+        item.decode_backend = self.combo_decoder.currentText()
+        item.play_clock.set_rate(self.clock.rate)
+        item.set_source(video_path, entry)
         idx = len(self.video_items)
         row = idx // 2
         col = idx % 2
         self.grid_layout.addWidget(item, row, col)
         self.video_items.append(item)
-        self.log_html(f"<font color='black'>Added video at row={row}, col={col}, path={video_path}</font>")
+        self.refresh_mosaic()
+        self.schedule_visibility_check()
+        self.log_html(f"<font color='black'>Added video at row={row}, col={col}, path={video_path}</font>",
+                      level=logging.DEBUG if entry else None)
     
     def delete_video_item(self, item):
         if item in self.video_items:
+            self.handles.release(item)
             self.video_items.remove(item)
+            self.refresh_mosaic()
+            self.resync_clock()
             self.grid_layout.removeWidget(item)
             item.delete_self()
             self.log_html(f"<font color='black'>Deleted video: {item.video_path}</font>")
             self.refresh_grid_layout()
+            self.schedule_visibility_check()
+
+    def clear_video_items(self):
+        self.clock.stop(report=False)
+        items, self.video_items = self.video_items, []
+        self.refresh_mosaic()
+        for it in items:
+            self.grid_layout.removeWidget(it)
+            it.delete_self()
+
+    # ---------- Capture handles ----------
+    def visible_items(self):
+        """
+        Items on screen: all of them in mosaic mode, else those in the scroll area's viewport.
+        """
+        if self.btn_mosaic.isChecked():
+            return list(self.video_items)
+        return [it for it in self.video_items if it.isVisible() and not it.visibleRegion().isEmpty()]
+
+    def acquire_handle(self, item, protected=None):
+        """
+        Reserves a capture slot for item, closing the least recently used items beyond the
+        handle limit. Items in protected (default: the ones on screen) are never closed
+        for it; if they fill every slot, item is not granted one.
+        """
+        if protected is None:
+            protected = set(self.visible_items())
+        granted, evicted = self.handles.acquire(item, protected)
+        for it in evicted:
+            it.close_capture()
+        if evicted:
+            self.log_html(f"<font color='gray'>[Handles] Closed {len(evicted)} video(s) not used recently "
+                          f"({len(self.handles)}/{self.handles.limit} open)</font>", level=logging.DEBUG)
+        return granted
+
+    def schedule_visibility_check(self, *args):
+        self.visibility_timer.start()
+
+    def open_visible_items(self):
+        protected = set()
+        blocked = 0
+        for it in self.visible_items():
+            protected.add(it)
+            if it.is_open():
+                self.handles.touch(it)
+            elif it.video_path and not it.open_capture(protected):
+                blocked += 1
+        if blocked and blocked != self.blocked_opens:
+            self.log_html(f"<font color='red'>[Handles] {blocked} visible video(s) not opened: all "
+                          f"{self.handles.limit} capture handles are in use (raise \"Open Videos\")</font>")
+        self.blocked_opens = blocked
+
+    def on_item_opened(self, item):
+        # A camera opened during playback joins the running clock at its current time.
+        if self.clock.is_running():
+            t = self.clock.current_time()
+            fidx = item.time_to_frame(t) if t else None
+            if fidx is not None:
+                item.show_frame(fidx)
+            self.clock.resync(self.video_items)
+
+    def on_handle_limit_changed(self, limit):
+        for it in self.handles.set_limit(limit, set(self.visible_items())):
+            it.close_capture()
+        self.schedule_visibility_check()
+
+    # ---------- Sessions ----------
+    def on_save_session_dialog(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Save Session", f"session{SESSION_EXT}", SESSION_FILTER)
+        if path:
+            self.save_session(path)
+
+    def on_open_session_dialog(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Open Session", "", SESSION_FILTER)
+        if path:
+            self.open_session(path)
+
+    def save_session(self, path):
+        entries = [it.session_entry() for it in self.video_items if it.video_path]
+        settings = {
+            "decoder": self.combo_decoder.currentText(),
+            "open_videos": self.spin_handles.value(),
+            "mosaic": self.btn_mosaic.isChecked(),
+            "mosaic_cols": self.spin_mosaic_cols.value(),
+            "jump_time": self.input_global_jump.text().strip(),
+            "export_end": self.input_export_end.text().strip(),
+        }
+        try:
+            save_session(path, entries, settings)
+        except OSError as e:
+            self.log_html(f"<font color='red'>[Session] Save failed: {e}</font>")
+            return
+        self.log_html(f"<font color='#006400'>[Session] Saved {len(entries)} video(s) to {path}</font>")
+
+    def open_session(self, path):
+        """
+        Replaces the current videos with the session's. Items are created closed, with
+        their times and OCR index restored; only the visible ones are opened.
+        """
+        t0 = time.perf_counter()
+        try:
+            entries, settings = load_session(path)
+        except SessionError as e:
+            self.log_html(f"<font color='red'>[Session] {e}</font>")
+            return
+        self.clear_video_items()
+        if settings.get("decoder") in DECODE_BACKENDS:
+            self.combo_decoder.setCurrentText(settings["decoder"])
+        if settings.get("open_videos"):
+            self.spin_handles.setValue(int(settings["open_videos"]))
+        if settings.get("mosaic_cols"):
+            self.spin_mosaic_cols.setValue(int(settings["mosaic_cols"]))
+        if settings.get("jump_time"):
+            self.input_global_jump.setText(settings["jump_time"])
+        if settings.get("export_end"):
+            self.input_export_end.setText(settings["export_end"])
+        self.grid_widget.setUpdatesEnabled(False)
+        for entry in entries:
+            self.add_video_item(entry.path, entry)
+        self.grid_widget.setUpdatesEnabled(True)
+        self.btn_mosaic.setChecked(bool(settings.get("mosaic")))
+        missing = sum(1 for e in entries if not os.path.exists(e.path))
+        note = f", {missing} file(s) missing" if missing else ""
+        self.log_html(f"<font color='#006400'>[Session] Opened {path}: {len(entries)} video(s) in "
+                      f"{time.perf_counter() - t0:.2f}s{note}; captures open on demand "
+                      f"(at most {self.handles.limit})</font>")
     
     def refresh_grid_layout(self):
         while self.grid_layout.count():
@@ -142,37 +432,184 @@ class MultiVideoPlayerWindow(QMainWindow):
             col = i % 2
             self.grid_layout.addWidget(vi, row, col)
     
+    def toggle_mosaic(self, checked):
+        self.scroll_area.setVisible(not checked)
+        self.mosaic.setVisible(checked)
+        self.refresh_mosaic()
+        self.schedule_visibility_check()
+        mode = f"mosaic ({self.mosaic.grid()[0]} x {self.mosaic.grid()[1]})" if checked else "grid"
+        self.log_html(f"<font color='black'>[View] {mode}, {len(self.video_items)} video(s)</font>")
+
+    def on_mosaic_cols_changed(self, cols):
+        self.mosaic.set_cols(cols)
+
+    def on_decoder_changed(self, backend):
+        for it in self.video_items:
+            it.set_decode_backend(backend)
+        self.log_html(f"<font color='black'>[Decoder] {backend}</font>")
+
+    def refresh_mosaic(self):
+        self.mosaic.set_items(self.video_items if self.btn_mosaic.isChecked() else [])
+    
     def play_all(self):
         self.log_html("<font color='black'>[Play All]</font>")
         for it in self.video_items:
-            it.play_video()
+            it.play_clock.stop(report=False)
+        if self.clock.start(self.video_items):
+            t = self.clock.current_time()
+            origin = t.strftime("%Y-%m-%d %H:%M:%S") if t else "frame offsets (no time mapping)"
+            self.log_html(f"<font color='black'>[Master Clock] started at {origin}, speed {self.clock.rate}x, tick={self.clock.timer.interval()}ms</font>")
     
     def pause_all(self):
         self.log_html("<font color='black'>[Pause All]</font>")
+        self.clock.stop()
         for it in self.video_items:
-            it.pause_video()
+            it.play_clock.stop(report=False)
+    
+    def on_speed_changed(self, text):
+        rate = int(text.rstrip("x"))
+        self.clock.set_rate(rate)
+        for it in self.video_items:
+            it.play_clock.set_rate(rate)
+        self.log_html(f"<font color='black'>[Speed] Playback at {rate}x</font>")
+
+    def log_playback_stats(self):
+        for it in self.video_items:
+            if not it.video_path:
+                continue
+            st = it.cache_stats()
+            lookups = st["hits"] + st["misses"]
+            rate = 100.0 * st["hits"] / lookups if lookups else 0.0
+            self.log_html(f"<font color='black'>[Frame Cache] {it.video_path}: hits={st['hits']}, "
+                          f"misses={st['misses']} ({rate:.0f}% hit), {st['frames']} frames, "
+                          f"{st['bytes'] / 1e6:.0f} MB</font>")
+            sk = it.seek_stats()
+            if sk and sk["seeks"]:
+                gop = f", longest GOP {it.keyframes.max_gop()}" if it.keyframes else ""
+                self.log_html(f"<font color='black'>[Seeks] {it.video_path}: {sk['seeks']} seeks "
+                              f"({sk['inexact']} corrected via keyframe), mean {sk['mean_ms']:.1f} ms, "
+                              f"max {sk['max_ms']:.1f} ms, max {sk['max_frames']} frames decoded "
+                              f"forward{gop}</font>")
+        st = frame_cache().stats()
+        self.log_html(f"<font color='black'>[Frame Cache] total: {st['frames']} frames, "
+                      f"{st['bytes'] / 1e6:.0f} / {st['budget'] / 1e6:.0f} MB</font>")
+    
+    def show_perf_panel(self):
+        if self.perf_panel is None:
+            self.perf_panel = PerfPanel(lambda: self.video_items,
+                                        log_func=lambda html: self.log_html(html, source="Performance"),
+                                        parent=self)
+        self.perf_panel.show()
+        self.perf_panel.raise_()
+    
+    def resync_clock(self):
+        # After a global reposition the clock restarts from the new frames.
+        if self.clock.is_running():
+            self.clock.resync(self.video_items)
     
     def fast_forward_all(self):
         steps = self.spin_offset_global.value()  # Using the global offset spinbox
         self.log_html(f"<font color='black'>[Fast-forward All] +{steps} frames</font>")
         for it in self.video_items:
             it.show_frame(it.current_frame + steps)
+        self.resync_clock()
     
     def rewind_all(self):
         steps = self.spin_offset_global.value()
         self.log_html(f"<font color='black'>[Rewind All] -{steps} frames</font>")
         for it in self.video_items:
             it.show_frame(it.current_frame - steps)
+        self.resync_clock()
+    
+    def on_format_changed(self, fmt):
+        _, (lo, hi), default = IMAGE_FORMATS[fmt]
+        self.spin_level.blockSignals(True)
+        self.spin_level.setRange(lo, hi)
+        self.spin_level.setValue(default)
+        self.spin_level.setEnabled(hi > lo)
+        self.spin_level.blockSignals(False)
+        screenshot_writer().set_format(fmt, default)
+    
+    def on_level_changed(self, level):
+        screenshot_writer().set_format(self.combo_format.currentText(), level)
     
     def snapshot_all(self, times=1):
         interval = self.spin_intv.value()
         self.log_html(f"<font color='black'>[Multi-screenshot] times={times}, interval={interval} frames</font>")
-        for _ in range(times):
-            for it in self.video_items:
-                it.screenshot()
-                it.show_frame(it.current_frame + interval)
-        self.log_html(f"<font color='#006400'>[Multi-screenshot finished] {times} times, interval={interval} frames</font>")
+        writer = screenshot_writer()
+        batch = writer.begin_batch(f"Multi-screenshot {times}x, interval={interval} frames",
+                                   lambda html: self.log_html(html, source="Screenshots"))
+        # One forward decode per camera, all cameras in parallel, no preview rendering.
+        ready = [it for it in self.video_items if it.decoder]
+        writer.start_burst([it.burst_job(times, interval) for it in ready], batch)
+        for it in ready:
+            it.show_frame(it.current_frame + times * interval)
+        self.resync_clock()
     
+    def export_mosaic(self):
+        """
+        Writes all cameras with a time mapping, from the Global Jump Time to Export Until,
+        as one mosaic video (MosaicExportThread); clicking again cancels the export.
+        """
+        if self.export_thread is not None:
+            self.export_thread.cancel()
+            self.log_html("<font color='black'>[Export] Cancelling...</font>")
+            return
+        try:
+            start = datetime.strptime(self.input_global_jump.text().strip(), "%Y-%m-%d %H:%M:%S")
+            end = datetime.strptime(self.input_export_end.text().strip(), "%Y-%m-%d %H:%M:%S")
+        except ValueError:
+            self.log_html("<font color='red'>[Export] Time format incorrect!</font>")
+            return
+        if end <= start:
+            self.log_html("<font color='red'>[Export] Export Until must be after the Global Jump Time</font>")
+            return
+        sources = [ExportSource(self.camera_name(it),
+                                VideoTiming(it.video_path, it.total_frames, it.fps, it.start_time,
+                                            it.end_time, it.ts_index))
+                   for it in self.video_items
+                   if it.video_path and it.start_time and it.end_time and it.total_frames > 0]
+        if not sources:
+            self.log_html("<font color='red'>[Export] No camera has a time mapping</font>")
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Export Mosaic", f"mosaic_{start.strftime('%Y%m%d_%H%M%S')}.mp4",
+                                              "Videos (*.mp4 *.avi);;All Files (*)")
+        if path:
+            self.start_export(sources, start, end, path)
+
+    def start_export(self, sources, start, end, path):
+        cols = self.spin_mosaic_cols.value() if self.btn_mosaic.isChecked() else None
+        th = MosaicExportThread(sources, start, end, path, cols=cols)
+        th.progress.connect(self.on_export_progress)
+        th.done.connect(self.on_mosaic_exported)
+        th.failed.connect(self.on_export_failed)
+        self.export_thread = th
+        self.export_logged = 0
+        self.btn_export.setText("Cancel Export")
+        self.log_html(f"<font color='black'>[Export] {len(sources)} camera(s), {start} ~ {end} -> {path}</font>")
+        th.start()
+
+    def on_export_progress(self, done, total):
+        tenths = done * 10 // max(1, total)
+        if tenths > self.export_logged:
+            self.export_logged = tenths
+            self.log_html(f"<font color='black'>[Export] {done}/{total} frames</font>", source="Export")
+
+    def on_mosaic_exported(self, path, stats, secs):
+        self.export_thread = None
+        self.btn_export.setText("Export Mosaic")
+        w, h = stats["size"]
+        complete = stats["frames"] == stats["total"]
+        skipped = f"; skipped {', '.join(stats['skipped'])} (unreadable)" if stats["skipped"] else ""
+        self.log_html(f"<font color='{'#006400' if complete else 'red'}'>[Export] {stats['frames']}/{stats['total']} "
+                      f"frames{'' if complete else ' (cancelled)'}, {w}x{h}, in {stats['secs']:.1f}s: "
+                      f"{path}{skipped}</font>")
+
+    def on_export_failed(self, path, message):
+        self.export_thread = None
+        self.btn_export.setText("Export Mosaic")
+        self.log_html(f"<font color='red'>[Export] Failed: {message}</font>")
+
     def jump_all_to_time(self):
         t_str = self.input_global_jump.text().strip()
         try:
@@ -180,16 +617,236 @@ class MultiVideoPlayerWindow(QMainWindow):
         except ValueError:
             self.log_html("<font color='red'>Global Jump: Time format incorrect!</font>")
             return
+        self.jump_all_to(target_dt)
+
+    def jump_all_to(self, target_dt, reason=""):
+        """
+        Moves every camera with a time mapping to target_dt and opens the ones positioned.
+        """
+        t_str = target_dt.strftime("%Y-%m-%d %H:%M:%S")
+        worst = None
+        targets = []
         for it in self.video_items:
             if it.start_time and it.end_time:
-                total_secs = (it.end_time - it.start_time).total_seconds()
-                if total_secs <= 0:
+                fidx, error, gap = it.locate_time(target_dt)
+                if fidx is None:
                     it.log_red("Invalid time range!")
                     continue
-                delta_secs = (target_dt - it.start_time).total_seconds()
-                ratio = delta_secs / total_secs
-                ratio = max(0, min(1, ratio))
-                fidx = int(ratio * it.total_frames)
                 it.show_frame(fidx)
-                it.log_black(f"Global Jump: {t_str} -> frame={fidx}")
-        self.log_html(f"<font color='black'>Global jump executed for time: {t_str}</font>")
+                targets.append(it)
+                it.log_black(f"Global Jump: {t_str} -> frame={fidx} ({describe_location(error, gap)})")
+                if error is not None and (worst is None or error > worst[0]):
+                    worst = (error, it.remark_name or os.path.basename(it.video_path))
+        closed = self.open_jump_targets(targets)
+        self.resync_clock()
+        spread = f", largest expected error ±{worst[0]:.2f}s ({worst[1]})" if worst else ""
+        note = f"; {closed} video(s) left closed by the handle limit (positioned, open on view)" if closed else ""
+        self.log_html(f"<font color='black'>Global jump executed for time: {t_str}{reason}{spread}{note}</font>")
+
+    def open_jump_targets(self, targets):
+        """
+        Opens the cameras a global jump positioned, visible ones first, without closing
+        visible cameras or other targets. Returns how many stayed closed.
+        """
+        protected = set(self.visible_items())
+        closed = 0
+        for it in sorted(targets, key=lambda it: it not in protected):
+            protected.add(it)
+            if not it.open_capture(protected):
+                closed += 1
+        return closed
+
+    # ---------- Activity events ----------
+    def index_activity(self):
+        """
+        Builds the activity index of every video that has none (closed ones included);
+        the videos are indexed in parallel by the shared motion pool.
+        """
+        started = 0
+        for it in self.video_items:
+            if it.video_path and not it.ensure_motion() and not it.motion_indexing:
+                it.start_motion_index()
+                started += 1
+        self.log_html(f"<font color='black'>[Activity] Indexing {started} video(s) in the background</font>")
+
+    def reference_time(self):
+        """
+        The time all cameras are at: the master clock's while playing, otherwise the
+        current frame's time of the first camera with a time mapping.
+        """
+        if self.clock.is_running():
+            return self.clock.current_time()
+        for it in self.video_items:
+            t = it.frame_to_time(it.current_frame)
+            if t is not None:
+                return t
+        return None
+
+    def jump_to_event(self, forward=True):
+        """
+        Jumps all cameras to the nearest activity event after (or before) the current
+        time on any camera. Without time mappings each camera moves to its own next event.
+        """
+        direction = "Next" if forward else "Previous"
+        indexed = [it for it in self.video_items if it.ensure_motion()]
+        if not indexed:
+            self.log_html("<font color='red'>[Activity] No activity index yet (use Index Activity)</font>")
+            return
+        ref = self.reference_time()
+        if ref is None:
+            moved = 0
+            for it in indexed:
+                margin = it.motion.step
+                f = it.motion.next_event(it.current_frame + margin) if forward else \
+                    it.motion.previous_event(it.current_frame - margin)
+                if f is not None:
+                    it.show_frame(f)
+                    moved += 1
+            self.resync_clock()
+            self.log_html(f"<font color='black'>[Activity] {direction} event: {moved} camera(s) moved "
+                          f"to their own events (no time mapping)</font>")
+            return
+        best = None
+        for it in indexed:
+            frame = it.time_to_frame(ref)
+            if frame is None:
+                continue
+            # One sample of margin, so the event just jumped to is not found again.
+            margin = it.motion.step
+            f = it.motion.next_event(frame + margin) if forward else it.motion.previous_event(frame - margin)
+            t = it.frame_to_time(f) if f is not None else None
+            if t is None:
+                continue
+            if best is None or (t < best[0] if forward else t > best[0]):
+                best = (t, it, f)
+        if best is None:
+            self.log_html(f"<font color='black'>[Activity] No {direction.lower()} event on any camera</font>")
+            return
+        t, it, f = best
+        name = it.remark_name or os.path.basename(it.video_path)
+        _, end, peak = it.motion.event_at(f) or (f, f, it.motion.activity_at(f))
+        secs = (end - f) / (it.fps if it.fps > 0 else 25)
+        self.jump_all_to(t, f" ({direction.lower()} event on {name}: {secs:.1f}s, peak {peak:.1%} of pixels)")
+
+    # ---------- Motion alignment ----------
+    def align_cameras(self, targets=None, index_missing=True):
+        """
+        Estimates the time mapping of targets (default: the cameras without one) from
+        their activity signatures aligned to the cameras with a clock (utils.alignment).
+        Activity indexes still missing are built first; the alignment runs once they are.
+        The signatures are correlated by a MotionAlignThread; on_cameras_aligned applies
+        the result.
+        """
+        if self.align_thread is not None:
+            self.log_html("<font color='black'>[Alignment] Already running</font>")
+            return
+        items = [it for it in self.video_items if it.video_path]
+        if targets is None:
+            targets = [it for it in items if not (it.start_time and it.end_time)]
+        if not targets:
+            self.log_html("<font color='black'>[Alignment] Every camera has a time mapping "
+                          "(use Align by Motion on a camera to realign it)</font>")
+            return
+        missing = [it for it in items if not it.ensure_motion()]
+        if missing and index_missing:
+            for it in missing:
+                if not it.motion_indexing:
+                    it.start_motion_index()
+            self.pending_alignment = targets
+            self.align_timer.start()
+            self.log_html(f"<font color='black'>[Alignment] Indexing the activity of {len(missing)} "
+                          f"video(s) first; the cameras are aligned when it finishes</font>")
+            return
+        indexed = [it for it in items if it.motion is not None]
+        among = {i for i, it in enumerate(indexed) if it in targets}
+        if not among:
+            self.log_html("<font color='red'>[Alignment] No activity index for the cameras to align</font>")
+            return
+        th = MotionAlignThread([it.motion for it in indexed], among)
+        th.done.connect(lambda _, pairs, secs: self.on_cameras_aligned(indexed, targets, pairs, secs))
+        th.failed.connect(lambda _, error: self.on_alignment_failed(error))
+        self.align_thread = th
+        th.start()
+
+    def check_pending_alignment(self):
+        if any(it.motion_indexing for it in self.video_items):
+            return
+        self.align_timer.stop()
+        targets, self.pending_alignment = self.pending_alignment, None
+        targets = [it for it in targets or [] if it in self.video_items]
+        if targets:
+            self.align_cameras(targets, index_missing=False)
+
+    def on_alignment_failed(self, error):
+        self.align_thread = None
+        self.log_html(f"<font color='red'>[Alignment] Failed: {error}</font>")
+
+    def on_cameras_aligned(self, indexed, targets, pairs, secs):
+        """
+        Places the targets through the most confident chains of pairwise alignments from
+        the cameras with a clock and sets their time mappings.
+        """
+        self.align_thread = None
+        # Cameras deleted meanwhile take part in neither role.
+        present = set(self.video_items)
+        targets = [it for it in targets if it in present]
+        anchors = [i for i, it in enumerate(indexed)
+                   if it in present and it not in targets and it.start_time and it.end_time]
+        if not anchors:
+            anchors = self.anchor_without_clock(indexed, pairs, present)
+            if not anchors:
+                return
+            targets = [it for it in targets if it is not indexed[anchors[0]]]
+        placed = solve_offsets(len(indexed), pairs, anchors)
+        aligned = 0
+        # placed is in solving order: every camera comes after the one it is placed from.
+        for i, (parent, offset, confidence) in placed.items():
+            it = indexed[i]
+            if it not in targets:
+                continue
+            ref = indexed[parent]
+            start = ref.time_at(offset)
+            if start is None:
+                continue
+            how = f"starts at {offset:+.2f}s of {self.camera_name(ref)}, confidence {confidence:.0%}"
+            if it.apply_estimated_times(start, how):
+                aligned += 1
+        reached = {indexed[i] for i in list(placed) + anchors}
+        unplaced = [it for it in targets if it not in reached]
+        for it in unplaced:
+            it.log_red("Motion alignment: no confident match with a camera that has a time mapping "
+                       "(the cameras need overlapping views and shared activity)")
+        self.log_html(f"<font color='{'#006400' if aligned else 'red'}'>[Alignment] {aligned} of "
+                      f"{len(targets)} camera(s) aligned, {len(unplaced)} without a confident match; "
+                      f"{len(pairs)} camera pairs correlated in {secs:.2f}s</font>")
+        if aligned:
+            ref_time = self.reference_time()
+            if ref_time is not None:
+                self.jump_all_to(ref_time, " (after motion alignment)")
+
+    def anchor_without_clock(self, indexed, pairs, present):
+        """
+        With no camera on a clock, the best connected one keeps the start time typed in its
+        Start field and the others are aligned to it. Returns [its number], or [].
+        """
+        strength = [sum(al.confidence for (a, b), al in pairs.items()
+                        if i in (a, b) and al.confidence >= MIN_CONFIDENCE) if it in present else 0
+                    for i, it in enumerate(indexed)]
+        if not strength or max(strength) <= 0:
+            self.log_html("<font color='red'>[Alignment] No two cameras could be aligned "
+                          "(overlapping views and shared activity are needed)</font>")
+            return []
+        i = strength.index(max(strength))
+        it = indexed[i]
+        try:
+            start = datetime.strptime(it.input_start_time.text().strip(), "%Y-%m-%d %H:%M:%S")
+        except ValueError:
+            it.log_red("Time format error (YYYY-MM-DD HH:MM:SS)")
+            return []
+        if not it.apply_estimated_times(start, "reference camera (no camera has a clock): "
+                                               "start taken from its Start field"):
+            return []
+        return [i]
+
+    def camera_name(self, item):
+        return item.remark_name or os.path.basename(item.video_path)
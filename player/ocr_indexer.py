@@ -0,0 +1,77 @@
+# player/ocr_indexer.py
+
+import time
+from concurrent.futures.process import BrokenProcessPool
+from PyQt5.QtCore import QThread, pyqtSignal
+from utils.index_pool import reset_index_pool
+from utils.ocr_index import build_index, save_index
+
+class BackgroundTask(QThread):
+    """
+    Runs func(*args) off the GUI thread and reports done(key, result, seconds) or
+    failed(key, error message); key tells the receiver which job it was (e.g. the video
+    path). A broken index pool (utils.index_pool) is reset, so the next task gets a new one.
+
+    Tasks are kept alive in `active` until they finish, so deleting the widget that
+    started one does not destroy a running QThread; cancel_all/wait_all end them on exit.
+    """
+    done = pyqtSignal(object, object, float)  # key, result, seconds
+    failed = pyqtSignal(object, str)  # key, error message
+
+    active = set()
+
+    def __init__(self, func, *args, key=None):
+        super().__init__()
+        self.func = func
+        self.args = args
+        self.key = key
+        self.running = True
+        BackgroundTask.active.add(self)
+        self.finished.connect(lambda: BackgroundTask.active.discard(self))
+
+    def cancel(self):
+        """
+        Asks the task to stop; only tasks whose func checks `running` stop early.
+        """
+        self.running = False
+
+    def run(self):
+        t0 = time.perf_counter()
+        try:
+            result = self.func(*self.args)
+        except BrokenProcessPool as e:
+            reset_index_pool()
+            self.failed.emit(self.key, f"worker process died ({e})")
+            return
+        except Exception as e:
+            self.failed.emit(self.key, str(e))
+            return
+        self.done.emit(self.key, result, time.perf_counter() - t0)
+
+    @classmethod
+    def cancel_all(cls):
+        for task in list(cls.active):
+            task.cancel()
+
+    @classmethod
+    def wait_all(cls):
+        for task in list(cls.active):
+            task.wait()
+
+
+def build_and_save_index(video_path):
+    index = build_index(video_path)
+    if len(index):
+        save_index(video_path, index)
+    return index
+
+
+class OcrIndexThread(BackgroundTask):
+    """
+    Builds (and caches) the OCR timestamp index of one video off the GUI thread.
+    The OCR itself runs on the shared index pool (utils.index_pool) inside
+    utils.ocr_index.build_index.
+    """
+    def __init__(self, video_path):
+        super().__init__(build_and_save_index, video_path, key=video_path)
+        self.video_path = video_path
@@ -0,0 +1,182 @@
+# player/perf_panel.py
+
+import os
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QFont
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QCheckBox, QPushButton, QLabel, QTableWidget,
+    QTableWidgetItem, QPlainTextEdit, QFileDialog, QHeaderView
+)
+from player.screenshot_writer import screenshot_writer
+from utils.frame_cache import frame_cache
+from utils.perf_stats import HISTOGRAM_EDGES_MS, STAGES, perf_stats, write_csv, write_json
+
+REFRESH_MS = 500
+FIXED_COLUMNS = ["Camera", "FPS", "Dropped", "Ring", "Cache MB"]
+HISTOGRAM_BAR = 40
+
+
+class PerfPanel(QDialog):
+    """
+    Live view of utils.perf_stats: one row per camera with its effective (displayed) fps,
+    dropped frames, decoder ring depth, cached memory and p50/p95 of every stage; the
+    rolling histograms of the selected camera below. Recording is only on while "Record
+    timings" is checked, so the hooks cost next to nothing otherwise.
+
+    items_func returns the current VideoItems; their queue depths are sampled into the
+    stats as gauges on every refresh (and thus exported too).
+    """
+    def __init__(self, items_func, log_func=None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Performance")
+        self.resize(1100, 520)
+        self.items_func = items_func
+        self.log_func = log_func if log_func else (lambda msg: None)
+        self.stats = perf_stats()
+
+        self.check_record = QCheckBox("Record timings")
+        self.check_record.setChecked(self.stats.enabled)
+        self.check_record.toggled.connect(self.on_record_toggled)
+        self.btn_reset = QPushButton("Reset")
+        self.btn_reset.clicked.connect(self.reset)
+        self.btn_csv = QPushButton("Export CSV")
+        self.btn_csv.clicked.connect(lambda: self.export("csv"))
+        self.btn_json = QPushButton("Export JSON")
+        self.btn_json.clicked.connect(lambda: self.export("json"))
+        self.label_totals = QLabel()
+
+        self.table = QTableWidget(0, len(FIXED_COLUMNS) + len(STAGES))
+        self.table.setHorizontalHeaderLabels(FIXED_COLUMNS + [f"{s} p50/p95 ms" for s in STAGES])
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.table.setSelectionMode(QTableWidget.SingleSelection)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.itemSelectionChanged.connect(self.refresh)
+
+        self.histograms = QPlainTextEdit()
+        self.histograms.setReadOnly(True)
+        self.histograms.setFont(QFont("Monospace"))
+
+        buttons = QHBoxLayout()
+        buttons.addWidget(self.check_record)
+        buttons.addWidget(self.btn_reset)
+        buttons.addWidget(self.btn_csv)
+        buttons.addWidget(self.btn_json)
+        buttons.addStretch()
+        buttons.addWidget(self.label_totals)
+        layout = QVBoxLayout(self)
+        layout.addLayout(buttons)
+        layout.addWidget(self.table, 2)
+        layout.addWidget(self.histograms, 1)
+
+        self.sources = []  # Row -> video path
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self.timer.start(REFRESH_MS)
+
+    def hideEvent(self, event):
+        self.timer.stop()
+        super().hideEvent(event)
+
+    def on_record_toggled(self, checked):
+        self.stats.set_enabled(checked)
+        self.log_func(f"<font color='black'>[Performance] Recording {'on' if checked else 'off'}</font>")
+
+    def reset(self):
+        self.stats.reset()
+        self.refresh()
+
+    def sample_gauges(self):
+        for it in self.items_func():
+            if not it.video_path:
+                continue
+            decoder = it.decoder
+            ring = len(decoder.ring) if decoder else 0
+            capacity = decoder.ring.maxlen if decoder else 0
+            self.stats.set_gauges(it.video_path, {
+                "ring_depth": ring,
+                "ring_capacity": capacity,
+                "cache_mb": round(it.cache_stats()["bytes"] / 1e6, 1),
+                "current_frame": it.current_frame,
+            })
+
+    def refresh(self):
+        self.sample_gauges()
+        snap = self.stats.snapshot()
+        items = [it for it in self.items_func() if it.video_path]
+        names = {it.video_path: it.remark_name or os.path.basename(it.video_path) for it in items}
+        selected = self.selected_source()
+        self.sources = [it.video_path for it in items]
+        self.table.setRowCount(len(self.sources))
+        for row, source in enumerate(self.sources):
+            data = snap["sources"].get(source, {"stages": {}, "counters": {}, "gauges": {}})
+            stages, gauges = data["stages"], data["gauges"]
+            paint = stages.get("paint", {})
+            cells = [
+                names[source],
+                f"{paint.get('rate_per_s', 0):.1f}",
+                str(data["counters"].get("dropped", 0)),
+                f"{gauges.get('ring_depth', 0)}/{gauges.get('ring_capacity', 0)}",
+                f"{gauges.get('cache_mb', 0):.0f}",
+            ]
+            for stage in STAGES:
+                st = stages.get(stage)
+                cells.append(f"{st['p50_ms']:.1f} / {st['p95_ms']:.1f} ({st['count']})" if st and "p50_ms" in st else "-")
+            for col, text in enumerate(cells):
+                cell = QTableWidgetItem(text)
+                if col:
+                    cell.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.table.setItem(row, col, cell)
+        if selected in self.sources and self.selected_source() != selected:
+            self.table.blockSignals(True)
+            self.table.selectRow(self.sources.index(selected))
+            self.table.blockSignals(False)
+        writer = screenshot_writer()
+        cache = frame_cache().stats()
+        self.label_totals.setText(f"Screenshot queue: {writer.pending}   Frame cache: "
+                                  f"{cache['bytes'] / 1e6:.0f} / {cache['budget'] / 1e6:.0f} MB")
+        self.show_histograms(snap, self.selected_source())
+
+    def selected_source(self):
+        rows = self.table.selectionModel().selectedRows()
+        if not rows or rows[0].row() >= len(self.sources):
+            return None
+        return self.sources[rows[0].row()]
+
+    def show_histograms(self, snap, source):
+        if source is None:
+            self.histograms.setPlainText("Select a camera to see its rolling histograms.")
+            return
+        stages = snap["sources"].get(source, {}).get("stages", {})
+        edges = [f"<{e}" for e in HISTOGRAM_EDGES_MS] + [f">={HISTOGRAM_EDGES_MS[-1]}"]
+        lines = [source]
+        for stage in STAGES:
+            counts = stages.get(stage, {}).get("histogram")
+            if not counts:
+                continue
+            peak = max(counts)
+            lines.append(f"{stage} (last {sum(counts)}, ms):")
+            for edge, n in zip(edges, counts):
+                if n:
+                    lines.append(f"  {edge:>7} {'#' * max(1, n * HISTOGRAM_BAR // peak):<{HISTOGRAM_BAR}} {n}")
+        if len(lines) == 1:
+            lines.append("No timings recorded (enable \"Record timings\").")
+        self.histograms.setPlainText("\n".join(lines))
+
+    def export(self, kind):
+        path, _ = QFileDialog.getSaveFileName(self, "Export Performance Stats", f"perf_stats.{kind}",
+                                              f"{kind.upper()} Files (*.{kind});;All Files (*)")
+        if not path:
+            return
+        self.sample_gauges()
+        snap = self.stats.snapshot()
+        try:
+            (write_csv if kind == "csv" else write_json)(path, snap)
+        except OSError as e:
+            self.log_func(f"<font color='red'>[Performance] Export failed: {e}</font>")
+            return
+        self.log_func(f"<font color='#006400'>[Performance] Exported {len(snap['sources'])} source(s) to {path}</font>")
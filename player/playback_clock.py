@@ -0,0 +1,189 @@
+# player/playback_clock.py
+
+import time
+from datetime import timedelta
+from PyQt5.QtCore import Qt, QObject, QTimer
+from utils.perf_stats import perf_stats
+from utils.video_reader import SEEK_BACKOFF_FRAMES
+
+# Playback speeds offered for review (multiples of real time).
+REVIEW_SPEEDS = (1, 2, 4, 8, 16, 32)
+# Frames shown per second and camera while reviewing faster than real time.
+REVIEW_DISPLAY_FPS = 15
+
+def review_plan(rate, fps, keyframes=None):
+    """
+    (step, keyframe_seeks) for FrameDecoder.set_review at rate times real time: every
+    step-th frame is shown and the ones in between only grabbed, or, once grabbing a
+    step costs more decodes than a seek (SEEK_BACKOFF_FRAMES + 1), the decoder seeks
+    past them instead.
+    """
+    if rate <= 1:
+        return 1, False
+    step = max(1, int(round(rate * (fps if fps > 0 else 25) / REVIEW_DISPLAY_FPS)))
+    has_keyframes = keyframes is not None and keyframes.has_keyframes()
+    return step, has_keyframes and step > SEEK_BACKOFF_FRAMES + 1
+
+class MasterClock(QObject):
+    """
+    Single playback clock shared by a group of VideoItems.
+
+    The clock runs in OCR/wall-clock time: on start it takes the time of the first item
+    that has a time mapping as its origin, and on every tick each item is moved to the
+    frame that is due at "origin + elapsed". Items without a time mapping advance by
+    elapsed * fps from their current frame. If a decoder lags, the due frame simply moves
+    on and the frames in between are skipped; those skips are counted per camera and
+    reported when the clock stops.
+
+    At a rate above 1 (set_rate) the clock runs that many times faster and the items'
+    decoders switch to review playback (review_plan): each item shows the latest decoded
+    frame at or before its due frame, so the cameras stay in step while most frames are
+    never decoded. Instead of drops, the frames shown per second are reported.
+    """
+    def __init__(self, log_func=None, parent=None):
+        super().__init__(parent)
+        self.log_func = log_func if log_func else (lambda msg: None)
+        self.items = []
+        self.origin_time = None
+        self.origin_wall = 0.0
+        self.base_frames = {}
+        self.last_shown = {}
+        self.dropped = {}
+        self.rate = 1
+        self.shown = {}  # Frames displayed per item since the last rate change.
+        self.shown_since = 0.0
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self.on_tick)
+
+    def is_running(self):
+        return self.timer.isActive()
+
+    def start(self, items):
+        self.stop(report=False)
+        self.items = [it for it in items if it.decoder]
+        if not self.items:
+            return False
+        self.dropped = {it: 0 for it in self.items}
+        self.shown = {it: 0 for it in self.items}
+        self.shown_since = time.monotonic()
+        self.set_playing(self.items, True)
+        self.resync()
+        frame_ms = min(1000.0 / it.fps if it.fps > 0 else 40.0 for it in self.items)
+        self.timer.start(int(max(5, min(40, frame_ms / 2))))
+        return True
+
+    def resync(self, items=None):
+        """
+        Re-anchors the clock on the items' current frames (after a jump/seek), keeping
+        the drop counters.
+        """
+        if items is not None:
+            self.set_playing([it for it in self.items if it not in items], False)
+            self.items = [it for it in items if it.decoder]
+            self.set_playing(self.items, self.timer.isActive())
+            self.dropped = {it: self.dropped.get(it, 0) for it in self.items}
+            self.shown = {it: self.shown.get(it, 0) for it in self.items}
+        self.origin_time = None
+        for it in self.items:
+            t = it.frame_to_time(it.current_frame)
+            if t is not None:
+                self.origin_time = t
+                break
+        self.base_frames = {it: it.current_frame for it in self.items}
+        self.last_shown = {it: it.current_frame for it in self.items}
+        self.origin_wall = time.monotonic()
+
+    def set_rate(self, rate):
+        """
+        Changes the playback speed; a running clock continues from the current frames.
+        """
+        if rate == self.rate:
+            return
+        running = self.timer.isActive()
+        if running and self.rate > 1:
+            self.report_shown()
+        self.rate = rate
+        if running:
+            self.set_playing(self.items, True)
+            self.resync()
+            self.shown = {it: 0 for it in self.items}
+            self.shown_since = time.monotonic()
+
+    def stop(self, report=True):
+        if not self.timer.isActive():
+            return
+        self.timer.stop()
+        self.set_playing(self.items, False)
+        if self.rate > 1:
+            # Review frames are approximate; land on the exact frame of the playhead.
+            for it in self.items:
+                it.show_frame(it.current_frame)
+        if report:
+            if self.rate > 1:
+                self.report_shown()
+            else:
+                self.report_drops()
+
+    def set_playing(self, items, playing):
+        for it in items:
+            if it.decoder:
+                it.decoder.set_playing(playing)
+                rate = self.rate if playing else 1
+                it.decoder.set_review(*review_plan(rate, it.fps, it.keyframes))
+
+    def elapsed(self):
+        """
+        Video seconds played since the origin (wall seconds times the rate).
+        """
+        return (time.monotonic() - self.origin_wall) * self.rate
+
+    def current_time(self):
+        """
+        Master clock position in OCR time, or None if no item has a time mapping.
+        """
+        if self.origin_time is None:
+            return None
+        return self.origin_time + timedelta(seconds=self.elapsed())
+
+    def due_frame(self, item, elapsed):
+        if self.origin_time is not None:
+            fidx = item.time_to_frame(self.origin_time + timedelta(seconds=elapsed))
+            if fidx is not None:
+                return fidx
+        fps = item.fps if item.fps > 0 else 25
+        return self.base_frames[item] + int(elapsed * fps)
+
+    def on_tick(self):
+        elapsed = self.elapsed()
+        finished = True
+        for it in self.items:
+            shown = it.orig_frame_idx
+            if self.rate <= 1 and shown > self.last_shown[it] + 1:
+                self.dropped[it] += shown - self.last_shown[it] - 1
+                perf_stats().count(it.video_path, "dropped", shown - self.last_shown[it] - 1)
+            if shown > self.last_shown[it]:
+                self.last_shown[it] = shown
+                self.shown[it] += 1
+            due = min(self.due_frame(it, elapsed), it.total_frames - 1)
+            # Review playback shows frames on its own grid, which may miss the last one.
+            if due < it.total_frames - 1 or (shown < due and self.rate <= 1):
+                finished = False
+            if due != it.current_frame or self.rate > 1:
+                it.show_frame(due)
+        if finished:
+            self.stop()
+
+    def drop_counts(self):
+        return {it: self.dropped.get(it, 0) for it in self.items}
+
+    def report_shown(self):
+        secs = max(1e-6, time.monotonic() - self.shown_since)
+        for it, n in self.shown.items():
+            self.log_func(f"<font color='black'>[Clock] Review at {self.rate}x: {n / secs:.1f} frames/s "
+                          f"shown, video={it.video_path}</font>")
+
+    def report_drops(self):
+        for it, n in self.drop_counts().items():
+            color = "red" if n else "#006400"
+            self.log_func(f"<font color='{color}'>[Clock] Dropped frames: {n}, video={it.video_path}</font>")
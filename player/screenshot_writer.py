@@ -0,0 +1,200 @@
+# player/screenshot_writer.py
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+from PyQt5.QtCore import QObject, pyqtSignal
+from utils.frame_extract import run_jobs
+from utils.image_formats import DEFAULT_FORMAT, IMAGE_FORMATS, encode_params
+from utils.perf_stats import perf_stats
+
+# Frames queued or being encoded before submit() drops (GUI) or blocks (burst) further frames.
+MAX_PENDING = 32
+
+
+class ScreenshotBatch:
+    """
+    Bookkeeping for one user action (a single screenshot, a multi-screenshot, a burst).
+    The report is logged once every queued file of a closed batch has been written.
+    """
+    def __init__(self, label, fmt, level, log_func):
+        self.label = label
+        self.fmt = fmt
+        self.level = level
+        self.log_func = log_func
+        self.started = time.perf_counter()
+        self.lock = threading.Lock()
+        self.queued = 0
+        self.written = 0
+        self.failed = 0
+        self.bytes = 0
+        self.closed = False
+        self.last_path = None
+
+    def is_done(self):
+        return self.closed and self.written + self.failed == self.queued
+
+    def report_html(self):
+        secs = time.perf_counter() - self.started
+        level = "" if self.fmt == "WebP (lossless)" else f" level {self.level}"
+        color = "red" if self.failed else "#006400"
+        where = f", last: {self.last_path}" if self.last_path else ""
+        return (f"<font color='{color}'>[Screenshots] {self.label}: {self.written} written, "
+                f"{self.failed} failed ({self.fmt}{level}), {self.bytes / 1e6:.1f} MB "
+                f"in {secs:.2f}s{where}</font>")
+
+
+class ScreenshotWriter(QObject):
+    """
+    Screenshot export service: callers hand over a frame copy and a path; encoding and
+    writing run on a thread pool (cv2.imwrite releases the GIL). At most MAX_PENDING
+    frames are in flight; the GUI thread never waits for a slot (see submit).
+    """
+    batch_done = pyqtSignal(object)  # ScreenshotBatch, delivered on the GUI thread
+
+    def __init__(self, workers=None, max_pending=MAX_PENDING, parent=None):
+        super().__init__(parent)
+        self.pool = ThreadPoolExecutor(max_workers=workers or max(2, os.cpu_count() or 1),
+                                       thread_name_prefix="screenshot")
+        self.max_pending = max_pending
+        self.slots = threading.BoundedSemaphore(max_pending)
+        self.lock = threading.Lock()
+        self.pending = 0  # Frames queued or being written.
+        self.perf = perf_stats()
+        self.fmt = DEFAULT_FORMAT
+        self.level = IMAGE_FORMATS[DEFAULT_FORMAT][2]
+        self.batch_done.connect(self._report)
+
+    def set_format(self, fmt, level=None):
+        if fmt not in IMAGE_FORMATS:
+            raise ValueError(f"Unknown image format: {fmt}")
+        self.fmt = fmt
+        lo, hi = IMAGE_FORMATS[fmt][1]
+        self.level = IMAGE_FORMATS[fmt][2] if level is None else max(lo, min(hi, int(level)))
+
+    def extension(self):
+        return IMAGE_FORMATS[self.fmt][0]
+
+    def begin_batch(self, label, log_func=None):
+        return ScreenshotBatch(label, self.fmt, self.level, log_func if log_func else (lambda msg: None))
+
+    def submit(self, batch, frame, path, copy=True, source=None, block=False):
+        """
+        Queues frame to be written to path (extension should come from extension()).
+        The frame is copied unless the caller hands over ownership (copy=False). source
+        (the video path) attributes the write time in utils.perf_stats. If MAX_PENDING frames
+        (max_pending) are in flight, the screenshot is dropped (counted as failed and logged) unless block
+        is set: only background producers such as the burst thread may wait for a slot.
+        Returns whether the frame was queued.
+        """
+        if not self.slots.acquire(blocking=block):
+            with batch.lock:
+                batch.queued += 1
+                batch.failed += 1
+            batch.log_func(f"<font color='red'>[Screenshots] Writer busy ({self.max_pending} frames "
+                           f"pending), skipped {path}</font>")
+            return False
+        if copy:
+            frame = frame.copy()
+        with batch.lock:
+            batch.queued += 1
+        with self.lock:
+            self.pending += 1
+        params = encode_params(batch.fmt, batch.level)
+        self.pool.submit(self._write, batch, frame, path, params, source)
+        return True
+
+    def end_batch(self, batch):
+        with batch.lock:
+            batch.closed = True
+            done = batch.is_done()
+        if done:
+            self.batch_done.emit(batch)
+
+    def start_burst(self, jobs, batch):
+        """
+        Extracts utils.frame_extract.ExtractJobs (targets are output paths) on a background
+        thread, one forward decode per video and videos in parallel, streaming every frame
+        into this writer. Requested frames that were never handed over (video not opened,
+        frame unreadable, extraction error) count as failed. The batch is closed, and thus
+        reported, when all jobs are done.
+        """
+        def sink(job, path, frame_idx, frame):
+            # Freshly decoded frames are not shared, so no copy is needed.
+            self.submit(batch, frame, path, copy=False, source=job.video_path, block=True)
+
+        def run():
+            try:
+                delivered = run_jobs(jobs, sink)
+                for job in jobs:
+                    missing = len(job.frames) - delivered.get(job.video_path, 0)
+                    if missing:
+                        batch.log_func(f"<font color='red'>[Screenshots] {os.path.basename(job.video_path)}: "
+                                       f"{missing} of {len(job.frames)} frame(s) could not be read</font>")
+            except Exception as e:
+                batch.log_func(f"<font color='red'>[Screenshots] {batch.label}: extraction failed ({e})</font>")
+            finally:
+                requested = sum(len(job.frames) for job in jobs)
+                with batch.lock:
+                    # Frames handed to submit() are already counted in queued.
+                    batch.failed += max(0, requested - batch.queued)
+                    batch.queued = max(batch.queued, requested)
+                self.end_batch(batch)
+
+        threading.Thread(target=run, name="burst", daemon=True).start()
+
+    def _write(self, batch, frame, path, params, source):
+        ok = False
+        size = 0
+        t = self.perf.clock()
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            ok = cv2.imwrite(path, frame, params)
+            if ok:
+                size = os.path.getsize(path)
+        except Exception:
+            ok = False
+        finally:
+            self.perf.lap(source, "imwrite", t)
+            with self.lock:
+                self.pending -= 1
+            self.slots.release()
+        with batch.lock:
+            if ok:
+                batch.written += 1
+                batch.bytes += size
+                batch.last_path = path
+            else:
+                batch.failed += 1
+            done = batch.is_done()
+        if done:
+            self.batch_done.emit(batch)
+
+    def _report(self, batch):
+        batch.log_func(batch.report_html())
+
+    def shutdown(self):
+        self.pool.shutdown(wait=True)
+
+
+_writer = None
+
+def screenshot_writer():
+    """
+    Process-wide writer shared by all VideoItems (created on first use, GUI thread).
+    """
+    global _writer
+    if _writer is None:
+        _writer = ScreenshotWriter()
+    return _writer
+
+def shutdown_screenshot_writer():
+    """
+    Waits for queued screenshots to be written (on exit); a no-op if the writer was never used.
+    """
+    global _writer
+    if _writer is not None:
+        _writer.shutdown()
+        _writer = None
@@ -0,0 +1,23 @@
+# player/thumbnail_indexer.py
+
+from player.ocr_indexer import BackgroundTask
+from utils.index_pool import index_pool
+from utils.thumbnail_index import ThumbnailIndex, build_thumbnails
+
+def thumbnails_in_pool(video_path):
+    if index_pool().submit(build_thumbnails, video_path).result() is None:
+        raise IOError(f"Failed to open video: {video_path}")
+    index = ThumbnailIndex.open(video_path)
+    if index is None:
+        raise IOError("thumbnail cache unreadable")
+    return index
+
+
+class ThumbnailIndexThread(BackgroundTask):
+    """
+    Waits for the thumbnail cache of one video, written by a worker of the shared index
+    pool, and opens it.
+    """
+    def __init__(self, video_path):
+        super().__init__(thumbnails_in_pool, video_path, key=video_path)
+        self.video_path = video_path
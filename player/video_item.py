@@ -1,9 +1,9 @@
 # player/video_item.py
 
+import logging
 import os
+import time
 import cv2
-import pytesseract
-import re
 from datetime import datetime, timedelta
 from PyQt5.QtCore import Qt, QTimer, QEvent
 from PyQt5.QtGui import QImage, QPixmap
@@ -11,40 +11,29 @@ from PyQt5.QtWidgets import (
     QWidget, QLabel, QPushButton, QLineEdit, QSpinBox, QVBoxLayout,
     QHBoxLayout, QSlider, QFileDialog, QDialog
 )
+from player.activity_strip import ActivityStrip
+from player.filmstrip import FilmstripDialog, HoverPreview, slider_value_at
+from player.frame_decoder import DecodedFrame, create_decoder, frame_to_qimage
+from player.keyframe_indexer import KeyframeIndexThread
+from player.motion_indexer import MotionIndexThread
+from player.ocr_indexer import OcrIndexThread
+from player.playback_clock import MasterClock
+from player.screenshot_writer import screenshot_writer
+from player.thumbnail_indexer import ThumbnailIndexThread
+from player.video_loader import submit_load
+from utils.frame_cache import frame_cache
+from utils.frame_extract import ExtractJob, burst_frames
+from utils.motion_index import load_cached_motion
+from utils.ocr_utils import extract_time_from_roi
+from utils.perf_stats import perf_stats
+from utils.session import SessionEntry
+from utils.thumbnail_index import ThumbnailIndex
+from utils.time_sync import describe_location, first_frame_time_range, locate_time, map_frame_to_time, map_time_to_frame
+from utils.video_reader import SequentialReader
 
-def normalize_ocr_text(text):
-    # Replace various dash characters with ASCII '-' and normalize whitespace.
-    text = text.replace('—','-').replace('–','-').replace('－','-')
-    text = re.sub(r'\s+', ' ', text)
-    return text.strip()
-
-def extract_time_from_roi(frame, roi=(0, 0, 250, 40), log_func=None):
-    """
-    Attempts to extract a time string "YYYY-MM-DD HH:MM:SS" from the given ROI.
-    Logs the raw and normalized OCR text if log_func is provided.
-    """
-    x, y, w, h = roi
-    roi_frame = frame[y:y+h, x:x+w]
-    gray = cv2.cvtColor(roi_frame, cv2.COLOR_BGR2GRAY)
-    _, thresh = cv2.threshold(gray, 128, 255, cv2.THRESH_BINARY)
-    
-    text = pytesseract.image_to_string(thresh)
-    if log_func:
-        log_func(f"<font color='black'>[OCR Raw]: {repr(text)}</font>")
-    
-    text = normalize_ocr_text(text)
-    if log_func:
-        log_func(f"<font color='black'>[OCR Normalized]: {repr(text)}</font>")
-    
-    pattern = r"(\d{4}-\d{2}-\d{2}\s\d{2}:\d{2}:\d{2})"
-    match = re.search(pattern, text)
-    if match:
-        time_str = match.group(1)
-        try:
-            return datetime.strptime(time_str, "%Y-%m-%d %H:%M:%S")
-        except ValueError:
-            pass
-    return None
+# Slider/spinbox changes closer together than this count as one scrub; the exact frame is
+# decoded once they stop (or when a slider drag is released).
+SCRUB_SETTLE_MS = 150
 
 class VideoItem(QWidget):
     """
@@ -52,10 +41,10 @@ class VideoItem(QWidget):
     
     Screenshots are saved under:
        screenshots/<video_filename_without_extension>/
-    with filename: "<remark>_<frame>.png" (or "screenshot_<frame>.png" if no remark is provided).
+    with filename: "<remark>_<frame>.<ext>" (or "screenshot_<frame>.<ext>" if no remark is provided).
     
     OCR is performed on the first frame; if successful, start_time is set to the OCR result and 
-    end_time is set to start_time + 5 minutes.
+    end_time is estimated from the frame count and fps, until the OCR index replaces both.
     
     All notifications are output to the log (colored HTML) rather than via pop-up dialogs.
     
@@ -66,7 +55,8 @@ class VideoItem(QWidget):
     """
     def __init__(self, log_func=None, parent=None):
         super().__init__(parent)
-        self.log_func = log_func if log_func else (lambda msg: None)
+        # log_func(html, level=None, source=None), e.g. MultiVideoPlayerWindow.log_html.
+        self.log_func = log_func if log_func else (lambda msg, level=None, source=None: None)
 
         self.cap = None
         self.video_path = None
@@ -74,11 +64,40 @@ class VideoItem(QWidget):
         self.fps = 0
         self.total_frames = 0
         self.current_frame = 0
+        self.reader = None  # SequentialReader over cap, for one-off reads (OCR).
+        self.decoder = None
+        self.decode_backend = "Threads"  # See player.frame_decoder.DECODE_BACKENDS
+        self.frame_size = (0, 0)
         self.orig_frame = None
-        self.play_timer = None
+        self.orig_frame_idx = 0  # Frame held in orig_frame; current_frame is the requested playhead.
+        self.display_buffer = None  # Memory behind the pixmap in video_label
+        self.display_sink = None  # sink(item, DecodedFrame) replacing the preview label
+        self.render_size = None  # (w, h) frames are rendered at while a sink is set
+        self.play_clock = MasterClock(log_func=self.log_item, parent=self)
 
         self.start_time = None
         self.end_time = None
+        self.ts_index = None  # utils.ocr_index.TimestampIndex, once available
+        self.keyframes = None  # utils.keyframe_index.KeyframeIndex, once scanned
+        self.motion = None  # utils.motion_index.MotionIndex, once built
+        self.motion_indexing = False
+        self.thumbs = None  # utils.thumbnail_index.ThumbnailIndex, once cached
+        self.thumbs_indexing = False
+        self.hover_preview = None
+        self.filmstrip = None
+        self.load_token = 0  # Identifies the latest background load of this item.
+        self.load_started = 0.0
+        self.loading = False
+        self.pending_frame = None  # Playhead to restore when a closed item is opened again.
+        # Optional handle pool hooks (see MultiVideoPlayerWindow.acquire_handle):
+        # acquire_handle(item, protected) -> bool reserves a capture slot before opening,
+        # release_handle(item) returns it; opened_callback(item) runs once a capture is open.
+        self.acquire_handle = None
+        self.release_handle = None
+        self.opened_callback = None
+        # align_callback(item) estimates the item's time mapping from the other cameras
+        # (MultiVideoPlayerWindow.align_cameras).
+        self.align_callback = None
         self._remark_name = ""
 
         # Top row: Video info, Toggle Info, Copy Path, Delete Video, and Remark input.
@@ -117,17 +136,32 @@ class VideoItem(QWidget):
         self.btn_pause = QPushButton("Pause")
         self.btn_pause.clicked.connect(self.pause_video)
         self.btn_screenshot = QPushButton("Screenshot")
-        self.btn_screenshot.clicked.connect(self.screenshot)
+        self.btn_screenshot.clicked.connect(lambda: self.screenshot())
         self.slider = QSlider(Qt.Horizontal)
         self.slider.valueChanged.connect(self.on_slider_changed)
+        self.slider.sliderReleased.connect(self.finish_scrub)
+        # Hovering the slider previews the frame under the cursor from the thumbnail cache.
+        self.slider.setMouseTracking(True)
+        self.slider.installEventFilter(self)
+        self.scrub_timer = QTimer(self)
+        self.scrub_timer.setSingleShot(True)
+        self.scrub_timer.setInterval(SCRUB_SETTLE_MS)
+        self.scrub_timer.timeout.connect(self.finish_scrub)
         self.spin_frame = QSpinBox()
         self.spin_frame.valueChanged.connect(self.on_spin_changed)
         self.label_frame_info = QLabel("0/0")
+        # Activity heat strip under the slider (see utils.motion_index).
+        self.activity_strip = ActivityStrip()
+        self.activity_strip.clicked.connect(self.on_strip_clicked)
+        slider_col = QVBoxLayout()
+        slider_col.setSpacing(0)
+        slider_col.addWidget(self.slider)
+        slider_col.addWidget(self.activity_strip)
         controls_row = QHBoxLayout()
         controls_row.addWidget(self.btn_play)
         controls_row.addWidget(self.btn_pause)
         controls_row.addWidget(self.btn_screenshot)
-        controls_row.addWidget(self.slider)
+        controls_row.addLayout(slider_col)
         controls_row.addWidget(self.spin_frame)
         controls_row.addWidget(self.label_frame_info)
 
@@ -140,9 +174,15 @@ class VideoItem(QWidget):
         self.btn_ocr_detect = QPushButton("OCR Detect")
         self.btn_ocr_detect.clicked.connect(self.ocr_detect_first_frame)
         manual_row.addWidget(self.btn_ocr_detect)
+        self.btn_ocr_index = QPushButton("Rebuild OCR Index")
+        self.btn_ocr_index.clicked.connect(self.start_ocr_index)
+        manual_row.addWidget(self.btn_ocr_index)
         manual_row.addWidget(self.input_start_time)
         manual_row.addWidget(self.input_end_time)
         manual_row.addWidget(self.btn_apply_start_end)
+        self.btn_align = QPushButton("Align by Motion")
+        self.btn_align.clicked.connect(self.request_alignment)
+        manual_row.addWidget(self.btn_align)
 
         # Jump-to-time row
         self.input_jump_time = QLineEdit("2024-12-05 09:30:00")
@@ -160,10 +200,13 @@ class VideoItem(QWidget):
         self.btn_rewind.clicked.connect(self.rewind_local)
         self.btn_fast_forward = QPushButton("Fast Forward")
         self.btn_fast_forward.clicked.connect(self.fast_forward_local)
+        self.btn_filmstrip = QPushButton("Filmstrip")
+        self.btn_filmstrip.clicked.connect(self.show_filmstrip)
         nav_row = QHBoxLayout()
         nav_row.addWidget(self.spin_offset)
         nav_row.addWidget(self.btn_rewind)
         nav_row.addWidget(self.btn_fast_forward)
+        nav_row.addWidget(self.btn_filmstrip)
 
         # Main layout
         main_layout = QVBoxLayout()
@@ -194,14 +237,27 @@ class VideoItem(QWidget):
         self.log_black(f"Remark name set to: {name}")
 
     # ---------- Logging functions ----------
+    @property
+    def log_source(self):
+        if self.remark_name:
+            return self.remark_name
+        return os.path.basename(self.video_path) if self.video_path else "Video"
+
     def log_red(self, msg):
-        self.log_func(f"<font color='red'>{msg}</font>")
+        self.log_func(f"<font color='red'>{msg}</font>", logging.ERROR, self.log_source)
 
     def log_green(self, msg):
-        self.log_func(f"<font color='#006400'>{msg}</font>")
+        self.log_func(f"<font color='#006400'>{msg}</font>", logging.INFO, self.log_source)
 
     def log_black(self, msg):
-        self.log_func(f"<font color='black'>{msg}</font>")
+        self.log_func(f"<font color='black'>{msg}</font>", logging.INFO, self.log_source)
+
+    def log_debug(self, msg):
+        self.log_func(f"<font color='gray'>{msg}</font>", logging.DEBUG, self.log_source)
+
+    def log_item(self, html):
+        # For services that log finished HTML (screenshot batches, clocks).
+        self.log_func(html, None, self.log_source)
 
     # ---------- Toggle Info ----------
     def toggle_info(self):
@@ -217,8 +273,13 @@ class VideoItem(QWidget):
     # ---------- Delete Video ----------
     def delete_self(self):
         self.log_black(f"Deleting video: {self.video_path}")
+        self.play_clock.stop(report=False)
+        self.stop_decoder()
         if self.cap:
             self.cap.release()
+        self.load_token += 1
+        if self.release_handle:
+            self.release_handle(self)
         self.setParent(None)
         self.deleteLater()
         if hasattr(self, 'delete_callback') and callable(self.delete_callback):
@@ -230,6 +291,11 @@ class VideoItem(QWidget):
             if self.orig_frame is not None:
                 self.enlarge_preview()
                 return True
+        elif source == self.slider:
+            if event.type() == QEvent.MouseMove:
+                self.show_hover_preview(event.x())
+            elif event.type() == QEvent.Leave:
+                self.hide_hover_preview()
         return super().eventFilter(source, event)
 
     def enlarge_preview(self):
@@ -277,46 +343,299 @@ class VideoItem(QWidget):
             self.load_video_manually(path)
 
     def load_video_manually(self, path):
+        """
+        Starts loading path on the load pool and returns immediately; the item shows a
+        placeholder until apply_probe_result receives the probe (capture, first frame,
+        cached OCR index or first-frame OCR).
+        """
+        self.close_capture()
+        self.pending_frame = None
+        if path != self.video_path:
+            self.clear_motion_index()
+            self.clear_thumbnails()
+        if self.acquire_handle and not self.acquire_handle(self, None):
+            self.set_source(path)
+            self.video_label.setText("Not opened: capture handle limit reached")
+            return
+        self.start_load(path)
+
+    def start_load(self, path, ocr=True):
+        self.load_token += 1
+        self.load_started = time.perf_counter()
+        self.loading = True
+        basename = os.path.basename(path)
+        self.label_info.setText(f"Loading: {basename}<br>Path: {path}")
+        pixmap = self.video_label.pixmap()
+        if pixmap is None or pixmap.isNull():
+            self.video_label.setText("Loading...")
+        label_w, label_h = self.display_size()
+        submit_load(path, self.load_token, label_w, label_h, self.apply_probe_result, ocr=ocr)
+
+    # ---------- Open/close on demand ----------
+    def set_source(self, path, entry=None):
+        """
+        Points the item at path without opening it (open_capture does, on demand).
+        entry (utils.session.SessionEntry) restores what a session knew about the video,
+        so it can be positioned and time-synced while closed.
+        """
+        self.close_capture()
+        if path != self.video_path:
+            self.clear_motion_index()
+            self.clear_thumbnails()
+        self.video_path = path
+        basename = os.path.basename(path)
+        self.screens_dir = os.path.join("screenshots", os.path.splitext(basename)[0])
+        self.pending_frame = None
+        if entry is not None:
+            self.remark_name = entry.remark
+            self.fps = entry.fps
+            self.total_frames = entry.total_frames
+            self.frame_size = (entry.width, entry.height)
+            self.ts_index = None
+            if entry.ts_index is not None and len(entry.ts_index):
+                self.apply_ocr_index(entry.ts_index)
+            elif entry.start_time and entry.end_time:
+                self.start_time, self.end_time = entry.start_time, entry.end_time
+                self.input_start_time.setText(self.start_time.strftime("%Y-%m-%d %H:%M:%S"))
+                self.input_end_time.setText(self.end_time.strftime("%Y-%m-%d %H:%M:%S"))
+            if self.total_frames > 0:
+                self.slider.setRange(0, self.total_frames - 1)
+                self.spin_frame.setRange(0, self.total_frames - 1)
+                self.pending_frame = self.move_playhead(entry.frame)
+        self.label_info.setText(f"File: {basename}<br>Path: {path}<br>Not opened")
+        self.video_label.setText("Not opened")
+
+    def is_open(self):
+        """
+        True while the item holds a capture or is opening one.
+        """
+        return self.cap is not None or self.loading
+
+    def open_capture(self, protected=None):
+        """
+        Opens a closed item in the background (restoring its playhead and time mapping),
+        after reserving a handle; protected is passed on to acquire_handle. Returns False
+        if no handle was granted.
+        """
+        if not self.video_path:
+            return False
+        if self.is_open():
+            return True
+        if self.acquire_handle and not self.acquire_handle(self, protected):
+            self.video_label.setText("Not opened: capture handle limit reached")
+            return False
+        # Skip the first-frame OCR when the times are already known.
+        self.start_load(self.video_path, ocr=not (self.ts_index or self.start_time))
+        return True
+
+    def close_capture(self):
+        """
+        Releases the capture and decoder (and with them the cached and full-resolution
+        frames), keeping the path, time mapping, playhead and a copy of the preview.
+        """
+        if not self.is_open():
+            return
+        self.load_token += 1  # A probe still in flight is dropped.
+        self.loading = False
+        self.play_clock.stop(report=False)
         if self.cap:
+            self.pending_frame = self.current_frame
             self.cap.release()
-        self.cap = cv2.VideoCapture(path)
-        if not self.cap.isOpened():
-            self.log_red(f"Failed to open video: {path}")
             self.cap = None
+            self.reader = None
+        self.stop_decoder()
+        self.orig_frame = None
+        pixmap = self.video_label.pixmap()
+        if self.display_buffer is not None and pixmap is not None and not pixmap.isNull():
+            # Detach the preview from the frame buffer before dropping it.
+            self.video_label.setPixmap(pixmap.copy())
+        self.display_buffer = None
+        self.label_frame_info.setText(f"{self.current_frame}/{self.total_frames} (closed)")
+        if self.release_handle:
+            self.release_handle(self)
+
+    def session_entry(self):
+        return SessionEntry(self.video_path, self.remark_name, self.start_time, self.end_time,
+                            self.ts_index, self.current_frame, self.fps, self.total_frames,
+                            self.frame_size[0], self.frame_size[1])
+
+    def require_capture(self):
+        """
+        True if the item is open; otherwise starts opening it (or explains why it cannot).
+        """
+        if self.cap:
+            return True
+        if not self.video_path:
+            self.log_red("Load a video first!")
+        elif self.loading or self.open_capture():
+            self.log_black("Opening the video, try again once it is shown.")
+        else:
+            self.log_red("Cannot open the video: capture handle limit reached.")
+        return False
+
+    def apply_probe_result(self, result):
+        if result.token != self.load_token:
+            # Superseded by a newer load of this item.
+            if result.cap:
+                result.cap.release()
+            return
+        self.loading = False
+        path = result.path
+        if result.cap is None:
+            self.log_red(result.error)
+            self.label_info.setText(f"Failed to open: {path}")
+            self.video_label.setText("Preview")
+            if self.release_handle:
+                self.release_handle(self)
             return
+        restore = self.pending_frame
+        self.pending_frame = None
+        self.cap = result.cap
+        self.keyframes = result.keyframes
+        self.reader = SequentialReader(self.cap, keyframes=self.keyframes)
+        if result.first_frame is not None:
+            self.reader.pos = 1
         self.video_path = path
         basename = os.path.basename(path)
         file_no_ext = os.path.splitext(basename)[0]
         self.screens_dir = os.path.join("screenshots", file_no_ext)
-        self.fps = self.cap.get(cv2.CAP_PROP_FPS)
-        self.total_frames = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.fps = result.fps
+        self.total_frames = result.total_frames
         self.current_frame = 0
         self.orig_frame = None
+        self.orig_frame_idx = 0
+        self.frame_size = (result.width, result.height)
+        self.start_decoder()
         info_str = f"File: {basename}<br>Path: {path}<br>Total Frames: {self.total_frames}<br>FPS: {self.fps}"
         self.label_info.setText(info_str)
         self.slider.setRange(0, max(0, self.total_frames - 1))
         self.spin_frame.setRange(0, max(0, self.total_frames - 1))
         self.label_frame_info.setText(f"0/{self.total_frames}")
-        self.show_frame(0)
-        self.log_black(f"Video loaded: {path}, frames={self.total_frames}, fps={self.fps}")
-        # Automatically perform OCR on the first frame.
-        self.ocr_detect_first_frame()
+        start = restore or 0
+        if start == 0 and result.first_image is not None:
+            self.display_entry(DecodedFrame(0, result.first_frame, result.first_image, result.first_buffer))
+        self.show_frame(start)
+        t = result.timings
+        if t.get("ocr"):
+            perf_stats().record(path, "ocr", t["ocr"])
+        waited = time.perf_counter() - self.load_started
+        if self.opened_callback:
+            self.opened_callback(self)
+        if result.motion is not None:
+            self.apply_motion_index(result.motion)
+        elif self.motion is None:
+            self.start_motion_index()
+        if result.thumbs is not None:
+            self.apply_thumbnails(result.thumbs)
+        elif self.thumbs is None:
+            self.start_thumbnail_index()
+        if restore is not None:
+            self.log_debug(f"Video reopened at frame {self.current_frame} (ready after {waited:.3f}s)")
+            if not self.keyframes:
+                self.start_keyframe_index()
+            if not self.start_time:
+                self.apply_probe_times(result)
+            return
+        self.log_black(f"Video loaded: {path}, frames={self.total_frames}, fps={self.fps} "
+                       f"(open {t.get('open', 0):.3f}s, first frame {t.get('decode', 0):.3f}s, "
+                       f"OCR {t.get('ocr', 0):.3f}s, worker {t.get('total', 0):.3f}s, "
+                       f"ready after {waited:.3f}s)")
+        if self.keyframes:
+            self.log_keyframe_index("loaded from cache")
+        else:
+            self.start_keyframe_index()
+        self.apply_probe_times(result)
 
-    def show_frame(self, frame_idx):
-        if not self.cap:
+    def apply_probe_times(self, result):
+        """
+        Time mapping from a probe: the cached OCR index, else the first-frame OCR refined
+        by a background index build. The build is skipped when the first frame has no
+        readable time (no overlay, or no OCR engine): it would OCR the whole file in vain
+        on every open. "Rebuild OCR Index" still starts it by hand.
+        """
+        self.ts_index = None
+        if result.ts_index:
+            self.apply_ocr_index(result.ts_index)
+            self.log_green(f"OCR index loaded from cache: {len(result.ts_index)} samples, "
+                           f"{result.ts_index.describe()}")
+            return
+        if result.error:
+            self.log_red(result.error)
+        elif result.ocr_time:
+            self.apply_first_frame_time(result.ocr_time)
+            # Refine the first-frame estimate with the background index.
+            self.start_ocr_index()
+            return
+        else:
+            self.log_red("OCR detection failed: No valid time found in first frame!")
+        self.log_black("OCR index skipped (use Rebuild OCR Index to run it anyway).")
+
+    def start_decoder(self):
+        self.decoder = create_decoder(self.decode_backend, self.video_path, self.total_frames, self.frame_size)
+        if self.keyframes:
+            self.decoder.set_keyframes(self.keyframes)
+        self.decoder.frame_ready.connect(self.on_frame_ready)
+        self.decoder.approx_ready.connect(self.on_approx_ready)
+        self.decoder.failed.connect(self.on_decoder_failed)
+        self.decoder.set_target_size(*self.display_size())
+        self.decoder.start()
+
+    def on_decoder_failed(self, error):
+        self.log_red(f"Playback decoder stopped: {error}")
+
+    def set_decode_backend(self, backend):
+        """
+        Switches between in-process and per-video process decoding; a running decoder is
+        replaced and the current frame requested again.
+        """
+        if backend == self.decode_backend:
             return
-        if frame_idx < 0:
-            frame_idx = 0
-        if frame_idx >= self.total_frames:
-            frame_idx = self.total_frames - 1
-        self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
-        ret, frame = self.cap.read()
-        if not ret or frame is None:
+        self.decode_backend = backend
+        if self.decoder:
+            self.stop_decoder()
+            self.start_decoder()
+            self.show_frame(self.current_frame)
+            self.log_black(f"Decoder: {backend}")
+
+    def stop_decoder(self):
+        if self.decoder:
+            self.decoder.frame_ready.disconnect(self.on_frame_ready)
+            self.decoder.approx_ready.disconnect(self.on_approx_ready)
+            self.decoder.failed.disconnect(self.on_decoder_failed)
+            self.scrub_timer.stop()
+            self.decoder.stop()
+            self.decoder = None
+
+    def show_frame(self, frame_idx, wait=False):
+        """
+        Moves the playhead to frame_idx. The frame is displayed as soon as the decoder
+        has it; with wait=True the call blocks until then (used where the exact frame is
+        needed immediately, e.g. between screenshots).
+        """
+        if not self.decoder:
+            if self.pending_frame is not None:
+                # Closed: only move the playhead, the frame is decoded when reopened.
+                self.pending_frame = self.move_playhead(frame_idx)
             return
+        frame_idx = self.move_playhead(frame_idx)
+        if wait:
+            entry = self.decoder.wait_for(frame_idx)
+        elif self.decoder.review_step > 1:
+            # Fast review: the latest decoded frame at or before the playhead, if new.
+            entry = self.decoder.take_review(frame_idx)
+        else:
+            entry = self.decoder.take(frame_idx)
+            if entry is None:
+                self.decoder.request(frame_idx)
+        if entry is not None:
+            self.display_entry(entry)
+
+    def move_playhead(self, frame_idx):
+        """
+        Clamps frame_idx, makes it the current frame and updates the position widgets.
+        """
+        frame_idx = max(0, min(frame_idx, self.total_frames - 1))
         self.current_frame = frame_idx
-        self.orig_frame = frame
-        pix = self.frame_to_pixmap(frame, self.video_label.width(), self.video_label.height())
-        self.video_label.setPixmap(pix)
         self.slider.blockSignals(True)
         self.slider.setValue(frame_idx)
         self.slider.blockSignals(False)
@@ -324,77 +643,164 @@ class VideoItem(QWidget):
         self.spin_frame.setValue(frame_idx)
         self.spin_frame.blockSignals(False)
         self.label_frame_info.setText(f"{frame_idx}/{self.total_frames}")
+        self.activity_strip.set_position(frame_idx / max(1, self.total_frames - 1))
+        if self.decoder:
+            self.decoder.set_target_size(*self.display_size())
+        return frame_idx
+
+    def scrub_to(self, frame_idx):
+        """
+        Latest-wins preview of frame_idx (see FrameDecoder.scrub); the exact frame is
+        shown by finish_scrub.
+        """
+        if not self.decoder:
+            return
+        frame_idx = self.move_playhead(frame_idx)
+        entry = self.decoder.scrub(frame_idx)
+        if entry is not None:
+            self.display_approx(entry)
+        if not self.slider.isSliderDown():
+            self.scrub_timer.start()
+
+    def finish_scrub(self):
+        self.scrub_timer.stop()
+        if not self.decoder or not self.decoder.scrubbing:
+            return
+        positions, decoded, dropped = self.decoder.end_scrub()
+        self.show_frame(self.current_frame)
+        if positions > 1:
+            self.log_black(f"Scrub: {positions} positions, {decoded} keyframe previews decoded, "
+                           f"{dropped} stale requests dropped -> frame={self.current_frame}")
+
+    def on_approx_ready(self, target, entry):
+        if self.decoder and self.decoder.scrubbing and self.frame_is_pending():
+            self.display_approx(entry)
+
+    def display_approx(self, entry):
+        self.display_entry(entry)
+        if entry.index != self.current_frame:
+            self.label_frame_info.setText(f"{self.current_frame}/{self.total_frames} (~{entry.index})")
+
+    def on_frame_ready(self, frame_idx):
+        if frame_idx != self.current_frame or not self.frame_is_pending():
+            return
+        entry = self.decoder.take(frame_idx) if self.decoder else None
+        if entry is not None:
+            self.display_entry(entry)
+
+    def display_entry(self, entry):
+        self.orig_frame = entry.frame
+        self.orig_frame_idx = entry.index
+        with perf_stats().timer(self.video_path, "paint"):
+            if self.display_sink:
+                self.display_sink(self, entry)
+            else:
+                # The pixmap may share the image's memory; keep its buffer alive while shown.
+                self.display_buffer = entry.buffer
+                self.video_label.setPixmap(QPixmap.fromImage(entry.image))
+
+    def display_size(self):
+        if self.render_size:
+            return self.render_size
+        return self.video_label.width(), self.video_label.height()
+
+    def set_display_sink(self, sink, size=None):
+        """
+        Routes displayed frames to sink(item, entry), rendered at size (w, h), instead of
+        the preview label (e.g. for the mosaic view). set_display_sink(None) restores the label.
+        """
+        changed = sink is not self.display_sink or size != self.render_size
+        self.display_sink = sink
+        self.render_size = size if sink else None
+        if not changed or not self.decoder:
+            return
+        self.decoder.set_target_size(*self.display_size())
+        if self.orig_frame is not None:
+            # Redisplay the frame held at the new size right away.
+            image, buffer = frame_to_qimage(self.orig_frame, *self.display_size())
+            self.display_entry(DecodedFrame(self.orig_frame_idx, self.orig_frame, image, buffer))
+
+    def frame_is_pending(self):
+        return self.orig_frame is None or self.orig_frame_idx != self.current_frame
+
+    def cache_stats(self):
+        """
+        Frame cache hits/misses and memory of this video (see utils.frame_cache).
+        """
+        return frame_cache().stats(self.video_path)
+
+    def read_frame(self, frame_idx):
+        """
+        Synchronously reads a full-resolution frame through the item's own capture,
+        independent of the playback decoder. Returns None on failure.
+        """
+        if not self.reader:
+            return None
+        return self.reader.read(frame_idx)
 
     def frame_to_pixmap(self, cv_frame, label_w, label_h):
-        if label_w <= 0 or label_h <= 0:
-            label_w, label_h = 640, 480
-        h, w, ch = cv_frame.shape
-        aspect_frame = w / h
-        aspect_label = label_w / label_h
-        if aspect_frame > aspect_label:
-            new_w = label_w
-            new_h = int(label_w / aspect_frame)
-        else:
-            new_h = label_h
-            new_w = int(label_h * aspect_frame)
-        frame_resized = cv2.resize(cv_frame, (new_w, new_h), interpolation=cv2.INTER_AREA)
-        frame_rgb = cv2.cvtColor(frame_resized, cv2.COLOR_BGR2RGB)
-        return QPixmap.fromImage(QImage(frame_rgb.data, new_w, new_h, 3 * new_w, QImage.Format_RGB888))
+        image, _buffer = frame_to_qimage(cv_frame, label_w, label_h)
+        return QPixmap.fromImage(image)
 
     # ---------- Play/Pause ----------
     def play_video(self):
-        if not self.cap:
-            self.log_red("Load a video first!")
+        if not self.require_capture():
             return
-        if self.play_timer:
-            self.play_timer.stop()
-        from PyQt5.QtCore import QTimer
-        self.play_timer = QTimer(self)
-        interval = 40
-        if self.fps > 0:
-            interval = int(1000 // self.fps)
-        self.play_timer.timeout.connect(self.play_next_frame)
-        self.play_timer.start(interval)
-        self.log_black(f"Playing: {self.video_path}, interval={interval}ms")
-
-    def play_next_frame(self):
-        if self.current_frame < self.total_frames - 1:
-            self.show_frame(self.current_frame + 1)
-        else:
-            self.play_timer.stop()
+        self.play_clock.start([self])
+        self.log_debug(f"Playing: {self.video_path}, tick={self.play_clock.timer.interval()}ms")
 
     def pause_video(self):
-        if self.play_timer:
-            self.play_timer.stop()
-        self.log_black(f"Paused: {self.video_path}")
+        self.play_clock.stop()
+        self.log_debug(f"Paused: {self.video_path}")
 
     def on_slider_changed(self):
         if not self.cap:
             return
-        self.show_frame(self.slider.value())
+        self.scrub_to(self.slider.value())
 
     def on_spin_changed(self):
         if not self.cap:
             return
-        self.show_frame(self.spin_frame.value())
+        self.scrub_to(self.spin_frame.value())
 
     # ---------- Screenshot ----------
-    def screenshot(self):
+    def screenshot_path(self, frame_idx):
+        ext = screenshot_writer().extension()
+        if self.remark_name:
+            fname = f"{self.remark_name}_{frame_idx}{ext}"
+        else:
+            fname = f"screenshot_{frame_idx}{ext}"
+        return os.path.join(self.screens_dir, fname)
+
+    def burst_job(self, count, interval, start_frame=None):
+        """
+        ExtractJob for a burst of count frames, interval apart, from start_frame (default:
+        the playhead), written to the usual screenshot paths.
+        """
+        if start_frame is None:
+            start_frame = self.current_frame
+        frames = burst_frames(start_frame, count, interval, self.total_frames)
+        return ExtractJob(self.video_path, frames, [self.screenshot_path(f) for f in frames])
+
+    def screenshot(self, batch=None):
+        """
+        Queues the current frame on the shared ScreenshotWriter. Without a batch the
+        screenshot is its own batch and is reported in the log once written.
+        """
         if self.orig_frame is None:
             self.log_red("No frame available for screenshot!")
             return
-        import os
         if not self.screens_dir:
             self.log_red("Video not loaded; cannot determine screenshot folder!")
             return
-        os.makedirs(self.screens_dir, exist_ok=True)
-        if self.remark_name:
-            fname = f"{self.remark_name}_{self.current_frame}.png"
-        else:
-            fname = f"screenshot_{self.current_frame}.png"
-        fullpath = os.path.join(self.screens_dir, fname)
-        cv2.imwrite(fullpath, self.orig_frame)
-        self.log_green(f"Screenshot saved: {fullpath}")
+        writer = screenshot_writer()
+        own_batch = batch is None
+        if own_batch:
+            batch = writer.begin_batch(f"{os.path.basename(self.video_path)} frame {self.orig_frame_idx}",
+                                       self.log_item)
+        writer.submit(batch, self.orig_frame, self.screenshot_path(self.orig_frame_idx), source=self.video_path)
+        if own_batch:
+            writer.end_batch(batch)
 
     # ---------- Apply Start/End Times ----------
     def apply_start_end_times(self):
@@ -408,37 +814,310 @@ class VideoItem(QWidget):
                 return
             self.start_time = sdt
             self.end_time = edt
+            if self.ts_index:
+                self.ts_index = None
+                self.log_black("Manual times override the OCR index (use Rebuild OCR Index to restore it).")
             self.log_black(f"Manual time set: {sdt} ~ {edt}")
         except ValueError:
             self.log_red("Time format error (YYYY-MM-DD HH:MM:SS)")
 
     # ---------- OCR Detect (first frame only) ----------
     def ocr_detect_first_frame(self):
-        if not self.cap:
-            self.log_red("Load a video first!")
+        if not self.require_capture():
             return
         if self.total_frames < 1:
             self.log_red("Video has too few frames for OCR!")
             return
-        self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-        ret, frame = self.cap.read()
-        if not ret or frame is None:
+        frame = self.read_frame(0)
+        if frame is None:
             self.log_red("Failed to read first frame!")
             return
-        dt = extract_time_from_roi(frame, roi=(0, 0, 250, 40), log_func=self.log_black)
+        with perf_stats().timer(self.video_path, "ocr"):
+            dt = extract_time_from_roi(frame, roi=(0, 0, 250, 40), log_func=self.log_debug)
         if dt:
-            self.start_time = dt
-            self.end_time = dt + timedelta(minutes=5)
-            self.input_start_time.setText(dt.strftime("%Y-%m-%d %H:%M:%S"))
-            self.input_end_time.setText(self.end_time.strftime("%Y-%m-%d %H:%M:%S"))
-            self.log_green(f"OCR success: start = {dt}, end = {self.end_time} (start + 5 min)")
+            self.apply_first_frame_time(dt)
         else:
             self.log_red("OCR detection failed: No valid time found in first frame!")
 
+    def apply_first_frame_time(self, dt):
+        """
+        Sets the time range from the OCR'd first frame: start = dt, end = dt + duration.
+        """
+        self.start_time, self.end_time = first_frame_time_range(dt, self.total_frames, self.fps)
+        duration = self.end_time - self.start_time
+        self.input_start_time.setText(dt.strftime("%Y-%m-%d %H:%M:%S"))
+        self.input_end_time.setText(self.end_time.strftime("%Y-%m-%d %H:%M:%S"))
+        self.log_green(f"OCR success: start = {dt}, end = {self.end_time} (start + {duration})")
+
+    # ---------- Motion Alignment ----------
+    def request_alignment(self):
+        if not self.video_path:
+            self.log_red("Load a video first!")
+            return
+        if not self.align_callback:
+            self.log_red("Motion alignment needs the other cameras of the player window.")
+            return
+        self.align_callback(self)
+
+    def duration_secs(self):
+        if self.fps > 0 and self.total_frames > 0:
+            return self.total_frames / self.fps
+        return None
+
+    def time_at(self, secs):
+        """
+        Time shown secs into the video, extrapolated past either end of the mapping.
+        """
+        fps = self.fps if self.fps > 0 else 25
+        frame = min(max(0, int(round(secs * fps))), max(0, self.total_frames - 1))
+        t = self.frame_to_time(frame)
+        return t + timedelta(seconds=secs - frame / fps) if t is not None else None
+
+    def apply_estimated_times(self, start, how):
+        """
+        Sets a linear time mapping from start over the video's duration (estimated by
+        motion alignment, replacing any OCR index). Returns False if the duration is unknown.
+        """
+        if self.total_frames <= 0 and self.motion is not None and self.motion.total_frames > 0:
+            # A video never opened takes its length from the activity index.
+            self.fps, self.total_frames = self.motion.fps, self.motion.total_frames
+            self.slider.setRange(0, self.total_frames - 1)
+            self.spin_frame.setRange(0, self.total_frames - 1)
+        duration = self.duration_secs()
+        if duration is None:
+            self.log_red("Motion alignment: video length unknown, open the video first.")
+            return False
+        note = " (replaces the OCR index)" if self.ts_index else ""
+        if self.start_time:
+            note += f", {(start - self.start_time).total_seconds():+.1f}s from the previous start"
+        self.ts_index = None
+        self.start_time = start
+        self.end_time = start + timedelta(seconds=duration)
+        if not self.is_open() and self.pending_frame is None:
+            # Opening the item later restores this mapping instead of detecting a new one.
+            self.pending_frame = self.current_frame
+        self.input_start_time.setText(self.start_time.strftime("%Y-%m-%d %H:%M:%S"))
+        self.input_end_time.setText(self.end_time.strftime("%Y-%m-%d %H:%M:%S"))
+        self.log_green(f"Motion alignment: start = {self.start_time}, end = {self.end_time}; {how}{note}")
+        return True
+
+    # ---------- OCR Index (whole file) ----------
+    def start_ocr_index(self):
+        if not self.video_path:
+            self.log_red("Load a video first!")
+            return
+        th = OcrIndexThread(self.video_path)
+        th.done.connect(self.on_ocr_index_ready)
+        th.failed.connect(self.on_ocr_index_failed)
+        th.start()
+        self.log_black(f"OCR index started: {self.video_path}")
+
+    def on_ocr_index_ready(self, video_path, index, secs):
+        if video_path != self.video_path:
+            return
+        perf_stats().record(video_path, "ocr_index", secs)
+        if not len(index):
+            self.log_red(f"OCR index: no readable timestamps ({secs:.1f}s)")
+            return
+        self.apply_ocr_index(index)
+        self.log_green(f"OCR index built: {len(index)} samples ({index.refined} adaptive) in {secs:.1f}s, "
+                       f"{self.start_time} ~ {self.end_time}; {index.describe()}")
+
+    def on_ocr_index_failed(self, video_path, error):
+        if video_path == self.video_path:
+            self.log_red(f"OCR index failed: {error}")
+
+    def apply_ocr_index(self, index):
+        self.ts_index = index
+        self.start_time = index.start_time
+        self.end_time = index.end_time
+        self.input_start_time.setText(self.start_time.strftime("%Y-%m-%d %H:%M:%S"))
+        self.input_end_time.setText(self.end_time.strftime("%Y-%m-%d %H:%M:%S"))
+
+    # ---------- Keyframe Index ----------
+    def start_keyframe_index(self):
+        th = KeyframeIndexThread(self.video_path)
+        th.done.connect(self.on_keyframe_index_ready)
+        th.failed.connect(self.on_keyframe_index_failed)
+        th.start()
+
+    def on_keyframe_index_ready(self, video_path, index, secs):
+        if video_path != self.video_path or not len(index):
+            return
+        self.apply_keyframe_index(index)
+        self.log_keyframe_index(f"scanned in {secs:.2f}s")
+
+    def on_keyframe_index_failed(self, video_path, error):
+        if video_path == self.video_path:
+            self.log_red(f"Keyframe index failed: {error} (seeking by frame position)")
+
+    def apply_keyframe_index(self, index):
+        self.keyframes = index
+        if self.reader:
+            self.reader.keyframes = index
+        if self.decoder:
+            self.decoder.set_keyframes(index)
+        if len(index) != self.total_frames:
+            self.total_frames = len(index)
+            self.slider.setRange(0, max(0, self.total_frames - 1))
+            self.spin_frame.setRange(0, max(0, self.total_frames - 1))
+            self.label_frame_info.setText(f"{self.current_frame}/{self.total_frames}")
+            if self.current_frame >= self.total_frames:
+                self.show_frame(self.total_frames - 1)
+
+    def log_keyframe_index(self, how):
+        kf = self.keyframes
+        note = ""
+        if kf.container_frames and kf.container_frames != kf.frame_count:
+            note = f" (container reported {kf.container_frames})"
+        if kf.has_keyframes():
+            self.log_green(f"Keyframe index {how}: {kf.frame_count} frames{note}, "
+                           f"{len(kf.keyframes)} keyframes, longest GOP {kf.max_gop()} frames "
+                           f"(bounds the forward decode of a seek)")
+        else:
+            self.log_black(f"Keyframe index {how}: {kf.frame_count} frames{note}, keyframes not "
+                           f"reported by the backend (seeking by frame position)")
+
+    # ---------- Activity Index ----------
+    def start_motion_index(self):
+        if not self.video_path or self.motion_indexing:
+            return
+        th = MotionIndexThread(self.video_path)
+        th.done.connect(self.on_motion_index_ready)
+        th.failed.connect(self.on_motion_index_failed)
+        self.motion_indexing = True
+        self.activity_strip.set_message("Indexing activity...")
+        th.start()
+
+    def on_motion_index_ready(self, video_path, index, secs):
+        if video_path != self.video_path:
+            return
+        self.motion_indexing = False
+        self.apply_motion_index(index)
+        self.log_green(f"Activity index built in {secs:.1f}s: {index.describe()}")
+
+    def on_motion_index_failed(self, video_path, error):
+        if video_path != self.video_path:
+            return
+        self.motion_indexing = False
+        self.activity_strip.set_message("Activity index failed")
+        self.log_red(f"Activity index failed: {error}")
+
+    def apply_motion_index(self, index):
+        self.motion = index
+        self.activity_strip.set_index(index)
+
+    def clear_motion_index(self):
+        self.motion = None
+        self.motion_indexing = False
+        self.activity_strip.set_index(None)
+
+    def ensure_motion(self):
+        """
+        Loads the cached activity index if the item has none yet (closed items are not
+        probed). Returns True if an index is available.
+        """
+        if self.motion is None and self.video_path and not self.motion_indexing:
+            index = load_cached_motion(self.video_path)
+            if index is not None:
+                self.apply_motion_index(index)
+        return self.motion is not None
+
+    # ---------- Thumbnails (hover preview, filmstrip) ----------
+    def start_thumbnail_index(self):
+        if not self.video_path or self.thumbs_indexing:
+            return
+        th = ThumbnailIndexThread(self.video_path)
+        th.done.connect(self.on_thumbnails_ready)
+        th.failed.connect(self.on_thumbnails_failed)
+        self.thumbs_indexing = True
+        th.start()
+
+    def on_thumbnails_ready(self, video_path, thumbs, secs):
+        if video_path != self.video_path:
+            thumbs.close()
+            return
+        self.thumbs_indexing = False
+        self.apply_thumbnails(thumbs)
+        self.log_debug(f"Thumbnails cached in {secs:.1f}s: {len(thumbs)} x {thumbs.width}x{thumbs.height}, "
+                       f"one every {thumbs.step} frames")
+
+    def on_thumbnails_failed(self, video_path, error):
+        if video_path == self.video_path:
+            self.thumbs_indexing = False
+            self.log_red(f"Thumbnail cache failed: {error}")
+
+    def apply_thumbnails(self, thumbs):
+        if self.thumbs is not None and self.thumbs is not thumbs:
+            self.thumbs.close()
+        self.thumbs = thumbs
+
+    def clear_thumbnails(self):
+        if self.filmstrip:
+            self.filmstrip.close()
+            self.filmstrip = None
+        if self.thumbs is not None:
+            self.thumbs.close()
+        self.thumbs = None
+        self.thumbs_indexing = False
+
+    def ensure_thumbnails(self):
+        """
+        Opens the cached thumbnails if the item has none yet (closed items are not probed).
+        """
+        if self.thumbs is None and self.video_path and not self.thumbs_indexing:
+            thumbs = ThumbnailIndex.open(self.video_path)
+            if thumbs is not None:
+                self.apply_thumbnails(thumbs)
+        return self.thumbs is not None
+
+    def describe_frame(self, frame_idx):
+        t = self.frame_to_time(frame_idx)
+        return t.strftime("%H:%M:%S") if t else f"frame {frame_idx}"
+
+    def show_hover_preview(self, x):
+        if self.total_frames <= 0 or not self.ensure_thumbnails():
+            return
+        frame_idx = slider_value_at(self.slider, x)
+        rgb = self.thumbs.image(self.thumbs.index_for(frame_idx))
+        if rgb is None:
+            return
+        if self.hover_preview is None:
+            self.hover_preview = HoverPreview(self)
+        pos = self.slider.mapToGlobal(self.slider.rect().topLeft())
+        pos.setX(pos.x() + x)
+        self.hover_preview.show_image(rgb, f"{self.describe_frame(frame_idx)}  (frame {frame_idx})", pos)
+
+    def hide_hover_preview(self):
+        if self.hover_preview:
+            self.hover_preview.hide()
+
+    def show_filmstrip(self):
+        if not self.ensure_thumbnails():
+            if self.video_path:
+                self.start_thumbnail_index()
+                self.log_black("Thumbnails are being cached, try again in a moment.")
+            else:
+                self.log_red("Load a video first!")
+            return
+        if self.filmstrip is None:
+            self.filmstrip = FilmstripDialog(self, parent=self)
+        self.filmstrip.show()
+        self.filmstrip.raise_()
+
+    def on_strip_clicked(self, fraction):
+        if self.total_frames > 0:
+            self.show_frame(int(round(fraction * (self.total_frames - 1))))
+
+    def seek_stats(self):
+        """
+        Seek count and latency of the playback decoder (see SequentialReader.seek_stats).
+        """
+        return self.decoder.seek_stats() if self.decoder else None
+
     # ---------- Jump to Time ----------
     def jump_to_time(self):
-        if not self.cap:
-            self.log_red("Load a video first!")
+        if not self.require_capture():
             return
         if not (self.start_time and self.end_time):
             self.log_red("Set the time range manually or use OCR!")
@@ -449,16 +1128,27 @@ class VideoItem(QWidget):
         except ValueError:
             self.log_red("Time format incorrect!")
             return
-        total_secs = (self.end_time - self.start_time).total_seconds()
-        if total_secs <= 0:
+        fidx, error, gap = self.locate_time(target_dt)
+        if fidx is None:
             self.log_red("Invalid time range!")
             return
-        delta_secs = (target_dt - self.start_time).total_seconds()
-        ratio = delta_secs / total_secs
-        ratio = max(0, min(1, ratio))
-        fidx = int(ratio * self.total_frames)
         self.show_frame(fidx)
-        self.log_black(f"Jump to time: {t_str} -> frame={fidx}")
+        self.log_black(f"Jump to time: {t_str} -> frame={fidx} ({describe_location(error, gap)})")
+
+    def time_to_frame(self, target_dt):
+        """
+        Frame index showing target_dt, or None if the item has no valid time mapping.
+        """
+        return map_time_to_frame(target_dt, self.start_time, self.end_time, self.total_frames, self.ts_index)
+
+    def locate_time(self, target_dt):
+        """
+        (frame, expected error in seconds, recording gap) for target_dt; see time_sync.locate_time.
+        """
+        return locate_time(target_dt, self.start_time, self.end_time, self.total_frames, self.ts_index)
+
+    def frame_to_time(self, frame_idx):
+        return map_frame_to_time(frame_idx, self.start_time, self.end_time, self.total_frames, self.ts_index)
 
     # ---------- Fast Forward (local) ----------
     def fast_forward_local(self):
@@ -0,0 +1,117 @@
+# player/video_loader.py
+
+import os
+import time
+from collections import namedtuple
+import cv2
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from player.frame_decoder import frame_to_qimage
+from utils.keyframe_index import load_cached_keyframes
+from utils.motion_index import load_cached_motion
+from utils.thumbnail_index import ThumbnailIndex
+from utils.ocr_index import OCR_ROI, load_cached_index
+from utils.ocr_utils import create_ocr_backend, extract_time_from_roi
+
+# Loading is mostly I/O, decoder start-up and tesseract subprocesses, so it is worth
+# running more loads than there are cores.
+MIN_LOAD_THREADS = 4
+
+# Everything a VideoItem needs to become ready, produced off the GUI thread.
+# cap is an opened cv2.VideoCapture (or None on failure); first_image/first_buffer are the
+# display-ready first frame; ocr_time is the first-frame OCR result (None if not run or
+# failed); ts_index is a cached OCR index; keyframes a cached KeyframeIndex (its frame
+# count replaces total_frames); motion a cached MotionIndex; thumbs the opened
+# ThumbnailIndex cache; timings maps stage -> seconds.
+ProbeResult = namedtuple("ProbeResult", [
+    "path", "token", "cap", "fps", "total_frames", "width", "height",
+    "first_frame", "first_image", "first_buffer", "ocr_time", "ts_index", "keyframes",
+    "motion", "thumbs", "timings", "error",
+])
+
+
+def probe_video(path, token, label_w, label_h, ocr=True):
+    timings = {}
+    t0 = time.perf_counter()
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        return ProbeResult(path, token, None, 0, 0, 0, 0, None, None, None, None, None, None,
+                           None, None, timings, f"Failed to open video: {path}")
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    keyframes = load_cached_keyframes(path)
+    if keyframes is not None and len(keyframes):
+        total_frames = len(keyframes)
+    else:
+        keyframes = None
+    timings["open"] = time.perf_counter() - t0
+
+    t1 = time.perf_counter()
+    ret, first_frame = cap.read()
+    first_image = first_buffer = None
+    if ret and first_frame is not None:
+        first_image, first_buffer = frame_to_qimage(first_frame, label_w, label_h)
+    else:
+        first_frame = None
+    timings["decode"] = time.perf_counter() - t1
+
+    t2 = time.perf_counter()
+    ts_index = load_cached_index(path)
+    if ts_index is not None and not len(ts_index):
+        ts_index = None
+    ocr_time = None
+    error = None
+    if ocr and ts_index is None and first_frame is not None:
+        try:
+            # A private backend: tasks run concurrently and templates are not thread-safe.
+            ocr_time = extract_time_from_roi(first_frame, roi=OCR_ROI, backend=create_ocr_backend())
+        except Exception as e:
+            error = f"OCR failed: {e}"
+    timings["ocr"] = time.perf_counter() - t2
+    motion = load_cached_motion(path)
+    thumbs = ThumbnailIndex.open(path)
+    timings["total"] = time.perf_counter() - t0
+    return ProbeResult(path, token, cap, fps, total_frames, width, height, first_frame,
+                       first_image, first_buffer, ocr_time, ts_index, keyframes, motion, thumbs,
+                       timings, error)
+
+
+class LoadSignals(QObject):
+    finished = pyqtSignal(object)  # ProbeResult
+
+
+class LoadTask(QRunnable):
+    def __init__(self, path, token, label_w, label_h, ocr=True):
+        super().__init__()
+        self.path = path
+        self.token = token
+        self.label_w = label_w
+        self.label_h = label_h
+        self.ocr = ocr
+        # Created on the submitting (GUI) thread, so finished is delivered there.
+        self.signals = LoadSignals()
+
+    def run(self):
+        self.signals.finished.emit(probe_video(self.path, self.token, self.label_w, self.label_h, self.ocr))
+
+
+_pool = None
+
+def load_pool():
+    global _pool
+    if _pool is None:
+        _pool = QThreadPool()
+        _pool.setMaxThreadCount(max(MIN_LOAD_THREADS, os.cpu_count() or 1))
+    return _pool
+
+def submit_load(path, token, label_w, label_h, on_finished, ocr=True):
+    """
+    Probes path (open, first-frame decode, cached index or first-frame OCR) on the load
+    pool and calls on_finished(ProbeResult) on the GUI thread. ocr=False skips the
+    first-frame OCR (e.g. when reopening a video whose times are already known).
+    """
+    task = LoadTask(path, token, label_w, label_h, ocr)
+    task.signals.finished.connect(on_finished)
+    load_pool().start(task)
+    return task
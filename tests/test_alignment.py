@@ -0,0 +1,50 @@
+# tests/test_alignment.py
+
+import numpy as np
+import pytest
+from utils.alignment import Alignment, SignatureSet, signature, solve_offsets
+from utils.motion_index import MotionIndex
+
+
+def pair(offset, confidence):
+    return Alignment(offset, confidence, psr=10.0, score=0.5, overlap=60.0)
+
+
+def test_chain_from_the_anchor():
+    placed = solve_offsets(3, {(0, 1): pair(10.0, 0.9), (1, 2): pair(5.0, 0.8)}, anchors=[0])
+    assert placed == {1: (0, 10.0, 0.9), 2: (1, 5.0, 0.8)}
+
+
+def test_reversed_pair_negates_the_offset():
+    placed = solve_offsets(2, {(0, 1): pair(10.0, 0.9)}, anchors=[1])
+    assert placed == {0: (1, -10.0, 0.9)}
+
+
+def test_most_confident_chain_wins():
+    pairs = {(0, 2): pair(14.0, 0.4), (0, 1): pair(10.0, 0.9), (1, 2): pair(5.0, 0.8)}
+    placed = solve_offsets(3, pairs, anchors=[0])
+    # The chain's weakest link (0.8) beats the direct but weak alignment (0.4).
+    assert placed[2] == (1, 5.0, 0.8)
+
+
+def test_weak_alignments_and_unreachable_cameras_stay_unplaced():
+    pairs = {(0, 1): pair(3.0, 0.2), (2, 3): pair(1.0, 0.9)}
+    assert solve_offsets(4, pairs, anchors=[0]) == {}
+    assert solve_offsets(4, pairs, anchors=[0, 2]) == {3: (2, 1.0, 0.9)}
+
+
+def test_shifted_recordings_are_aligned():
+    # Two cameras see the same bursts of activity; camera 1 starts 17.4s later.
+    rng = np.random.default_rng(3)
+    step, fps = 5, 25.0  # 5 samples per second
+    scene = np.full(2000, 0.001)
+    for start in rng.choice(1900, 40, replace=False):
+        scene[start:start + rng.integers(3, 15)] = rng.uniform(0.02, 0.2)
+    shift = 87  # samples: 17.4s
+    cams = [MotionIndex(step, scene[:1500], 1500 * step, fps),
+            MotionIndex(step, scene[shift:shift + 1250], 1250 * step, fps)]
+    result = SignatureSet([signature(c) for c in cams]).align(0, 1)
+    assert result.offset == pytest.approx(17.4, abs=0.2)
+    assert result.confidence > 0.5
+    placed = solve_offsets(2, {(0, 1): result}, anchors=[0])
+    assert placed[1][1] == pytest.approx(17.4, abs=0.2)
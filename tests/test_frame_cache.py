@@ -0,0 +1,82 @@
+# tests/test_frame_cache.py
+
+from utils.frame_cache import PREFETCH_FRAMES, FrameCache
+
+
+def test_budget_evicts_least_recently_used():
+    cache = FrameCache(budget_bytes=300)
+    for idx in range(3):
+        cache.put("a", idx, f"a{idx}", 100)
+    assert cache.get("a", 0) == "a0"  # Frame 0 becomes the most recent.
+    cache.put("a", 3, "a3", 100)
+    assert cache.peek("a", 1) is None
+    assert [cache.peek("a", i) for i in (0, 2, 3)] == ["a0", "a2", "a3"]
+    assert cache.bytes == 300
+
+
+def test_replacing_and_oversized_values():
+    cache = FrameCache(budget_bytes=300)
+    cache.put("a", 0, "old", 100)
+    cache.put("a", 0, "new", 200)
+    assert cache.peek("a", 0) == "new" and cache.bytes == 200
+    cache.put("a", 1, "huge", 301)  # Larger than the whole budget: not cached at all.
+    assert cache.peek("a", 1) is None and cache.peek("a", 0) == "new"
+
+
+def test_frames_stay_until_last_owner_unregisters():
+    cache = FrameCache(budget_bytes=1000)
+    cache.register("a")
+    cache.register("a")
+    cache.register("b")
+    cache.put("a", 0, "a0", 100)
+    cache.put("b", 0, "b0", 100)
+    cache.unregister("a")
+    assert cache.peek("a", 0) == "a0"
+    cache.unregister("a")
+    assert cache.peek("a", 0) is None and "a" not in cache.owners
+    assert cache.peek("b", 0) == "b0" and cache.bytes == 100
+
+
+def test_first_missing():
+    cache = FrameCache()
+    for idx in (10, 14):
+        cache.put("a", idx, idx, 1)
+    assert cache.first_missing("a", [10, 11, 12]) == 11
+    assert cache.first_missing("a", [10, 11, 12], skip={11}) == 12
+    assert cache.first_missing("a", [10, 14]) is None
+    assert cache.first_missing("b", [10]) == 10
+
+
+def test_hits_and_misses_are_counted_per_video():
+    cache = FrameCache()
+    cache.put("a", 0, "a0", 10)
+    cache.get("a", 0)
+    cache.get("a", 0)
+    cache.get("a", 1)
+    cache.get("b", 0)
+    cache.peek("a", 5)  # Internal lookup, not counted.
+    assert cache.stats("a") == {"hits": 2, "misses": 1, "frames": 1, "bytes": 10}
+    assert cache.stats("b")["misses"] == 1
+    totals = cache.stats()
+    assert (totals["hits"], totals["misses"], totals["frames"]) == (2, 2, 1)
+
+
+def test_prefetch_window_shares_half_the_budget():
+    cache = FrameCache(budget_bytes=40 * 100)
+    cache.register("a")
+    assert cache.prefetch_frames(100) == min(PREFETCH_FRAMES, 10)
+    cache.register("b")
+    assert cache.prefetch_frames(100) == 5
+    assert cache.prefetch_frames(0) == PREFETCH_FRAMES
+
+
+def test_nearest_within_radius():
+    cache = FrameCache()
+    for idx in (10, 14):
+        cache.put("a", idx, idx, 1)
+    assert cache.nearest("a", 12, radius=2) == 10  # Tie goes to the earlier frame.
+    assert cache.nearest("a", 13, radius=2) == 14
+    assert cache.nearest("a", 17, radius=2) is None
+    assert cache.nearest("b", 10, radius=5) is None
+    # Not counted as a hit or miss.
+    assert cache.stats("a")["hits"] == 0 and cache.stats("a")["misses"] == 0
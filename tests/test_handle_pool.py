@@ -0,0 +1,44 @@
+# tests/test_handle_pool.py
+
+from utils.handle_pool import HandlePool
+
+
+def test_least_recently_used_is_evicted():
+    pool = HandlePool(limit=2)
+    assert pool.acquire("a") == (True, [])
+    assert pool.acquire("b") == (True, [])
+    pool.touch("a")
+    assert pool.acquire("c") == (True, ["b"])
+    assert list(pool.open) == ["a", "c"]
+    assert pool.evictions == 1
+
+
+def test_reacquire_refreshes_without_evicting():
+    pool = HandlePool(limit=2)
+    pool.acquire("a")
+    pool.acquire("b")
+    assert pool.acquire("a") == (True, [])
+    assert pool.acquire("c") == (True, ["b"])
+
+
+def test_protected_keys_stay_open():
+    pool = HandlePool(limit=2)
+    pool.acquire("a")
+    pool.acquire("b")
+    assert pool.acquire("c", protected={"a"}) == (True, ["b"])
+    # Every open key on screen: nothing can be evicted, so the new key is refused.
+    assert pool.acquire("d", protected={"a", "c"}) == (False, [])
+    assert "d" not in pool and len(pool) == 2
+
+
+def test_release_and_set_limit():
+    pool = HandlePool(limit=3)
+    for key in "abc":
+        pool.acquire(key)
+    pool.release("b")
+    assert list(pool.open) == ["a", "c"]
+    pool.acquire("d")
+    # Protected keys are evicted last when the limit drops below them.
+    assert pool.set_limit(1, protected={"a"}) == ["c", "d"]
+    assert pool.set_limit(0, protected={"a"}) == []
+    assert pool.limit == 1 and list(pool.open) == ["a"]
@@ -0,0 +1,71 @@
+# tests/test_log_sink.py
+
+import logging
+from utils.log_sink import LogSink, html_to_text, level_from_html
+
+
+def test_level_and_text_from_html():
+    assert level_from_html("<font color='red'>bad</font>") == logging.ERROR
+    assert level_from_html("<font color='#006400'>ok</font>") == logging.INFO
+    assert html_to_text("<font color='red'>a &amp; b<br>c</font>") == "a & b c"
+
+
+def test_records_after_counts_lost_records():
+    sink = LogSink(capacity=4)
+    for i in range(6):
+        sink.emit(f"m{i}", logging.INFO, "cam0" if i % 2 else "cam1")
+    records, lost, newest = sink.records_after(0)
+    # Records 1 and 2 fell out of the ring before anyone read them.
+    assert [r.seq for r in records] == [3, 4, 5, 6] and lost == 2 and newest == 6
+    records, lost, newest = sink.records_after(4)
+    assert [r.seq for r in records] == [5, 6] and lost == 0
+    records, _, _ = sink.records_after(0, source="cam0")
+    assert [r.html for r in records] == ["m3", "m5"]
+    sink.emit("<font color='red'>err</font>")
+    records, _, _ = sink.records_after(newest, min_level=logging.WARNING)
+    assert [(r.level, r.source) for r in records] == [(logging.ERROR, "Player")]
+
+
+def test_file_is_flushed_when_half_the_ring_is_waiting(tmp_path):
+    path = tmp_path / "multicam.log"
+    sink = LogSink(capacity=8)
+    sink.emit("before the file was set")
+    sink.set_file(str(path))
+    for i in range(3):
+        sink.emit(f"line {i}")
+    assert path.read_text(encoding="utf-8") == ""
+    sink.emit("line 3")  # Fourth waiting record: half the ring, written by the emitter.
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert [line.split("[Player] ")[1] for line in lines] == [f"line {i}" for i in range(4)]
+    sink.emit("<font color='red'>line 4</font>", source="cam0")
+    sink.flush_file()
+    assert path.read_text(encoding="utf-8").splitlines()[-1].endswith("ERROR   [cam0] line 4")
+    sink.set_file(None)
+
+
+def test_file_notes_records_lost_before_writing(tmp_path):
+    path = tmp_path / "multicam.log"
+    sink = LogSink(capacity=8)
+    sink.set_file(str(path))
+    sink.file_seq = -5  # As if records had been emitted and dropped before a flush.
+    sink.emit("kept")
+    sink.flush_file()
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert "record(s) lost before writing" in lines[0] and lines[-1].endswith("kept")
+    sink.set_file(None)
+
+
+def test_file_rotates(tmp_path):
+    path = tmp_path / "multicam.log"
+    sink = LogSink(capacity=1000)
+    sink.set_file(str(path), max_bytes=400, backups=2)
+    for i in range(40):
+        sink.emit(f"record number {i:03d}")
+    sink.flush_file()
+    sink.set_file(None)
+    files = sorted(p.name for p in tmp_path.iterdir())
+    assert files == ["multicam.log", "multicam.log.1", "multicam.log.2"]
+    for name in files:
+        assert (tmp_path / name).stat().st_size <= 400
+    # The newest records are in the current file, the oldest ones rotated out.
+    assert path.read_text(encoding="utf-8").splitlines()[-1].endswith("record number 039")
@@ -0,0 +1,30 @@
+# tests/test_mosaic_export.py
+
+from datetime import datetime, timedelta
+import pytest
+from utils.mosaic_export import export_times, mosaic_layout
+
+START = datetime(2024, 12, 5, 9, 30, 0)
+
+
+@pytest.mark.parametrize("secs, fps, expected", [
+    (10, 25, 251),  # both ends included
+    (0, 25, 1),
+    (0.99, 10, 10),
+    (-1, 25, 0),  # end before start
+    (10, 0, 0),
+])
+def test_export_times(secs, fps, expected):
+    assert export_times(START, START + timedelta(seconds=secs), fps) == expected
+
+
+@pytest.mark.parametrize("count, size, cols, width, expected", [
+    (4, (1280, 720), None, 1920, (2, 2, 960, 540)),
+    (3, (1280, 720), None, 1920, (2, 2, 960, 540)),
+    (5, (640, 360), None, 1920, (3, 2, 640, 360)),
+    (1, (320, 240), None, 1920, (1, 1, 320, 240)),  # never scaled up
+    (3, (1280, 720), 10, 1920, (3, 1, 640, 360)),  # at most one column per tile
+    (3, (1000, 563), 3, 1000, (3, 1, 332, 186)),  # even sizes for the codecs
+])
+def test_mosaic_layout(count, size, cols, width, expected):
+    assert mosaic_layout(count, *size, cols=cols, width=width) == expected
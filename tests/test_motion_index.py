@@ -0,0 +1,40 @@
+# tests/test_motion_index.py
+
+import numpy as np
+import pytest
+from utils.motion_index import MIN_EVENT_ACTIVITY, MotionIndex
+
+STEP = 5  # 25 fps sampled at 5 fps
+
+
+def index(bursts, samples=100, base=0.0, total_frames=None):
+    activity = np.full(samples, base, dtype=np.float32)
+    for i, value in bursts.items():
+        activity[i] = value
+    return MotionIndex(STEP, activity, total_frames or samples * STEP, 25.0)
+
+
+def test_quiet_video_has_no_events():
+    quiet = index({})
+    assert quiet.threshold == MIN_EVENT_ACTIVITY
+    assert quiet.events == []
+    assert quiet.next_event(0) is None
+
+
+def test_close_runs_merge_and_start_one_sample_early():
+    idx = index({20: 0.2, 21: 0.15, 22: 0.1, 25: 0.1, 60: 0.3, 61: 0.05})
+    assert idx.events == [(95, 125, pytest.approx(0.2)), (295, 305, pytest.approx(0.3))]
+    assert idx.next_event(100) == 295
+    assert idx.previous_event(295) == 95
+    assert idx.event_at(300)[0] == 295 and idx.event_at(200) is None
+
+
+def test_events_are_clamped_to_the_video():
+    idx = index({0: 0.2, 99: 0.2}, total_frames=494)
+    assert [e[:2] for e in idx.events] == [(0, 0), (490, 493)]
+
+
+def test_threshold_follows_the_noise_floor():
+    idx = index({30: 0.05, 31: 0.02}, base=0.01)
+    assert idx.threshold == pytest.approx(0.03)
+    assert [e[:2] for e in idx.events] == [(145, 150)]
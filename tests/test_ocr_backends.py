@@ -0,0 +1,133 @@
+# tests/test_ocr_backends.py
+
+import numpy as np
+import pytest
+from benchmarks.synthetic import DEFAULT_START, draw_overlay, overlay_text
+from utils.ocr_backends import (
+    LEARN_AGREEMENT, REQUIRED_GLYPHS, HybridBackend, OcrBackend, TemplateBackend, make_backend
+)
+from utils.ocr_index import OCR_ROI
+from utils.ocr_utils import confirmed_time_text, prepare_roi
+
+
+def overlay_crops(seconds, start=DEFAULT_START):
+    """
+    (crop, text) of the synthetic camera overlay at each of seconds, as the OCR index sees it.
+    """
+    out = []
+    for secs in seconds:
+        text = overlay_text(start, secs)
+        frame = np.full((120, 320, 3), 90, np.uint8)
+        draw_overlay(frame, text)
+        out.append((prepare_roi(frame, OCR_ROI), text))
+    return out
+
+
+class FakeOcr(OcrBackend):
+    """
+    Fallback that knows the true text of every crop; misread(call, text) can corrupt reads.
+    """
+    def __init__(self, crops, misread=None):
+        self.truth = {id(crop): text for crop, text in crops}
+        self.misread = misread
+        self.reads = 0
+
+    def read_batch(self, crops):
+        texts = []
+        for crop in crops:
+            text = self.truth[id(crop)]
+            if self.misread:
+                text = self.misread(self.reads, text)
+            self.reads += 1
+            texts.append(text)
+        return texts
+
+
+def read_all(backend, crops, batch=16):
+    texts = []
+    for i in range(0, len(crops), batch):
+        texts.extend(backend.read_batch([c for c, _ in crops[i:i + batch]]))
+    return texts
+
+
+def test_template_backend_reads_after_learning():
+    crops = overlay_crops(range(0, 600, 7))
+    backend = TemplateBackend()
+    assert read_all(backend, crops[:2]) == ["", ""]
+    for crop, text in crops[:12]:
+        assert backend.learn(crop, text)
+    assert backend.is_trained()
+    assert read_all(backend, crops[12:]) == [t for _, t in crops[12:]]
+
+
+def test_learn_rejects_text_that_does_not_match_the_glyphs():
+    crop, text = overlay_crops([0])[0]
+    backend = TemplateBackend()
+    assert not backend.learn(crop, text[:-1])
+    assert not backend.counts
+
+
+def test_character_needs_agreeing_reads_before_it_is_learned():
+    backend = TemplateBackend(agreement=LEARN_AGREEMENT)
+    # "...09:00:07", ":17", ":27", ":37": the only "7" is the last glyph, and no "8" at all.
+    crops = overlay_crops([7, 17, 27, 37])
+    # A misread labels the "7" glyph as "8"; alone it must not become the "8" template.
+    crop, text = crops[0]
+    backend.learn(crop, text[:-1] + "8")
+    assert "8" not in backend.counts and "7" not in backend.counts
+    for k, (crop, text) in enumerate(crops[1:LEARN_AGREEMENT], start=1):
+        backend.learn(crop, text)
+        assert "7" not in backend.counts, f"learned after {k} agreeing read(s)"
+    backend.learn(*crops[LEARN_AGREEMENT])
+    assert backend.counts["7"] == LEARN_AGREEMENT
+    assert "8" not in backend.counts
+
+
+def test_hybrid_is_not_taught_by_an_early_misread():
+    crops = overlay_crops(range(0, 1800, 3))
+    swap = str.maketrans("59", "95")
+    fallback = FakeOcr(crops, misread=lambda call, text: text.translate(swap) if call == 0 else text)
+    backend = HybridBackend(fallback=fallback, validate=confirmed_time_text)
+    texts = read_all(backend, crops)
+    assert backend.template.is_trained()
+    # Only the misread itself is wrong; the template reads that follow are all right.
+    assert texts[1:] == [t for _, t in crops[1:]]
+    assert fallback.reads < len(crops) // 4
+
+
+def test_hybrid_rechecks_one_template_read_in_verify_every():
+    crops = overlay_crops(range(0, 1800, 3))
+    fallback = FakeOcr(crops)
+    backend = HybridBackend(fallback=fallback, validate=confirmed_time_text, verify_every=50)
+    read_all(backend, crops[:300])
+    assert backend.template.is_trained()
+    before, unverified = fallback.reads, backend.unverified
+    assert read_all(backend, crops[300:]) == [t for _, t in crops[300:]]
+    assert fallback.reads - before == (unverified + len(crops) - 300) // 50
+    assert backend.mismatches == 0
+
+
+def test_hybrid_recheck_corrects_and_relearns_a_bad_template():
+    crops = overlay_crops(range(0, 3600, 3))
+    fallback = FakeOcr(crops)
+    backend = HybridBackend(fallback=fallback, validate=confirmed_time_text, verify_every=50)
+    read_all(backend, crops[:300])
+    template = backend.template
+    # Corrupt the templates behind the check's back: "5" and "9" trade places.
+    mean5 = template.sums["5"] / template.counts["5"]
+    mean9 = template.sums["9"] / template.counts["9"]
+    template.sums["5"] = mean9 * template.counts["5"]
+    template.sums["9"] = mean5 * template.counts["9"]
+    template._rebuild()
+    assert read_all(backend, crops[300:302]) != [t for _, t in crops[300:302]]
+    texts = read_all(backend, crops[302:])
+    assert backend.mismatches >= 1
+    assert REQUIRED_GLYPHS.issubset(template.counts)
+    # Once the check caught the swap, both characters were learned again from the fallback.
+    assert texts[-300:] == [t for _, t in crops[-300:]]
+
+
+def test_make_backend_rejects_unknown_names():
+    assert isinstance(make_backend("template"), TemplateBackend)
+    with pytest.raises(ValueError):
+        make_backend("nope")
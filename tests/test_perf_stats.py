@@ -0,0 +1,45 @@
+# tests/test_perf_stats.py
+
+import pytest
+from utils.perf_stats import HISTOGRAM_EDGES_MS, NULL_TIMER, PerfStats, StageStats, WINDOW
+
+
+def test_percentiles_of_known_durations():
+    stats = StageStats()
+    for ms in range(1, 101):
+        stats.add(ms / 1000, now=0.0)
+    s = stats.summary(now=0.0)
+    assert s["count"] == 100
+    assert s["p50_ms"] == pytest.approx(50.5)
+    assert s["p95_ms"] == pytest.approx(95.05)
+    assert s["p99_ms"] == pytest.approx(99.01)
+    assert s["max_ms"] == pytest.approx(100)
+    assert s["mean_ms"] == pytest.approx(50.5)
+    assert sum(s["histogram"]) == 100
+    assert len(s["histogram"]) == len(HISTOGRAM_EDGES_MS) + 1
+
+
+def test_percentiles_cover_the_last_window_only():
+    stats = StageStats()
+    for _ in range(WINDOW):
+        stats.add(1.0, now=0.0)
+    for _ in range(WINDOW):
+        stats.add(0.002, now=10.0)
+    s = stats.summary(now=10.0)
+    assert s["count"] == 2 * WINDOW
+    assert s["p99_ms"] == pytest.approx(2.0)
+    # The lifetime maximum and total still include the older durations.
+    assert s["max_ms"] == pytest.approx(1000.0)
+    assert s["total_s"] == pytest.approx(WINDOW * 1.002)
+
+
+def test_timings_only_while_enabled_but_counters_always():
+    perf = PerfStats()
+    assert perf.clock() is None and perf.timer("a", "read") is NULL_TIMER
+    perf.record("a", "read", 0.01)
+    perf.count("a", "dropped", 3)
+    perf.set_enabled(True)
+    perf.record("a", "read", 0.02)
+    src = perf.snapshot()["sources"]["a"]
+    assert src["stages"]["read"]["count"] == 1
+    assert src["counters"]["dropped"] == 3
@@ -0,0 +1,66 @@
+# tests/test_sequential_read.py
+
+import cv2
+import numpy as np
+from utils.video_reader import SEQUENTIAL_GRAB_LIMIT, SequentialReader
+
+
+def make_reader(cap):
+    return SequentialReader(cap).read
+
+
+class FakeCapture:
+    """
+    cv2.VideoCapture stand-in over count numbered frames. A read at a frame in bad fails
+    and leaves the capture skip frames further on, like a decoder that lost its place.
+    """
+    def __init__(self, count, bad=(), skip=5):
+        self.count = count
+        self.bad = set(bad)
+        self.skip = skip
+        self.pos = 0
+        self.seeks = 0
+
+    def set(self, prop, value):
+        assert prop == cv2.CAP_PROP_POS_FRAMES
+        self.pos = int(value)
+        self.seeks += 1
+        return True
+
+    def grab(self):
+        if self.pos >= self.count:
+            return False
+        self.pos += 1
+        return True
+
+    def read(self):
+        if self.pos in self.bad:
+            self.pos += self.skip
+            return False, None
+        if self.pos >= self.count:
+            return False, None
+        frame = np.array([self.pos])
+        self.pos += 1
+        return True, frame
+
+
+def test_forward_reads_do_not_seek():
+    cap = FakeCapture(100)
+    read = make_reader(cap)
+    assert [int(read(i)[0]) for i in range(10)] == list(range(10))
+    assert int(read(10 + SEQUENTIAL_GRAB_LIMIT)[0]) == 10 + SEQUENTIAL_GRAB_LIMIT
+    assert cap.seeks == 0
+    assert int(read(5)[0]) == 5  # Backwards: one seek.
+    assert int(read(40)[0]) == 40  # Beyond the grab limit: one seek.
+    assert cap.seeks == 2
+
+
+def test_failed_read_forces_a_seek():
+    cap = FakeCapture(100, bad={3})
+    read = make_reader(cap)
+    read(0)
+    assert read(3) is None
+    # The capture is now somewhere past frame 3; a short forward gap must not be grabbed.
+    assert int(read(5)[0]) == 5
+    assert cap.seeks == 1
+    assert int(read(6)[0]) == 6 and cap.seeks == 1
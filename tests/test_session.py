@@ -0,0 +1,57 @@
+# tests/test_session.py
+
+import json
+import os
+import shutil
+from datetime import datetime, timedelta
+import pytest
+from utils.ocr_index import TimestampIndex
+from utils.session import SessionEntry, SessionError, load_session, save_session
+
+
+def make_entry(path, index=None):
+    start = datetime(2024, 12, 5, 9, 30, 0)
+    return SessionEntry(path=str(path), remark="north gate", start_time=start,
+                        end_time=start + timedelta(minutes=3), ts_index=index, frame=123,
+                        fps=25.0, total_frames=4500, width=1280, height=720)
+
+
+def test_round_trip(tmp_path):
+    video = tmp_path / "cam1.mp4"
+    video.write_bytes(b"")
+    start = datetime(2024, 12, 5, 9, 30, 0)
+    frames = list(range(0, 4500, 25))
+    index = TimestampIndex(frames, [start + timedelta(seconds=f // 25) for f in frames], 4500, 25.0)
+    entries = [make_entry(video, index), make_entry(tmp_path / "missing.mp4")]
+    session = tmp_path / "review.mcsession"
+    save_session(str(session), entries, {"handle_limit": 8})
+
+    loaded, settings = load_session(str(session))
+    assert settings == {"handle_limit": 8}
+    assert [e._replace(ts_index=None) for e in loaded] == [e._replace(ts_index=None) for e in entries]
+    assert loaded[0].ts_index.frames == index.frames
+    assert loaded[0].ts_index.times == index.times
+    assert loaded[0].ts_index.frame_to_time(2000) == index.frame_to_time(2000)
+    assert loaded[1].ts_index is None
+
+
+def test_moved_session_resolves_relative_paths(tmp_path):
+    old, new = tmp_path / "old", tmp_path / "new"
+    old.mkdir()
+    (old / "cam1.mp4").write_bytes(b"")
+    save_session(str(old / "s.mcsession"), [make_entry(old / "cam1.mp4")])
+    shutil.move(str(old), str(new))
+    (entry,), _ = load_session(str(new / "s.mcsession"))
+    assert entry.path == os.path.normpath(str(new / "cam1.mp4"))
+
+
+def test_invalid_files_raise_session_error(tmp_path):
+    bad = tmp_path / "bad.mcsession"
+    bad.write_text("{not json", encoding="utf-8")
+    with pytest.raises(SessionError):
+        load_session(str(bad))
+    bad.write_text(json.dumps({"version": 99}), encoding="utf-8")
+    with pytest.raises(SessionError):
+        load_session(str(bad))
+    with pytest.raises(SessionError):
+        load_session(str(tmp_path / "nope.mcsession"))
@@ -0,0 +1,100 @@
+# tests/test_timing_model.py
+
+import math
+import pytest
+from utils.timing_model import QUANT_SECS, TimingModel
+
+FPS = 25.0
+
+
+def clock(frame, start=1000.37, drift=0.0, jumps=()):
+    """
+    True overlay clock (seconds) at frame; jumps is [(first frame after, seconds)].
+    """
+    secs = start + frame / FPS * (1 + drift)
+    return secs + sum(s for f, s in jumps if frame >= f)
+
+
+def reading(frame, **kw):
+    return math.floor(clock(frame, **kw))
+
+
+def fit(frames, total, **kw):
+    frames = sorted(set(frames))
+    return TimingModel.fit(frames, [reading(f, **kw) for f in frames], total, FPS)
+
+
+def refined(total, step=25, rounds=12, **kw):
+    """
+    Regular samples plus the model's refinement rounds, as utils.ocr_index.build_index.
+    """
+    tried = set(range(0, total, step))
+    model = fit(tried, total, **kw)
+    for _ in range(rounds):
+        extra = model.refinement_frames(tried, step)
+        if not extra:
+            break
+        tried.update(extra)
+        model = fit(tried, total, **kw)
+    return model
+
+
+def test_empty_model_maps_nothing():
+    model = TimingModel.fit([], [], 100, FPS)
+    assert not model
+    assert model.frame_to_secs(10) is None
+    assert model.locate(5.0) == (None, None, None)
+
+
+def test_fixed_phase_samples_report_the_rounding_error():
+    # Every sample lands at the same phase of the second: the readings cannot tell where
+    # in the second the clock is, and the expected error must say so.
+    model = fit(range(0, 4500, 25), 4500)
+    assert model.frame_error(2000) >= QUANT_SECS * 0.9
+
+
+def test_second_changes_remove_the_rounding_bias():
+    total = 4500
+    model = refined(total)
+    errors = [model.frame_to_secs(f) - clock(f) for f in range(0, total, 97)]
+    assert abs(sum(errors) / len(errors)) < 0.5 / FPS
+    assert max(abs(e) for e in errors) < 1.0 / FPS
+    assert model.frame_error(total // 2) < 0.1
+
+
+def test_drift_is_followed():
+    total = 9000
+    model = refined(total, drift=0.004)
+    assert abs(model.frame_to_secs(total - 1) - clock(total - 1, drift=0.004)) < 1.0 / FPS
+    assert "+0.40%" in model.describe()
+
+
+def test_misread_is_rejected():
+    frames = list(range(0, 4500, 25))
+    secs = [reading(f) for f in frames]
+    secs[60] += 30
+    model = TimingModel.fit(frames, secs, 4500, FPS)
+    assert model.outliers == [frames[60]]
+    assert not model.gaps
+
+
+def test_gap_is_found_and_located():
+    total = 6000
+    jumps = [(3000, 60.0)]
+    model = refined(total, jumps=jumps)
+    assert len(model.gaps) == 1
+    gap = model.gaps[0]
+    assert gap.localized() and gap.frame_after == 3000
+    assert gap.jump == pytest.approx(60.0, abs=0.1)
+    # A time inside the gap maps to the first frame after it.
+    frame, _, found = model.locate(clock(2999) + 30)
+    assert frame == 3000 and found is gap
+
+
+@pytest.mark.parametrize("frame", [0, 1234, 4499])
+def test_locate_inverts_frame_to_secs(frame):
+    model = refined(4500)
+    found, err, gap = model.locate(clock(frame) + 0.5 / FPS)
+    assert gap is None
+    assert abs(found - frame) <= 1
+    assert 0 < err < 0.1
@@ -0,0 +1,208 @@
+# utils/alignment.py
+
+"""
+Relative time offsets between cameras from their activity signatures, for cameras whose
+burned-in clock is missing, unreadable or wrong.
+
+A camera's signature comes from its cached activity index (utils.motion_index): the
+fraction of changed pixels and the mean brightness of small grayscale thumbnails, sampled
+a few times per second in one pass over the file. Cameras with overlapping views see the
+same people move and the same lights change at the same moments, so their signatures
+line up once shifted by the offset between the recordings. No video is decoded again:
+every camera is read once (and cached), and all pairs are compared on signals of a few
+samples per second.
+
+The signatures are resampled to SIGNAL_RATE, detrended and normalized; each pair is
+cross-correlated at every lag with one FFT product (the spectrum of every camera is
+computed once). The best lag is scored by how far it stands out from all other lags
+(peak-to-sidelobe ratio), which becomes the confidence. solve_offsets then places every
+camera relative to the cameras with a trusted clock through the most confident chain of
+pairwise alignments.
+"""
+
+import heapq
+from collections import namedtuple
+import numpy as np
+from utils.motion_index import MIN_EVENT_ACTIVITY
+
+# Signature samples per second of video.
+SIGNAL_RATE = 5.0
+# Slow changes (daylight, auto exposure) removed by subtracting a moving average.
+DETREND_SECS = 10.0
+# Lags where the recordings overlap less than this are not considered.
+MIN_OVERLAP_SECS = 20.0
+# Lags this close to the peak belong to it when measuring the sidelobes.
+PEAK_EXCLUSION_SECS = 2.0
+# Peak-to-sidelobe ratios mapped to confidence 0 and 1.
+PSR_FLOOR = 4.0
+PSR_FULL = 12.0
+# Pairwise alignments below this confidence are not used.
+MIN_CONFIDENCE = 0.3
+
+# offset: seconds to add to a time of video b to get the time of video a showing the
+# same moment; score: correlation (-1..1) at that offset; overlap: seconds compared.
+Alignment = namedtuple("Alignment", ["offset", "confidence", "psr", "score", "overlap"])
+
+
+def resample(values, step, fps, rate=SIGNAL_RATE):
+    """
+    values sampled every step frames (at fps), linearly resampled to rate per second.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) < 2:
+        return values
+    times = np.arange(len(values)) * (step / fps)
+    grid = np.arange(0.0, times[-1], 1.0 / rate)
+    return np.interp(grid, times, values)
+
+
+def normalize(signal, rate=SIGNAL_RATE):
+    """
+    signal minus its DETREND_SECS moving average, scaled to unit variance; None if flat.
+    """
+    width = max(1, int(round(DETREND_SECS * rate)))
+    if len(signal) > width:
+        trend = np.convolve(signal, np.ones(width) / width, mode="same")
+        # Near the ends the window is partly empty; divide by its real size.
+        trend /= np.convolve(np.ones(len(signal)), np.ones(width) / width, mode="same")
+        signal = signal - trend
+    else:
+        signal = signal - signal.mean()
+    std = signal.std()
+    if not np.isfinite(std) or std < 1e-9:
+        return None
+    return signal / std
+
+
+def signature(index, rate=SIGNAL_RATE):
+    """
+    Normalized channels of a utils.motion_index.MotionIndex: compressed activity and
+    the change of brightness between samples. Flat channels are left out (None).
+    """
+    fps = index.fps if index.fps > 0 else 25
+    # Log compression, so a camera that sees a person larger does not dominate.
+    activity = np.log1p(index.activity / MIN_EVENT_ACTIVITY)
+    channels = [normalize(resample(activity, index.step, fps, rate), rate)]
+    if index.brightness is not None and len(index.brightness) == len(index.activity):
+        change = np.diff(index.brightness, prepend=index.brightness[:1])
+        channels.append(normalize(resample(change, index.step, fps, rate), rate))
+    else:
+        channels.append(None)
+    return channels
+
+
+class SignatureSet:
+    """
+    Signatures of several cameras with their spectra at one common FFT size, so every
+    pair costs one multiply and one inverse FFT per channel.
+    """
+    def __init__(self, signatures, rate=SIGNAL_RATE):
+        self.rate = rate
+        self.signatures = signatures
+        self.lengths = [max((len(c) for c in sig if c is not None), default=0) for sig in signatures]
+        longest = max(self.lengths, default=0)
+        self.nfft = 1 << max(1, int(np.ceil(np.log2(max(2, 2 * longest)))))
+        self.spectra = [[np.fft.rfft(c, self.nfft) if c is not None else None for c in sig]
+                        for sig in signatures]
+
+    def __len__(self):
+        return len(self.signatures)
+
+    def usable(self, i):
+        return any(c is not None for c in self.signatures[i])
+
+    def align(self, a, b):
+        """
+        Alignment of camera b to camera a, or None if they share no usable channel
+        or cannot overlap by MIN_OVERLAP_SECS.
+        """
+        la, lb = self.lengths[a], self.lengths[b]
+        min_overlap = min(MIN_OVERLAP_SECS * self.rate, la, lb)
+        if min_overlap < 2:
+            return None
+        total = None
+        channels = 0
+        for sa, sb in zip(self.spectra[a], self.spectra[b]):
+            if sa is None or sb is None:
+                continue
+            corr = np.fft.irfft(sa * np.conj(sb), self.nfft)
+            total = corr if total is None else total + corr
+            channels += 1
+        if not channels:
+            return None
+        # total[k] pairs a[t + k] with b[t]; negative lags wrap to the end. Only lags
+        # with at least min_overlap samples in common are kept, in increasing order.
+        lo = -(lb - int(min_overlap))
+        hi = la - int(min_overlap)
+        if hi - lo < 2:
+            return None
+        lags = np.arange(lo, hi + 1)
+        corr = np.take(total, lags % self.nfft) / channels
+        overlap = np.minimum(la, lb + lags) - np.maximum(0, lags)
+        # corr / sqrt(overlap) has unit spread for unrelated signals at any overlap,
+        # so short overlaps do not win by chance.
+        z = corr / np.sqrt(overlap)
+        k = int(np.argmax(z))
+        side = np.abs(lags - lags[k]) > PEAK_EXCLUSION_SECS * self.rate
+        if np.count_nonzero(side) < 2:
+            return None
+        spread = z[side].std()
+        psr = float((z[k] - z[side].mean()) / spread) if spread > 0 else 0.0
+        # Parabolic interpolation for a lag between samples.
+        shift = 0.0
+        if 0 < k < len(z) - 1 and lags[k + 1] - lags[k - 1] == 2:
+            den = z[k - 1] - 2 * z[k] + z[k + 1]
+            if den < 0:
+                shift = float(np.clip(0.5 * (z[k - 1] - z[k + 1]) / den, -0.5, 0.5))
+        confidence = float(np.clip((psr - PSR_FLOOR) / (PSR_FULL - PSR_FLOOR), 0.0, 1.0))
+        return Alignment(float((lags[k] + shift) / self.rate), confidence, psr,
+                         float(corr[k] / overlap[k]), float(overlap[k] / self.rate))
+
+    def align_all(self, among=None):
+        """
+        {(a, b): Alignment} for every pair a < b that could be aligned; with among (a
+        set of camera numbers), only the pairs with at least one camera in it.
+        """
+        pairs = {}
+        for a in range(len(self)):
+            if not self.usable(a):
+                continue
+            for b in range(a + 1, len(self)):
+                if among is not None and a not in among and b not in among:
+                    continue
+                if self.usable(b):
+                    result = self.align(a, b)
+                    if result is not None:
+                        pairs[(a, b)] = result
+        return pairs
+
+
+def solve_offsets(count, pairs, anchors, min_confidence=MIN_CONFIDENCE):
+    """
+    Places cameras relative to the anchors (cameras with a trusted clock) through the
+    most confident chain of pairwise alignments: for every reachable camera
+    {camera: (parent, offset, confidence)}, where offset is the time of the parent
+    video at the camera's time 0 and confidence the weakest link of the chain.
+    """
+    edges = {i: [] for i in range(count)}
+    for (a, b), al in pairs.items():
+        if al.confidence >= min_confidence:
+            # b's time 0 is a's time offset; a's time 0 is b's time -offset.
+            edges[a].append((b, al.offset, al.confidence))
+            edges[b].append((a, -al.offset, al.confidence))
+    placed = {}
+    heap = []
+    for anchor in anchors:
+        for other, offset, conf in edges[anchor]:
+            heapq.heappush(heap, (-conf, anchor, other, offset))
+    done = set(anchors)
+    while heap:
+        neg_conf, parent, node, offset = heapq.heappop(heap)
+        if node in done:
+            continue
+        done.add(node)
+        placed[node] = (parent, offset, -neg_conf)
+        for other, off, conf in edges[node]:
+            if other not in done:
+                heapq.heappush(heap, (-min(conf, -neg_conf), node, other, off))
+    return placed
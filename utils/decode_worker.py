@@ -0,0 +1,213 @@
+# utils/decode_worker.py
+
+"""
+Out-of-process frame decoding with shared-memory frame transport.
+
+A DecodeWorker runs one video's capture in its own process ("spawn"), so decoding,
+scaling and color conversion of different videos run on different cores instead of
+contending for the GIL. Frames come back through a SharedFrameRing: a
+multiprocessing.shared_memory block of `slots` slots, each holding the full-resolution
+BGR frame and its BGRA display rendering. Only small (index, slot, shape) messages are
+pickled through the pipe.
+
+The worker reads ahead: once two consecutive frames were requested at the same size, it
+decodes the following ones into free slots while it waits, so sequential playback (and
+prefetching) finds the next frame ready. Slot ownership is implicit: the slot of the
+last reply belongs to the parent until it sends its next message; all other slots belong
+to the worker.
+"""
+
+import multiprocessing
+from multiprocessing import shared_memory
+import cv2
+import numpy as np
+from utils.frame_render import FrameScaler
+from utils.video_reader import SequentialReader
+
+SHM_SLOTS = 3
+# Seconds to wait for a spawned worker to open its video.
+START_TIMEOUT = 30.0
+
+
+class SharedFrameRing:
+    """
+    Fixed slots in one shared-memory block: [BGR frame | BGRA display] per slot. The
+    display part is as large as the frame in pixels, so any downscaled rendering fits;
+    larger (upscaled) renderings are done by the parent.
+    """
+    def __init__(self, width, height, slots=SHM_SLOTS, name=None):
+        self.width, self.height, self.slots = width, height, slots
+        self.frame_bytes = width * height * 3
+        self.display_bytes = width * height * 4
+        self.slot_bytes = self.frame_bytes + self.display_bytes
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=slots * self.slot_bytes)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def frame_view(self, slot, shape):
+        return np.ndarray(shape, np.uint8, self.shm.buf, slot * self.slot_bytes)
+
+    def display_view(self, slot, shape):
+        return np.ndarray(shape, np.uint8, self.shm.buf, slot * self.slot_bytes + self.frame_bytes)
+
+    def fits_frame(self, shape):
+        return int(np.prod(shape)) <= self.frame_bytes
+
+    def fits_display(self, shape):
+        return int(np.prod(shape)) <= self.display_bytes
+
+    def close(self):
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def worker_main(conn, video_path, shm_name, width, height, slots):
+    """
+    Worker process loop. Messages from the parent:
+      ("decode", frame_idx, label_w, label_h) -> reply (frame_idx, slot, frame_shape,
+          display_shape, inline_frame, seek_stats); slot is None for an unreadable frame,
+          display_shape None if the parent must render, inline_frame set (and slot None)
+          when the frame does not fit a slot
+      ("keyframes", KeyframeIndex) -> no reply
+      ("stop",)
+    """
+    ring = SharedFrameRing(width, height, slots, name=shm_name)
+    cap = cv2.VideoCapture(video_path)
+    reader = SequentialReader(cap)
+    scaler = FrameScaler()
+    held = None  # Slot the parent may still be reading.
+    ahead = {}  # frame_idx -> reply decoded speculatively (same label size as `last`)
+    last = None  # (frame_idx, label size) of the last request
+    sequential = False
+
+    def free_slot():
+        used = {held} | {reply[1] for reply in ahead.values()}
+        return next((s for s in range(slots) if s not in used), None)
+
+    def decode(frame_idx, label, slot):
+        frame = reader.read(frame_idx)
+        if frame is None:
+            return (frame_idx, None, None, None, None)
+        if not ring.fits_frame(frame.shape):
+            return (frame_idx, None, frame.shape, None, frame)
+        out_w, out_h, _ = scaler.plan(frame.shape[1], frame.shape[0], *label)
+        display_shape = (out_h, out_w, 4)
+        if not ring.fits_display(display_shape):
+            display_shape = None
+        ring.frame_view(slot, frame.shape)[...] = frame
+        if display_shape is not None:
+            scaler.scale(frame, *label, out=ring.display_view(slot, display_shape))
+        return (frame_idx, slot, frame.shape, display_shape, None)
+
+    conn.send(("ready", cap.isOpened()))
+    try:
+        while True:
+            if sequential and not conn.poll():
+                nxt = max([last[0]] + list(ahead)) + 1
+                slot = free_slot()
+                if slot is not None:
+                    reply = decode(nxt, last[1], slot)
+                    if reply[1] is None:
+                        sequential = False  # End of file (or unreadable); stop reading ahead.
+                    else:
+                        ahead[nxt] = reply
+                    continue
+            msg = conn.recv()
+            held = None
+            if msg[0] == "stop":
+                break
+            if msg[0] == "keyframes":
+                reader.keyframes = msg[1]
+                continue
+            _, frame_idx, label_w, label_h = msg
+            label = (label_w, label_h)
+            sequential = last is not None and frame_idx == last[0] + 1 and label == last[1]
+            reply = ahead.pop(frame_idx, None) if sequential else None
+            ahead = {i: r for i, r in ahead.items() if i > frame_idx} if sequential else {}
+            if reply is None:
+                reply = decode(frame_idx, label, free_slot())
+            last = (frame_idx, label)
+            held = reply[1]
+            conn.send(reply + (reader.seek_stats(),))
+    except (EOFError, OSError):
+        pass  # Parent went away.
+    finally:
+        cap.release()
+        ring.close()
+
+
+class DecodeWorker:
+    """
+    Parent-side handle of one worker process and its SharedFrameRing. Not thread-safe:
+    used from one thread (the FrameDecoder worker thread).
+    """
+    def __init__(self, video_path, width, height, slots=SHM_SLOTS):
+        self.ring = SharedFrameRing(width, height, slots)
+        # "spawn": a forked child would inherit the GUI process's Qt and thread state.
+        ctx = multiprocessing.get_context("spawn")
+        self.conn, child = ctx.Pipe()
+        self.process = ctx.Process(target=worker_main, daemon=True,
+                                   args=(child, video_path, self.ring.name, width, height, slots))
+        self.process.start()
+        child.close()
+        self.seek_stats = None
+
+    def _recv(self, alive, timeout=None):
+        waited = 0.0
+        while not self.conn.poll(0.1):
+            waited += 0.1
+            if not self.process.is_alive() or not alive() or (timeout and waited >= timeout):
+                return None
+        return self.conn.recv()
+
+    def wait_ready(self, alive=lambda: True):
+        """
+        Waits for the worker to open its video; False if it could not.
+        """
+        msg = self._recv(alive, START_TIMEOUT)
+        return bool(msg and msg[1])
+
+    def set_keyframes(self, index):
+        self.conn.send(("keyframes", index))
+
+    def read(self, frame_idx, label_w, label_h, alive=lambda: True):
+        """
+        Returns (frame, display) for frame_idx: private copies of the BGR frame and of the
+        BGRA display rendering (None if the caller must render it), or (None, None) if the
+        frame is unreadable, the worker died or alive() turned False while waiting.
+        """
+        try:
+            self.conn.send(("decode", frame_idx, label_w, label_h))
+            reply = self._recv(alive)
+        except (EOFError, OSError):
+            return None, None
+        if reply is None:
+            return None, None
+        _, slot, frame_shape, display_shape, inline, self.seek_stats = reply
+        if inline is not None:
+            return inline, None
+        if slot is None:
+            return None, None
+        # Copied out: the slot is reused as soon as the next message is sent.
+        frame = self.ring.frame_view(slot, frame_shape).copy()
+        display = self.ring.display_view(slot, display_shape).copy() if display_shape else None
+        return frame, display
+
+    def close(self):
+        try:
+            self.conn.send(("stop",))
+        except (EOFError, OSError):
+            pass
+        self.process.join(2.0)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(1.0)
+        self.conn.close()
+        self.ring.close()
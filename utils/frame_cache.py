@@ -0,0 +1,131 @@
+# utils/frame_cache.py
+
+"""
+Decoded-frame cache shared by all videos, with a global memory budget and LRU eviction.
+
+Values are whatever the caller stores per (video, frame) (the player stores its
+DecodedFrame entries) together with their size in bytes. Lookups through get() are
+counted as hits/misses per video; peek() is for internal checks such as prefetching.
+"""
+
+import threading
+from collections import OrderedDict
+
+# Memory shared by all videos' cached frames.
+FRAME_CACHE_BYTES = 1024 * 1024 * 1024
+# Frames kept around the playhead, on each side, when the budget allows it.
+PREFETCH_FRAMES = 24
+
+
+class FrameCache:
+    def __init__(self, budget_bytes=FRAME_CACHE_BYTES):
+        self.budget = budget_bytes
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # (video, frame) -> (value, nbytes), oldest first
+        self.bytes = 0
+        self.hits = {}
+        self.misses = {}
+        self.owners = {}  # video -> number of registered users (decoders)
+
+    def register(self, video):
+        with self.lock:
+            self.owners[video] = self.owners.get(video, 0) + 1
+
+    def unregister(self, video):
+        """
+        Drops a user of video; its frames are released once nobody uses it any more.
+        """
+        with self.lock:
+            n = self.owners.get(video, 0) - 1
+            if n > 0:
+                self.owners[video] = n
+                return
+            self.owners.pop(video, None)
+            for key in [k for k in self.entries if k[0] == video]:
+                self.bytes -= self.entries.pop(key)[1]
+
+    def get(self, video, frame_idx):
+        with self.lock:
+            item = self.entries.get((video, frame_idx))
+            if item is None:
+                self.misses[video] = self.misses.get(video, 0) + 1
+                return None
+            self.entries.move_to_end((video, frame_idx))
+            self.hits[video] = self.hits.get(video, 0) + 1
+            return item[0]
+
+    def peek(self, video, frame_idx):
+        with self.lock:
+            item = self.entries.get((video, frame_idx))
+            return None if item is None else item[0]
+
+    def first_missing(self, video, frame_indices, skip=()):
+        """
+        First index of frame_indices that is not cached (and not in skip), or None.
+        """
+        with self.lock:
+            for idx in frame_indices:
+                if (video, idx) not in self.entries and idx not in skip:
+                    return idx
+        return None
+
+    def nearest(self, video, frame_idx, radius):
+        """
+        Cached value closest to frame_idx within radius frames (ties go to the earlier
+        frame), or None. Not counted as a hit or miss.
+        """
+        with self.lock:
+            for d in range(radius + 1):
+                for idx in ((frame_idx - d, frame_idx + d) if d else (frame_idx,)):
+                    item = self.entries.get((video, idx))
+                    if item is not None:
+                        return item[0]
+        return None
+
+    def put(self, video, frame_idx, value, nbytes):
+        if nbytes > self.budget:
+            return
+        with self.lock:
+            key = (video, frame_idx)
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            self.entries[key] = (value, nbytes)
+            self.bytes += nbytes
+            while self.bytes > self.budget and self.entries:
+                _, (_, size) = self.entries.popitem(last=False)
+                self.bytes -= size
+
+    def prefetch_frames(self, frame_bytes):
+        """
+        Frames each video may prefetch on each side of its playhead, so that all
+        registered videos' windows fit into half the budget together (the other half
+        keeps recently viewed frames).
+        """
+        with self.lock:
+            videos = max(1, len(self.owners))
+        if frame_bytes <= 0:
+            return PREFETCH_FRAMES
+        per_video = self.budget // (2 * videos * frame_bytes)
+        return min(PREFETCH_FRAMES, per_video // 2)
+
+    def stats(self, video=None):
+        """
+        {"hits", "misses", "frames", "bytes"} for one video, or totals when video is None.
+        """
+        with self.lock:
+            if video is None:
+                return {"hits": sum(self.hits.values()), "misses": sum(self.misses.values()),
+                        "frames": len(self.entries), "bytes": self.bytes, "budget": self.budget}
+            sizes = [size for (v, _), (_, size) in self.entries.items() if v == video]
+            return {"hits": self.hits.get(video, 0), "misses": self.misses.get(video, 0),
+                    "frames": len(sizes), "bytes": sum(sizes)}
+
+
+_cache = None
+
+def frame_cache():
+    global _cache
+    if _cache is None:
+        _cache = FrameCache()
+    return _cache
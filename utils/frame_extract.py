@@ -0,0 +1,62 @@
+# utils/frame_extract.py
+
+"""
+Batch frame extraction without preview rendering.
+
+Each job decodes one video forward (grab() for skipped frames, a real seek only across
+large gaps) and hands the requested frames to a sink, e.g. a screenshot writer. Jobs for
+different videos run in parallel threads; OpenCV releases the GIL while decoding.
+"""
+
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+from utils.keyframe_index import load_cached_keyframes
+from utils.video_reader import FORWARD_DECODE_LIMIT, SequentialReader
+
+# frames: ascending frame indices; targets: one opaque value per frame (e.g. output path)
+ExtractJob = namedtuple("ExtractJob", ["video_path", "frames", "targets"])
+
+def burst_frames(start_frame, count, interval, total_frames):
+    """
+    Frame indices of a burst: count frames, interval apart, starting at start_frame.
+    """
+    interval = max(1, interval)
+    return [start_frame + k * interval for k in range(count)
+            if 0 <= start_frame + k * interval < total_frames]
+
+def extract_frames(job, sink, grab_limit=FORWARD_DECODE_LIMIT):
+    """
+    Decodes job.frames of job.video_path in one forward pass and calls
+    sink(job, target, frame_idx, frame) for every frame read. Returns the number of frames
+    delivered; frames that can't be read (all of them if the video doesn't open) are skipped,
+    so callers compare it with len(job.frames). A cached keyframe index, if any, bounds the
+    seeks across large gaps.
+    """
+    cap = cv2.VideoCapture(job.video_path)
+    if not cap.isOpened():
+        return 0
+    reader = SequentialReader(cap, grab_limit, keyframes=load_cached_keyframes(job.video_path))
+    delivered = 0
+    try:
+        for fidx, target in sorted(zip(job.frames, job.targets), key=lambda ft: ft[0]):
+            frame = reader.read(fidx)
+            if frame is None:
+                continue
+            sink(job, target, fidx, frame)
+            delivered += 1
+    finally:
+        cap.release()
+    return delivered
+
+def run_jobs(jobs, sink, workers=None, grab_limit=FORWARD_DECODE_LIMIT):
+    """
+    Runs extract_frames for every job in parallel. Returns {video_path: frames delivered}.
+    """
+    if not jobs:
+        return {}
+    workers = max(1, min(len(jobs), workers or os.cpu_count() or 1))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="extract") as pool:
+        futures = [(job, pool.submit(extract_frames, job, sink, grab_limit)) for job in jobs]
+        return {job.video_path: fut.result() for job, fut in futures}
@@ -0,0 +1,85 @@
+# utils/frame_render.py
+
+"""
+Qt-free part of the display path: fitting frames to a label size and scaling them to
+32-bit BGRA. player.frame_decoder wraps the result in QImages; decode worker processes
+(utils.decode_worker) use it directly and write into shared memory.
+"""
+
+import cv2
+import numpy as np
+
+
+def fit_size(frame_w, frame_h, label_w, label_h):
+    """
+    Returns the (w, h) that fits a frame into the label while keeping its aspect ratio.
+    """
+    if label_w <= 0 or label_h <= 0:
+        label_w, label_h = 640, 480
+    aspect_frame = frame_w / frame_h
+    aspect_label = label_w / label_h
+    if aspect_frame > aspect_label:
+        return label_w, max(1, int(label_w / aspect_frame))
+    return max(1, int(label_h * aspect_frame)), label_h
+
+
+class FrameScaler:
+    """
+    Scales BGR frames to BGRA at the size that fits a label.
+
+    The geometry (output size and number of 2x steps) is computed once per frame/label
+    size. Downscaling halves the frame with INTER_AREA (fast and alias-free at exactly 2x)
+    while it is at least twice the output size, then finishes with one INTER_LINEAR step;
+    a single INTER_AREA resize at an arbitrary ratio is several times slower. The
+    intermediate buffers are preallocated and reused.
+
+    Not thread-safe: every thread (or process) needs its own scaler.
+    """
+    def __init__(self):
+        self.plans = {}  # (frame_w, frame_h, label_w, label_h) -> (out_w, out_h, halvings)
+        self.scratch = {}  # (h, w) -> reusable BGR buffer
+
+    def plan(self, frame_w, frame_h, label_w, label_h):
+        key = (frame_w, frame_h, label_w, label_h)
+        plan = self.plans.get(key)
+        if plan is None:
+            out_w, out_h = fit_size(frame_w, frame_h, label_w, label_h)
+            halvings = 0
+            w, h = frame_w, frame_h
+            while w // 2 >= out_w and h // 2 >= out_h:
+                w, h = w // 2, h // 2
+                halvings += 1
+            plan = (out_w, out_h, halvings)
+            if len(self.plans) > 64:
+                self.plans.clear()
+            self.plans[key] = plan
+        return plan
+
+    def _buffer(self, h, w):
+        buf = self.scratch.get((h, w))
+        if buf is None:
+            if len(self.scratch) > 16:
+                self.scratch.clear()  # Label sizes changed a lot; drop stale buffers.
+            buf = self.scratch[(h, w)] = np.empty((h, w, 3), np.uint8)
+        return buf
+
+    def scale(self, cv_frame, label_w, label_h, out=None):
+        """
+        Returns the frame fitted to the label as an (h, w, 4) BGRA array, written into
+        `out` when given (its shape must be the fitted size, see plan).
+        """
+        h, w = cv_frame.shape[:2]
+        out_w, out_h, halvings = self.plan(w, h, label_w, label_h)
+        src = cv_frame
+        for _ in range(halvings):
+            h, w = src.shape[:2]
+            # Even dimensions keep INTER_AREA on its exact 2x fast path.
+            src = cv2.resize(src[:h - h % 2, :w - w % 2], (w // 2, h // 2),
+                             dst=self._buffer(h // 2, w // 2), interpolation=cv2.INTER_AREA)
+        if src.shape[1] != out_w or src.shape[0] != out_h:
+            src = cv2.resize(src, (out_w, out_h), dst=self._buffer(out_h, out_w),
+                             interpolation=cv2.INTER_LINEAR)
+        if out is None:
+            out = np.empty((out_h, out_w, 4), np.uint8)
+        cv2.cvtColor(src, cv2.COLOR_BGR2BGRA, dst=out)
+        return out
@@ -0,0 +1,74 @@
+# utils/handle_pool.py
+
+"""
+Bounded LRU set of open resources (e.g. VideoItems holding a cv2.VideoCapture and a
+decoder), so the number of open files, decoder threads/processes and full-resolution
+frames stays fixed however many videos a session lists.
+
+The pool only does the bookkeeping: acquire() says whether a key may open and which
+least recently used keys the caller has to close first to stay within the limit.
+"""
+
+from collections import OrderedDict
+
+DEFAULT_HANDLE_LIMIT = 16
+
+
+class HandlePool:
+    """
+    Open keys in least- to most-recently used order, at most `limit` of them.
+    """
+    def __init__(self, limit=DEFAULT_HANDLE_LIMIT):
+        self.limit = max(1, int(limit))
+        self.open = OrderedDict()  # key -> None, oldest first
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.open)
+
+    def __contains__(self, key):
+        return key in self.open
+
+    def touch(self, key):
+        if key in self.open:
+            self.open.move_to_end(key)
+
+    def acquire(self, key, protected=()):
+        """
+        Marks key open (and most recently used). Returns (granted, evicted): the keys in
+        evicted have been dropped from the pool and must be closed by the caller. Keys
+        in protected (e.g. the ones on screen) are never evicted; if only protected keys
+        are open at the limit, key is not granted.
+        """
+        if key in self.open:
+            self.open.move_to_end(key)
+            return True, []
+        evicted = self._evict(self.limit - 1, protected)
+        if len(self.open) >= self.limit:
+            return False, evicted
+        self.open[key] = None
+        return True, evicted
+
+    def release(self, key):
+        self.open.pop(key, None)
+
+    def set_limit(self, limit, protected=()):
+        """
+        Changes the limit; returns the keys evicted to meet it (protected ones are
+        evicted last).
+        """
+        self.limit = max(1, int(limit))
+        evicted = self._evict(self.limit, protected)
+        return evicted + self._evict(self.limit, ())
+
+    def _evict(self, keep, protected):
+        evicted = []
+        for key in list(self.open):
+            if len(self.open) <= keep:
+                break
+            if key in protected:
+                continue
+            del self.open[key]
+            evicted.append(key)
+        self.evictions += len(evicted)
+        return evicted
@@ -0,0 +1,78 @@
+# utils/headless_export.py
+
+"""
+Headless, synchronized mosaic export: all cameras between two timestamps in one video.
+
+    python main.py export cams/*.mp4 --start "2024-12-05 09:30:00" --end "2024-12-05 09:35:00"
+    python main.py export cam1.mp4 cam2.mp4 --start ... --end ... --output clip.avi --cols 2 --fps 10
+
+Timestamps are mapped to frames like `main.py extract` does (cached or freshly built OCR
+index, or first-frame OCR + duration); see utils.mosaic_export for the pipeline.
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime
+from utils.headless_extract import resolve_timing
+from utils.mosaic_export import EXPORT_WIDTH, ExportSource, export_mosaic
+from utils.time_sync import TIME_FORMAT
+
+
+def parse_time(text):
+    try:
+        return datetime.strptime(text, TIME_FORMAT)
+    except ValueError:
+        raise SystemExit(f"Time format incorrect (YYYY-MM-DD HH:MM:SS): {text!r}")
+
+
+def build_parser():
+    p = argparse.ArgumentParser(prog="main.py export",
+                                description="Export a time range of all cameras as one mosaic video (no GUI).")
+    p.add_argument("videos", nargs="+", help="video files")
+    p.add_argument("--start", required=True, help='first timestamp "YYYY-MM-DD HH:MM:SS"')
+    p.add_argument("--end", required=True, help='last timestamp "YYYY-MM-DD HH:MM:SS"')
+    p.add_argument("--output", default="mosaic.mp4", help="output video (.mp4: mp4v, .avi: MJPG)")
+    p.add_argument("--fps", type=float, default=None, help="output frame rate (default: highest camera fps)")
+    p.add_argument("--cols", type=int, default=None, help="tiles per row (default: square grid)")
+    p.add_argument("--width", type=int, default=EXPORT_WIDTH, help=f"mosaic width (default: {EXPORT_WIDTH})")
+    p.add_argument("--ocr", default="index", choices=["index", "first-frame"],
+                   help="time mapping: whole-file OCR index (cached) or first frame + duration")
+    return p
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    start, end = parse_time(args.start), parse_time(args.end)
+    if end < start:
+        print("The end time is before the start time.")
+        return 2
+    sources = []
+    for video in args.videos:
+        timing = resolve_timing(video, args.ocr)
+        if timing is not None:
+            sources.append(ExportSource(os.path.splitext(os.path.basename(video))[0], timing))
+    if not sources:
+        print("No video with a time mapping.")
+        return 1
+
+    def progress(done, total):
+        print(f"\r[export] {done}/{total} frames", end="", flush=True)
+
+    try:
+        stats = export_mosaic(sources, start, end, args.output, fps=args.fps, cols=args.cols,
+                              width=args.width, progress=progress)
+    except (IOError, ValueError) as e:
+        print(f"\n[error] {e}")
+        return 1
+    print()
+    for name in stats["skipped"]:
+        print(f"[skip] {name}: unreadable")
+    w, h = stats["size"]
+    print(f"[done] {stats['frames']} frames of {len(stats['decoded'])} camera(s), {w}x{h}, in "
+          f"{stats['secs']:.2f}s ({stats['frames'] / max(1e-6, stats['secs']):.1f} fps): {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+# utils/headless_extract.py
+
+"""
+Headless, synchronized frame extraction: every video's frame at each given timestamp.
+
+    python main.py extract cam1.mp4 cam2.mp4 --times "2024-12-05 09:30:00" "2024-12-05 09:31:00"
+    python main.py extract cams/*.mp4 --times-file times.txt --format jpeg --level 90
+
+Timestamps are mapped to frames with the same logic as VideoItem.jump_to_time (cached or
+freshly built OCR index, or first-frame OCR + duration). Requests are sorted per file so each
+video is decoded in one forward pass, and files are processed in parallel worker processes.
+Images go to <output>/<video name without extension>/<remark>_<frame>.<ext>, the layout the
+GUI uses, and a CSV manifest maps every (video, timestamp) to its file.
+"""
+
+import argparse
+import csv
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import cv2
+from utils.frame_extract import ExtractJob, extract_frames
+from utils.image_formats import IMAGE_FORMATS, encode_params
+from utils.keyframe_index import load_cached_keyframes
+from utils.ocr_index import OCR_ROI, build_index, load_cached_index, save_index
+from utils.ocr_utils import extract_time_from_roi
+from utils.time_sync import TIME_FORMAT, VideoTiming, first_frame_time_range
+
+CLI_FORMATS = {"png": "PNG", "jpeg": "JPEG", "jpg": "JPEG", "webp": "WebP (lossless)"}
+
+
+def resolve_timing(video_path, ocr_mode="index", log=print):
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        log(f"[skip] cannot open {video_path}")
+        return None
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    keyframes = load_cached_keyframes(video_path)
+    if keyframes is not None and len(keyframes):
+        # The scanned count, as in the player: the container's estimate can be off.
+        total_frames = len(keyframes)
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    timing = VideoTiming(video_path, total_frames, fps)
+    if ocr_mode == "index":
+        index = load_cached_index(video_path)
+        if index and len(index):
+            log(f"[index] {video_path}: {len(index)} samples (cache), {index.describe()}")
+        else:
+            t0 = time.perf_counter()
+            try:
+                index = build_index(video_path)
+            except Exception as e:
+                log(f"[index] {video_path}: OCR index failed ({e}), trying the first frame")
+                index = None
+            if index is not None:
+                if len(index):
+                    save_index(video_path, index)
+                log(f"[index] {video_path}: {len(index)} samples ({index.refined} adaptive) built in "
+                    f"{time.perf_counter() - t0:.1f}s, {index.describe()}")
+        if index:
+            timing.ts_index = index
+            timing.start_time, timing.end_time = index.start_time, index.end_time
+    if not timing.is_valid():
+        ret, frame = cap.read()
+        dt = None
+        if ret and frame is not None:
+            try:
+                dt = extract_time_from_roi(frame, roi=OCR_ROI)
+            except Exception as e:
+                log(f"[first-frame] {video_path}: OCR failed: {e}")
+        if dt:
+            timing.start_time, timing.end_time = first_frame_time_range(dt, total_frames, fps)
+            log(f"[first-frame] {video_path}: {timing.start_time} ~ {timing.end_time}")
+    cap.release()
+    if not timing.is_valid():
+        log(f"[skip] no timestamp found in {video_path}")
+        return None
+    return timing
+
+
+def extract_video(video_path, frame_paths, fmt, level):
+    """
+    Worker: writes the requested frames ({frame: path}) of one video in a single forward
+    decode. Returns ({frame: written ok}, seconds).
+    """
+    t0 = time.perf_counter()
+    params = encode_params(fmt, level)
+    written = {}
+
+    def sink(job, path, frame_idx, frame):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        written[frame_idx] = bool(cv2.imwrite(path, frame, params))
+
+    frames = sorted(frame_paths)
+    extract_frames(ExtractJob(video_path, frames, [frame_paths[f] for f in frames]), sink)
+    return {f: written.get(f, False) for f in frames}, time.perf_counter() - t0
+
+
+def read_times(args):
+    texts = list(args.times or [])
+    if args.times_file:
+        with open(args.times_file, "r", encoding="utf-8") as f:
+            texts.extend(line.strip() for line in f if line.strip() and not line.startswith("#"))
+    times = []
+    for t in texts:
+        try:
+            times.append(datetime.strptime(t, TIME_FORMAT))
+        except ValueError:
+            raise SystemExit(f"Time format incorrect (YYYY-MM-DD HH:MM:SS): {t!r}")
+    return times
+
+
+def build_parser():
+    p = argparse.ArgumentParser(prog="main.py extract",
+                                description="Extract every camera's frame at the given timestamps (no GUI).")
+    p.add_argument("videos", nargs="+", help="video files")
+    p.add_argument("--times", nargs="*", help='timestamps "YYYY-MM-DD HH:MM:SS"')
+    p.add_argument("--times-file", help="file with one timestamp per line")
+    p.add_argument("--output", default="screenshots", help="output root (default: screenshots)")
+    p.add_argument("--remark", default="screenshot", help="filename prefix (default: screenshot)")
+    p.add_argument("--format", default="png", choices=sorted(CLI_FORMATS))
+    p.add_argument("--level", type=int, help="PNG compression 0-9 / JPEG quality 0-100")
+    p.add_argument("--ocr", default="index", choices=["index", "first-frame"],
+                   help="time mapping: whole-file OCR index (cached) or first frame + duration")
+    p.add_argument("--workers", type=int, default=None, help="parallel files (default: CPU count)")
+    p.add_argument("--manifest", default=None, help="CSV manifest path (default: <output>/extract_manifest.csv)")
+    return p
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    times = read_times(args)
+    if not times:
+        print("No timestamps given (--times or --times-file).")
+        return 2
+    fmt = CLI_FORMATS[args.format]
+    ext, (lo, hi), default_level = IMAGE_FORMATS[fmt]
+    level = default_level if args.level is None else max(lo, min(hi, args.level))
+
+    t0 = time.perf_counter()
+    rows = []
+    tasks = []
+    for video in args.videos:
+        timing = resolve_timing(video, args.ocr)
+        if timing is None:
+            rows.extend([video, dt.strftime(TIME_FORMAT), "", "", "skipped", "", ""] for dt in times)
+            continue
+        name = os.path.splitext(os.path.basename(video))[0]
+        frame_paths = {}
+        requests = []
+        for dt in times:
+            if not timing.covers(dt):
+                rows.append([video, dt.strftime(TIME_FORMAT), "", "", "out of range", "", ""])
+                continue
+            fidx, error, gap = timing.locate(dt)
+            path = os.path.join(args.output, name, f"{args.remark}_{fidx}{ext}")
+            frame_paths[fidx] = path
+            gap_text = f"{gap[0].strftime(TIME_FORMAT)} ~ {gap[1].strftime(TIME_FORMAT)}" if gap else ""
+            requests.append((dt, fidx, path, "" if error is None else f"{error:.3f}", gap_text))
+        if frame_paths:
+            tasks.append((video, frame_paths, requests))
+
+    workers = max(1, min(len(tasks) or 1, args.workers or os.cpu_count() or 1))
+    ctx = multiprocessing.get_context("spawn")
+    total_written = 0
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        futures = [(video, requests, pool.submit(extract_video, video, frame_paths, fmt, level))
+                   for video, frame_paths, requests in tasks]
+        for video, requests, fut in futures:
+            status, secs = fut.result()
+            ok = sum(status.values())
+            total_written += ok
+            print(f"[extract] {video}: {ok}/{len(status)} frames in {secs:.2f}s")
+            for dt, fidx, path, error, gap_text in requests:
+                rows.append([video, dt.strftime(TIME_FORMAT), fidx, path, "ok" if status.get(fidx) else "failed",
+                             error, gap_text])
+
+    manifest = args.manifest or os.path.join(args.output, "extract_manifest.csv")
+    os.makedirs(os.path.dirname(manifest) or ".", exist_ok=True)
+    with open(manifest, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        # error_s: expected timing error of the frame (OCR index only); gap: recording gap
+        # the timestamp falls into (the first frame after it was written).
+        w.writerow(["video", "timestamp", "frame", "path", "status", "error_s", "gap"])
+        w.writerows(rows)
+    print(f"[done] {total_written} images from {len(tasks)} video(s) in "
+          f"{time.perf_counter() - t0:.2f}s, manifest: {manifest}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,21 @@
+# utils/image_formats.py
+
+import cv2
+
+# format name -> (file extension, level range, default level)
+IMAGE_FORMATS = {
+    "PNG": (".png", (0, 9), 3),
+    "JPEG": (".jpg", (0, 100), 95),
+    "WebP (lossless)": (".webp", (0, 0), 0),
+}
+DEFAULT_FORMAT = "PNG"
+
+def encode_params(fmt, level):
+    if fmt == "PNG":
+        return [cv2.IMWRITE_PNG_COMPRESSION, int(level)]
+    if fmt == "JPEG":
+        return [cv2.IMWRITE_JPEG_QUALITY, int(level)]
+    if fmt == "WebP (lossless)":
+        # WebP quality above 100 selects lossless encoding.
+        return [cv2.IMWRITE_WEBP_QUALITY, 101]
+    raise ValueError(f"Unknown image format: {fmt}")
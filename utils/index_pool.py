@@ -0,0 +1,42 @@
+# utils/index_pool.py
+
+"""
+Process pool shared by the background whole-file passes (activity index, thumbnails, OCR
+timestamp index): one worker per core, each task reading one video (or one stretch of it)
+front to back, so several files are processed in parallel without oversubscribing the
+machine.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+_pool = None
+# Indexing threads of several videos ask for the pool at the same moment.
+_lock = threading.Lock()
+
+def index_pool():
+    global _pool
+    with _lock:
+        if _pool is None:
+            # "spawn" keeps workers clean when called from a GUI thread.
+            _pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1,
+                                        mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+def reset_index_pool(terminate=False):
+    """
+    Drops the shared pool (e.g. after a worker died and broke it); the next use starts a new one.
+    Queued tasks are cancelled; with terminate=True (on exit) running workers are killed too,
+    so threads waiting on their results return instead of blocking until the pass finishes.
+    """
+    global _pool
+    with _lock:
+        pool, _pool = _pool, None
+    if pool is None:
+        return
+    workers = list((getattr(pool, "_processes", None) or {}).values()) if terminate else []
+    pool.shutdown(wait=False, cancel_futures=True)
+    for proc in workers:
+        proc.terminate()
@@ -0,0 +1,108 @@
+# utils/keyframe_index.py
+
+"""
+Keyframe (GOP) index of a video: true frame count, keyframe positions and per-frame
+presentation timestamps, from a one-time scan of the compressed packets.
+
+With the index a reader can check where a CAP_PROP_POS_FRAMES seek landed (it is inexact
+on some long-GOP files, depending on the backend) and, only when it missed, seek to the
+keyframe at or before the target and decode forward a known distance (at most one GOP).
+See utils.video_reader.SequentialReader.
+"""
+
+import bisect
+import cv2
+from utils.video_cache import load_json, save_json
+
+CACHE_KIND = "keyframes"
+
+
+class KeyframeIndex:
+    def __init__(self, frame_count, keyframes, pts_ms, container_frames=0):
+        self.frame_count = frame_count
+        self.keyframes = sorted(keyframes)
+        self.pts_ms = list(pts_ms)
+        self.container_frames = container_frames  # CAP_PROP_FRAME_COUNT, for reporting
+
+    def __len__(self):
+        return self.frame_count
+
+    def has_keyframes(self):
+        return bool(self.keyframes)
+
+    def keyframe_before(self, frame_idx):
+        """
+        Keyframe at or before frame_idx (0 if unknown).
+        """
+        i = bisect.bisect_right(self.keyframes, frame_idx) - 1
+        return self.keyframes[i] if i >= 0 else 0
+
+    def keyframe_after(self, frame_idx):
+        """
+        First keyframe at or after frame_idx (None if there is none).
+        """
+        i = bisect.bisect_left(self.keyframes, frame_idx)
+        return self.keyframes[i] if i < len(self.keyframes) else None
+
+    def max_gop(self):
+        """
+        Longest keyframe distance in frames: the most frames a seek has to decode.
+        """
+        if not self.keyframes:
+            return self.frame_count
+        bounds = self.keyframes + [self.frame_count]
+        return max(b - a for a, b in zip(bounds, bounds[1:]))
+
+    def frame_msec(self, frame_idx):
+        if 0 <= frame_idx < len(self.pts_ms):
+            return self.pts_ms[frame_idx]
+        return None
+
+    def to_json(self):
+        return {
+            "frame_count": self.frame_count,
+            "container_frames": self.container_frames,
+            "keyframes": self.keyframes,
+            "pts_ms": [round(t, 3) for t in self.pts_ms],
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data["frame_count"], data["keyframes"], data["pts_ms"],
+                   data.get("container_frames", 0))
+
+
+def scan_keyframes(video_path):
+    """
+    Reads every packet of the video once. With raw packet output (CAP_PROP_FORMAT = -1)
+    nothing is decoded, so the scan costs little more than reading the file. Backends
+    without raw mode are scanned with grab(), and keyframes stay unknown (empty) if the
+    backend does not report them. Returns a KeyframeIndex, or None if the file can't be opened.
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        return None
+    container_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    raw = cap.set(cv2.CAP_PROP_FORMAT, -1)
+    keyframes = []
+    pts_ms = []
+    try:
+        while cap.grab():
+            if raw and cap.get(cv2.CAP_PROP_LRF_HAS_KEY_FRAME):
+                keyframes.append(len(pts_ms))
+            pts_ms.append(cap.get(cv2.CAP_PROP_POS_MSEC))
+    finally:
+        cap.release()
+    return KeyframeIndex(len(pts_ms), keyframes, pts_ms, container_frames)
+
+def load_cached_keyframes(video_path):
+    data = load_json(video_path, CACHE_KIND)
+    if not data:
+        return None
+    try:
+        return KeyframeIndex.from_json(data)
+    except (KeyError, ValueError, TypeError):
+        return None
+
+def save_keyframes(video_path, index):
+    return save_json(video_path, CACHE_KIND, index.to_json())
@@ -0,0 +1,155 @@
+# utils/log_sink.py
+
+"""
+Bounded, batched log store behind the player's log panel (player.log_view).
+
+Callers keep logging colored HTML fragments; emit() only appends a record to a
+fixed-size ring (LOG_RING_RECORDS), so logging costs the same however long the session
+runs and never touches a widget. The view drains new records on a timer and appends
+them in one batch; filtering by level and source re-renders from the ring. With a log
+file set, records are also written as plain text to a rotating file
+(logging.handlers.RotatingFileHandler), in batches: on every view flush, and by the
+emitting thread when half the ring is waiting to be written, so bursts are not lost.
+
+Levels are the standard logging levels. Records without an explicit level get one from
+their color: red is an error, everything else info.
+"""
+
+import html
+import logging
+import re
+import threading
+import time
+from collections import deque, namedtuple
+from logging.handlers import RotatingFileHandler
+
+LOG_RING_RECORDS = 5000
+LOG_FILE_BYTES = 5 * 1024 * 1024
+LOG_FILE_BACKUPS = 3
+DEFAULT_SOURCE = "Player"
+LEVELS = {
+    "Debug": logging.DEBUG,
+    "Info": logging.INFO,
+    "Warning": logging.WARNING,
+    "Error": logging.ERROR,
+}
+
+LogRecord = namedtuple("LogRecord", ["seq", "time", "level", "source", "html"])
+
+_TAG = re.compile(r"<[^>]+>")
+_ERROR_COLOR = re.compile(r"color=['\"]?red['\"]?", re.IGNORECASE)
+
+
+def level_from_html(fragment):
+    return logging.ERROR if _ERROR_COLOR.search(fragment) else logging.INFO
+
+
+def html_to_text(fragment):
+    return html.unescape(_TAG.sub("", fragment.replace("<br>", " ")))
+
+
+class LogSink:
+    """
+    Thread-safe ring of LogRecords. Records get increasing sequence numbers, so a reader
+    can ask for everything after the last record it has seen (records_after); records
+    that fell out of the ring before being read are counted as lost.
+    """
+    def __init__(self, capacity=LOG_RING_RECORDS):
+        self.lock = threading.Lock()
+        self.records = deque(maxlen=capacity)
+        self.seq = 0
+        self.sources = {}  # source -> records emitted
+        self.file_handler = None
+        self.file_lock = threading.Lock()
+        self.file_seq = 0  # Last record written to the log file.
+
+    def emit(self, fragment, level=None, source=None):
+        if level is None:
+            level = level_from_html(fragment)
+        source = source or DEFAULT_SOURCE
+        with self.lock:
+            self.seq += 1
+            self.records.append(LogRecord(self.seq, time.time(), level, source, fragment))
+            self.sources[source] = self.sources.get(source, 0) + 1
+            backlog = self.seq - self.file_seq if self.file_handler else 0
+        if backlog >= self.records.maxlen // 2:
+            self.flush_file()
+
+    def records_after(self, seq, min_level=logging.NOTSET, source=None):
+        """
+        Returns (records newer than seq that pass the filter, records lost from the ring,
+        sequence number of the newest record).
+        """
+        with self.lock:
+            records = list(self.records)
+            newest = self.seq
+        lost = max(0, records[0].seq - seq - 1) if records else 0
+        return [r for r in records if r.seq > seq and r.level >= min_level
+                and (source is None or r.source == source)], lost, newest
+
+    def last_seq(self):
+        with self.lock:
+            return self.seq
+
+    def source_names(self):
+        with self.lock:
+            return sorted(self.sources)
+
+    def clear(self):
+        self.flush_file()
+        with self.lock:
+            self.records.clear()
+
+    # ---------- Log file ----------
+    def set_file(self, path, max_bytes=LOG_FILE_BYTES, backups=LOG_FILE_BACKUPS):
+        """
+        Starts writing records (from now on) to a rotating plain-text file; None stops.
+        """
+        handler = None
+        if path:
+            handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)-7s [%(name)s] %(message)s"))
+        self.flush_file()
+        with self.file_lock:
+            if self.file_handler:
+                self.file_handler.close()
+            self.file_handler = handler
+            self.file_seq = self.last_seq()
+
+    def flush_file(self):
+        """
+        Writes the records emitted since the last call to the log file, if one is set.
+        """
+        with self.file_lock:
+            handler = self.file_handler
+            if not handler:
+                return
+            records, lost, self.file_seq = self.records_after(self.file_seq)
+            lines = []
+            if lost:
+                lines.append(self._file_record(logging.WARNING, "log", time.time(),
+                                               f"{lost} record(s) lost before writing"))
+            lines.extend(self._file_record(r.level, r.source, r.time, html_to_text(r.html)) for r in records)
+            with handler.lock:
+                for record in lines:
+                    # Same rotation as RotatingFileHandler.emit, one stream flush per batch.
+                    if handler.shouldRollover(record):
+                        handler.doRollover()
+                    handler.stream.write(handler.format(record) + handler.terminator)
+                if lines:
+                    handler.stream.flush()
+
+    @staticmethod
+    def _file_record(level, source, created, text):
+        record = logging.LogRecord(source, level, "", 0, text, None, None)
+        record.created = created
+        record.msecs = (created - int(created)) * 1000
+        return record
+
+_sink = None
+
+def log_sink():
+    global _sink
+    if _sink is None:
+        _sink = LogSink()
+    return _sink
@@ -0,0 +1,234 @@
+# utils/mosaic_export.py
+
+"""
+Synchronized mosaic export: every camera between two timestamps, tiled into one video.
+
+Output frames are spaced 1/fps apart in wall-clock time. For each one, every source shows
+the frame its time mapping (utils.time_sync.VideoTiming) gives for that time, so the tiles
+stay in sync whatever the frame rates and start times of the cameras; a camera that does
+not cover the time shows an empty tile.
+
+Each source is decoded forward in its own thread (grab() for skipped frames, a seek only
+at the start or across a gap) and resized to its tile there. Tiles travel through bounded
+queues to the composer, which pastes them into one preallocated canvas, draws the
+timestamps and streams it to cv2.VideoWriter. Memory use depends on the tile size and
+EXPORT_QUEUE_FRAMES, not on the length of the clip.
+"""
+
+import math
+import os
+import queue
+import threading
+import time
+from collections import namedtuple
+from datetime import timedelta
+import cv2
+import numpy as np
+from utils.frame_render import fit_size
+from utils.keyframe_index import load_cached_keyframes
+from utils.time_sync import TIME_FORMAT
+from utils.video_reader import FORWARD_DECODE_LIMIT, SequentialReader
+
+# Tiles buffered per source between its reader thread and the composer.
+EXPORT_QUEUE_FRAMES = 8
+# Default mosaic width in pixels (tiles are scaled down to fit it).
+EXPORT_WIDTH = 1920
+# Height of the strip above the tiles that shows the export time.
+HEADER_HEIGHT = 28
+# FourCC per output extension; anything else is written as mp4v.
+EXPORT_FOURCC = {".avi": "MJPG", ".mp4": "mp4v", ".mov": "mp4v", ".mkv": "mp4v"}
+# Output times are mapped to frames this much later, so rounding in the time arithmetic
+# does not pick the previous frame of a source running at the output rate.
+SAMPLE_LEAD = timedelta(milliseconds=1)
+# Seconds a blocked queue operation waits before checking for cancellation.
+QUEUE_POLL_SECS = 0.2
+
+# name: label drawn on the tile; timing: utils.time_sync.VideoTiming of the video.
+ExportSource = namedtuple("ExportSource", ["name", "timing"])
+
+
+def export_times(start_time, end_time, fps):
+    """
+    Number of output frames between start_time and end_time (inclusive) at fps.
+    """
+    secs = (end_time - start_time).total_seconds()
+    return int(math.floor(secs * fps)) + 1 if secs >= 0 and fps > 0 else 0
+
+
+def mosaic_layout(count, frame_w, frame_h, cols=None, width=EXPORT_WIDTH):
+    """
+    (cols, rows, tile_w, tile_h) of a mosaic of count tiles with the aspect of
+    frame_w x frame_h, at most width pixels wide. Sizes are even, as most codecs need.
+    """
+    cols = max(1, min(cols or math.ceil(math.sqrt(count)), count))
+    rows = max(1, math.ceil(count / cols))
+    tile_w = max(2, (min(width // cols, frame_w) // 2) * 2)
+    tile_h = max(2, (int(tile_w * frame_h / max(1, frame_w)) // 2) * 2)
+    return cols, rows, tile_w, tile_h
+
+
+def draw_label(canvas, text, x, y, scale=0.5):
+    """
+    Yellow text with a dark outline, readable on any footage; (x, y) is the baseline.
+    """
+    cv2.putText(canvas, text, (x, y), cv2.FONT_HERSHEY_SIMPLEX, scale, (0, 0, 0), 3, cv2.LINE_AA)
+    cv2.putText(canvas, text, (x, y), cv2.FONT_HERSHEY_SIMPLEX, scale, (0, 255, 255), 1, cv2.LINE_AA)
+
+
+class SourceReader(threading.Thread):
+    """
+    Decodes one source forward for a sequence of output times and puts one
+    (frame index or None, tile or None) per time into a bounded queue. A frame shown at
+    several output times (output fps above the source's) is decoded and resized once.
+    """
+    def __init__(self, source, cap, start_time, step, count, tile_size, stop):
+        super().__init__(name=f"export-{source.name}", daemon=True)
+        self.source = source
+        self.cap = cap
+        self.start_time = start_time
+        self.step = step  # timedelta between output frames
+        self.count = count
+        self.tile_size = tile_size
+        self.stop = stop
+        self.queue = queue.Queue(maxsize=EXPORT_QUEUE_FRAMES)
+        self.decoded = 0
+        self.error = None
+
+    def run(self):
+        timing = self.source.timing
+        reader = SequentialReader(self.cap, FORWARD_DECODE_LIMIT,
+                                  keyframes=load_cached_keyframes(timing.video_path))
+        first, last = timing.frame_to_time(0), timing.frame_to_time(timing.total_frames - 1)
+        shown_idx = tile = None
+        try:
+            for k in range(self.count):
+                t = self.start_time + self.step * k + SAMPLE_LEAD
+                idx = None
+                if first is not None and first <= t <= last:
+                    idx = timing.time_to_frame(t)
+                if idx is not None and idx != shown_idx:
+                    frame = reader.read(idx)
+                    tile = self._fit(frame) if frame is not None else None
+                    shown_idx = idx
+                    self.decoded += 1
+                if not self._put((idx, tile if idx is not None else None)):
+                    return
+        except Exception as e:
+            self.error = str(e)
+            self._put(None)
+        finally:
+            self.cap.release()
+
+    def _fit(self, frame):
+        h, w = frame.shape[:2]
+        out_w, out_h = fit_size(w, h, *self.tile_size)
+        if (out_w, out_h) == (w, h):
+            return frame
+        return cv2.resize(frame, (out_w, out_h), interpolation=cv2.INTER_AREA)
+
+    def _put(self, item):
+        while not self.stop.is_set():
+            try:
+                self.queue.put(item, timeout=QUEUE_POLL_SECS)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def take(self):
+        """
+        Next (frame index, tile); None once the reader failed or the export stopped.
+        """
+        while not self.stop.is_set():
+            try:
+                return self.queue.get(timeout=QUEUE_POLL_SECS)
+            except queue.Empty:
+                if not self.is_alive() and self.queue.empty():
+                    return None
+        return None
+
+
+def export_mosaic(sources, start_time, end_time, path, fps=None, cols=None, width=EXPORT_WIDTH,
+                  progress=None, alive=lambda: True):
+    """
+    Writes the mosaic of sources (ExportSource list) from start_time to end_time to path.
+    progress(done, total) is called about once per output second; the export stops early
+    when alive() turns false. Returns {"frames", "total", "secs", "size", "decoded",
+    "skipped"} (decoded per source name; skipped: unreadable sources or sources without
+    a time mapping).
+    """
+    t0 = time.perf_counter()
+    opened = []
+    skipped = []
+    for src in sources:
+        cap = cv2.VideoCapture(src.timing.video_path)
+        if cap.isOpened() and src.timing.is_valid() and src.timing.total_frames > 0:
+            opened.append((src, cap))
+        else:
+            cap.release()
+            skipped.append(src.name)
+    if not opened:
+        raise ValueError("No video with a time mapping to export.")
+    if fps is None or fps <= 0:
+        fps = max((src.timing.fps for src, _ in opened), default=0) or 25.0
+    total = export_times(start_time, end_time, fps)
+    if total <= 0:
+        for _, cap in opened:
+            cap.release()
+        raise ValueError("The export range is empty.")
+
+    first_cap = opened[0][1]
+    frame_w = int(first_cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or 640
+    frame_h = int(first_cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) or 360
+    cols, rows, tile_w, tile_h = mosaic_layout(len(opened), frame_w, frame_h, cols, width)
+    size = (cols * tile_w, rows * tile_h + HEADER_HEIGHT)
+    fourcc = EXPORT_FOURCC.get(os.path.splitext(path)[1].lower(), "mp4v")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*fourcc), fps, size)
+    if not writer.isOpened():
+        for _, cap in opened:
+            cap.release()
+        raise IOError(f"Cannot write {path} ({fourcc})")
+
+    stop = threading.Event()
+    step = timedelta(seconds=1.0 / fps)
+    readers = [SourceReader(src, cap, start_time, step, total, (tile_w, tile_h), stop)
+               for src, cap in opened]
+    for r in readers:
+        r.start()
+    canvas = np.zeros((size[1], size[0], 3), dtype=np.uint8)
+    report_every = max(1, int(round(fps)))
+    written = 0
+    try:
+        for k in range(total):
+            if not alive():
+                break
+            canvas[:] = 0
+            t = start_time + step * k
+            draw_label(canvas, t.strftime(TIME_FORMAT) + f".{t.microsecond // 1000:03d}", 6, HEADER_HEIGHT - 8, 0.6)
+            for i, r in enumerate(readers):
+                item = r.take()
+                if item is None:
+                    raise IOError(r.error or f"{r.source.name}: reader stopped")
+                idx, tile = item
+                x0, y0 = (i % cols) * tile_w, HEADER_HEIGHT + (i // cols) * tile_h
+                if tile is not None:
+                    th, tw = tile.shape[:2]
+                    x, y = x0 + (tile_w - tw) // 2, y0 + (tile_h - th) // 2
+                    canvas[y:y + th, x:x + tw] = tile
+                    shown = r.source.timing.frame_to_time(idx)
+                    label = f"{r.source.name}  {shown.strftime('%H:%M:%S') if shown else ''}  #{idx}"
+                else:
+                    label = f"{r.source.name}  (no video)"
+                draw_label(canvas, label, x0 + 4, y0 + tile_h - 6)
+            writer.write(canvas)
+            written += 1
+            if progress and (written % report_every == 0 or written == total):
+                progress(written, total)
+    finally:
+        stop.set()
+        for r in readers:
+            r.join()
+        writer.release()
+    return {"frames": written, "total": total, "secs": time.perf_counter() - t0, "size": size,
+            "decoded": {r.source.name: r.decoded for r in readers}, "skipped": skipped}
@@ -0,0 +1,255 @@
+# utils/motion_index.py
+
+"""
+Per-camera activity timeline: how much of the picture changes over time, from one
+sequential pass over the video, cached on disk like the other indexes (utils.video_cache).
+
+Frames are sampled SAMPLE_FPS times per second. Frames in between are only grabbed
+(decoded, not converted); sampled ones are turned into small grayscale thumbnails
+(THUMB_WIDTH wide). Activity is computed for a batch of thumbnails at once with numpy:
+the fraction of pixels whose brightness changed by more than PIXEL_DELTA since the
+previous sample. The burned-in clock (the OCR ROI) is masked out, since it changes every
+second. Contiguous samples above the camera's event threshold form events, which the
+player draws on its slider and jumps between. The mean brightness of each sample is kept
+as well; with the activity it is the signature utils.alignment correlates across cameras.
+
+Every video is indexed by one worker of the shared process pool (utils.index_pool), so
+several files are indexed in parallel while each file is read front to back.
+"""
+
+import cv2
+import numpy as np
+from utils.ocr_index import OCR_ROI
+from utils.video_cache import load_json, save_json
+
+CACHE_KIND = "motion"
+SAMPLE_FPS = 5
+THUMB_WIDTH = 64
+# Brightness change (0-255) for a thumbnail pixel to count as changed.
+PIXEL_DELTA = 12
+# Thumbnails differenced per numpy batch.
+BATCH = 256
+# Event threshold: at least MIN_EVENT_ACTIVITY of the pixels changed, and clearly above
+# the camera's usual level (median activity) to ignore noise and constant motion.
+MIN_EVENT_ACTIVITY = 0.005
+NOISE_FACTOR = 3.0
+# Events closer together than this are merged.
+EVENT_MERGE_SECS = 2.0
+
+
+class MotionIndex:
+    """
+    Activity (fraction of changed pixels, 0..1) of every step-th frame of one video;
+    activity[i] describes the change from sample i - 1 to sample i (activity[0] is 0).
+    brightness[i] is the mean brightness (0..1) of sample i, None in caches from before
+    it was recorded.
+    """
+    def __init__(self, step, activity, total_frames, fps, threshold=None, brightness=None):
+        self.step = max(1, int(step))
+        self.activity = np.asarray(activity, dtype=np.float32)
+        self.brightness = np.asarray(brightness, dtype=np.float32) if brightness is not None else None
+        self.total_frames = total_frames
+        self.fps = fps if fps > 0 else 25
+        self.threshold = threshold if threshold is not None else self.default_threshold()
+        self.events = self.find_events()
+
+    def __len__(self):
+        return len(self.activity)
+
+    def default_threshold(self):
+        if not len(self.activity):
+            return MIN_EVENT_ACTIVITY
+        return max(MIN_EVENT_ACTIVITY, NOISE_FACTOR * float(np.median(self.activity)))
+
+    def find_events(self):
+        """
+        [(first frame, last frame, peak activity)] of the runs of samples above the
+        threshold, merged when less than EVENT_MERGE_SECS apart.
+        """
+        active = self.activity >= self.threshold
+        if not active.any():
+            return []
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], active.astype(np.int8), [0]))))
+        runs = list(zip(edges[::2], edges[1::2] - 1))  # sample ranges, inclusive
+        merge = max(1, int(EVENT_MERGE_SECS * self.fps / self.step))
+        merged = [list(runs[0])]
+        for a, b in runs[1:]:
+            if a - merged[-1][1] <= merge:
+                merged[-1][1] = b
+            else:
+                merged.append([a, b])
+        # A change shows up in the sample after it; the event starts one sample earlier.
+        return [(max(0, int(a - 1) * self.step), min(self.total_frames - 1, int(b) * self.step),
+                 float(self.activity[a:b + 1].max())) for a, b in merged]
+
+    def activity_at(self, frame_idx):
+        i = min(len(self.activity) - 1, max(0, frame_idx // self.step))
+        return float(self.activity[i]) if len(self.activity) else 0.0
+
+    def next_event(self, frame_idx):
+        """
+        First frame of the first event starting after frame_idx, or None.
+        """
+        for start, _, _ in self.events:
+            if start > frame_idx:
+                return start
+        return None
+
+    def previous_event(self, frame_idx):
+        """
+        First frame of the last event starting before frame_idx, or None.
+        """
+        for start, _, _ in reversed(self.events):
+            if start < frame_idx:
+                return start
+        return None
+
+    def event_at(self, frame_idx):
+        for event in self.events:
+            if event[0] <= frame_idx <= event[1]:
+                return event
+        return None
+
+    def strip(self, bins):
+        """
+        Peak activity over each of `bins` equal parts of the video, for a heat strip.
+        """
+        if not len(self.activity) or bins < 1:
+            return np.zeros(max(0, bins), dtype=np.float32)
+        edges = np.linspace(0, len(self.activity), bins + 1).astype(int)
+        edges[1:] = np.maximum(edges[1:], edges[:-1] + 1)
+        edges = np.minimum(edges, len(self.activity))
+        return np.array([self.activity[a:b].max() if b > a else 0.0
+                         for a, b in zip(edges[:-1], edges[1:])], dtype=np.float32)
+
+    def describe(self):
+        busy = float(np.count_nonzero(self.activity >= self.threshold)) / max(1, len(self.activity))
+        return (f"{len(self.events)} events, active {busy:.0%} of the time, "
+                f"threshold {self.threshold:.1%} of pixels")
+
+    def to_json(self):
+        return {
+            "step": self.step,
+            "total_frames": self.total_frames,
+            "fps": self.fps,
+            "activity": [round(float(a), 4) for a in self.activity],
+            "brightness": ([round(float(b), 4) for b in self.brightness]
+                           if self.brightness is not None else None),
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data["step"], data["activity"], data["total_frames"], data["fps"],
+                   brightness=data.get("brightness"))
+
+
+def activity_mask(width, height, thumb_w, thumb_h, roi=OCR_ROI):
+    """
+    Thumbnail pixels that count (False inside the clock overlay).
+    """
+    mask = np.ones((thumb_h, thumb_w), dtype=bool)
+    if roi:
+        x, y, w, h = roi
+        sx, sy = thumb_w / max(1, width), thumb_h / max(1, height)
+        mask[int(y * sy):int(np.ceil((y + h) * sy)), int(x * sx):int(np.ceil((x + w) * sx))] = False
+    return mask
+
+
+def batch_activity(thumbs, previous, mask):
+    """
+    Vectorized differencing: fraction of masked pixels changed by more than PIXEL_DELTA
+    between consecutive thumbnails of the (n, h, w) uint8 batch; previous is the
+    thumbnail before the batch (None at the start, activity 0).
+    """
+    stack = thumbs.astype(np.int16)
+    if previous is not None:
+        stack = np.concatenate((previous[None].astype(np.int16), stack))
+    changed = np.abs(np.diff(stack, axis=0)) > PIXEL_DELTA
+    fractions = changed[:, mask].mean(axis=1) if mask.any() else np.zeros(len(changed))
+    if previous is None:
+        fractions = np.concatenate(([0.0], fractions))
+    return fractions.astype(np.float32)
+
+
+def batch_brightness(thumbs, mask):
+    """
+    Mean brightness (0..1) of the masked pixels of each thumbnail of the batch.
+    """
+    if not mask.any():
+        return np.zeros(len(thumbs), dtype=np.float32)
+    return (thumbs[:, mask].mean(axis=1) / 255.0).astype(np.float32)
+
+
+def build_motion_index(video_path, sample_fps=SAMPLE_FPS, thumb_width=THUMB_WIDTH, roi=OCR_ROI):
+    """
+    Reads the video once, front to back, and returns its MotionIndex (None if the file
+    cannot be opened).
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        return None
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    step = max(1, int(round((fps if fps > 0 else 25) / sample_fps)))
+    thumb_w = max(8, thumb_width)
+    thumb_h = max(2, int(round(thumb_w * height / max(1, width))))
+    mask = activity_mask(width, height, thumb_w, thumb_h, roi)
+    thumbs = np.empty((BATCH, thumb_h, thumb_w), dtype=np.uint8)
+    chunks = []
+    levels = []
+    previous = None
+    n = 0
+    frame_idx = 0
+    try:
+        while cap.grab():
+            if frame_idx % step == 0:
+                ok, frame = cap.retrieve()
+                if not ok:
+                    break
+                gray = cv2.cvtColor(cv2.resize(frame, (thumb_w, thumb_h), interpolation=cv2.INTER_AREA),
+                                    cv2.COLOR_BGR2GRAY)
+                thumbs[n] = gray
+                n += 1
+                if n == BATCH:
+                    chunks.append(batch_activity(thumbs, previous, mask))
+                    levels.append(batch_brightness(thumbs, mask))
+                    previous = thumbs[-1].copy()
+                    n = 0
+            frame_idx += 1
+        if n:
+            chunks.append(batch_activity(thumbs[:n], previous, mask))
+            levels.append(batch_brightness(thumbs[:n], mask))
+    finally:
+        cap.release()
+    activity = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.float32)
+    brightness = np.concatenate(levels) if levels else np.zeros(0, dtype=np.float32)
+    return MotionIndex(step, activity, frame_idx, fps, brightness=brightness)
+
+
+def index_and_cache(video_path):
+    """
+    Worker: builds and caches the index of one video; returns its JSON form (picklable
+    and small) or None.
+    """
+    index = build_motion_index(video_path)
+    if index is None:
+        return None
+    save_motion_index(video_path, index)
+    return index.to_json()
+
+
+def load_cached_motion(video_path):
+    try:
+        data = load_json(video_path, CACHE_KIND)
+    except OSError:
+        return None
+    if not data:
+        return None
+    try:
+        return MotionIndex.from_json(data)
+    except (KeyError, ValueError, TypeError):
+        return None
+
+def save_motion_index(video_path, index):
+    return save_json(video_path, CACHE_KIND, index.to_json())
@@ -0,0 +1,336 @@
+# utils/ocr_backends.py
+
+"""
+Pluggable OCR backends for the timestamp overlay.
+
+Every backend reads a batch of preprocessed (grayscale, thresholded) ROI crops and returns
+one text string per crop; parsing into datetimes stays in utils.ocr_utils.
+
+- TesseractBackend: one tesseract subprocess per crop (the original behaviour).
+- BatchedTesseractBackend: stacks many crops into one image per tesseract call.
+- TemplateBackend: matches segmented glyphs against digit templates learned from a few
+  confirmed reads, with one vectorized NumPy correlation per batch. A character becomes a
+  template only once several reads of it agree.
+- HybridBackend: uses the template matcher once it is trained and confident, falls back to
+  batched tesseract otherwise, learns templates from the fallback's valid reads and keeps
+  re-checking a sample of template reads against the fallback.
+"""
+
+import time
+import cv2
+import numpy as np
+import pytesseract
+
+# Size every glyph is normalized to before correlation.
+GLYPH_H = 16
+GLYPH_W = 10
+# Minimum normalized correlation for a glyph to count as recognized.
+MIN_CORRELATION = 0.6
+# Characters the template matcher must know before it is used on its own.
+REQUIRED_GLYPHS = set("0123456789-:")
+# Glyphs of one character correlate above this (different characters stay well below).
+# HybridBackend learns a character from LEARN_AGREEMENT agreeing fallback reads, so one
+# misread cannot teach a wrong glyph.
+AGREE_CORRELATION = 0.8
+LEARN_AGREEMENT = 3
+# Unconfirmed glyphs kept per character while waiting for agreement.
+MAX_PENDING = 8
+# HybridBackend re-reads one template read in VERIFY_EVERY with the fallback.
+VERIFY_EVERY = 50
+
+class OcrBackend:
+    name = "base"
+
+    def read_batch(self, crops):
+        raise NotImplementedError
+
+    def read(self, crop):
+        return self.read_batch([crop])[0]
+
+    def learn(self, crop, text):
+        """
+        Feedback hook: crop was confirmed to show text. Backends may ignore it.
+        """
+        return False
+
+
+class TesseractBackend(OcrBackend):
+    name = "tesseract"
+
+    def read_batch(self, crops):
+        return [pytesseract.image_to_string(c) for c in crops]
+
+
+class BatchedTesseractBackend(OcrBackend):
+    """
+    Stacks up to batch_size crops vertically (separated by background rows) and runs a
+    single tesseract call, then assigns recognized words back to crops by their position.
+    """
+    name = "tesseract-batched"
+
+    def __init__(self, batch_size=32, gap=12):
+        self.batch_size = batch_size
+        self.gap = gap
+
+    def read_batch(self, crops):
+        texts = []
+        for i in range(0, len(crops), self.batch_size):
+            texts.extend(self._read_stack(crops[i:i + self.batch_size]))
+        return texts
+
+    def _read_stack(self, crops):
+        if not crops:
+            return []
+        w = max(c.shape[1] for c in crops)
+        h = max(c.shape[0] for c in crops)
+        stride = h + self.gap
+        background = int(np.median(crops[0][0]))
+        stack = np.full((stride * len(crops) + self.gap, w), background, dtype=np.uint8)
+        for i, c in enumerate(crops):
+            y = self.gap + i * stride
+            stack[y:y + c.shape[0], :c.shape[1]] = c
+        data = pytesseract.image_to_data(stack, config="--psm 6",
+                                         output_type=pytesseract.Output.DICT)
+        words = [[] for _ in crops]
+        for text, left, top, height in zip(data["text"], data["left"], data["top"], data["height"]):
+            if not text.strip():
+                continue
+            row = int((top + height / 2 - self.gap / 2) // stride)
+            if 0 <= row < len(crops):
+                words[row].append((left, text))
+        return [" ".join(t for _, t in sorted(ws)) for ws in words]
+
+
+def segment_glyphs(crop):
+    """
+    Splits a thresholded text crop into glyphs by column projection.
+    Returns (glyph vectors of shape (n, GLYPH_H * GLYPH_W), list of gaps before each glyph).
+    Glyphs keep the vertical extent of the whole text line, so '-' and '1' stay distinct.
+    """
+    fg = crop > 127
+    if fg.mean() > 0.5:
+        fg = ~fg
+    rows = np.flatnonzero(fg.any(axis=1))
+    if rows.size == 0:
+        return np.zeros((0, GLYPH_H * GLYPH_W), np.float32), []
+    line = fg[rows[0]:rows[-1] + 1]
+    cols = line.any(axis=0).astype(np.int8)
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], cols, [0]))))
+    starts, ends = edges[0::2], edges[1::2]
+    widths = ends - starts
+    if widths.size:
+        # Touching glyphs form one wide run; cut it at its weakest columns.
+        pitch = max(1.0, float(np.median(widths)))
+        profile = line.sum(axis=0)
+        runs = []
+        for x0, x1 in zip(starts, ends):
+            runs.extend(_split_run(profile, int(x0), int(x1), pitch))
+        starts, ends = [r[0] for r in runs], [r[1] for r in runs]
+    glyphs, gaps = [], []
+    prev_end = None
+    for x0, x1 in zip(starts, ends):
+        g = line[:, x0:x1]
+        if g.sum() < 3:
+            continue  # speckle
+        glyphs.append(cv2.resize(g.astype(np.float32), (GLYPH_W, GLYPH_H),
+                                 interpolation=cv2.INTER_AREA).ravel())
+        gaps.append(0 if prev_end is None else x0 - prev_end)
+        prev_end = x1
+    if not glyphs:
+        return np.zeros((0, GLYPH_H * GLYPH_W), np.float32), []
+    return np.vstack(glyphs), gaps
+
+
+def _split_run(profile, x0, x1, pitch):
+    if x1 - x0 <= 1.3 * pitch or x1 - x0 < 6:
+        return [(x0, x1)]
+    inner = profile[x0 + 2:x1 - 2]
+    cut = x0 + 2 + int(np.argmin(inner))
+    return _split_run(profile, x0, cut, pitch) + _split_run(profile, cut + 1, x1, pitch)
+
+
+def _normalize_rows(m):
+    m = m - m.mean(axis=1, keepdims=True)
+    norm = np.linalg.norm(m, axis=1, keepdims=True)
+    norm[norm == 0] = 1
+    return m / norm
+
+
+class TemplateBackend(OcrBackend):
+    """
+    Fixed-font glyph matcher. Templates are the mean of glyphs from confirmed reads
+    (see learn); recognition is a single matrix product of all glyphs in a batch against
+    all templates (normalized cross-correlation). With agreement > 1, a character becomes
+    a template only once that many of its glyphs agree, for feedback that may be wrong.
+    """
+    name = "template"
+
+    def __init__(self, agreement=1):
+        self.agreement = agreement
+        self.sums = {}
+        self.counts = {}
+        self.pending = {}  # char -> glyphs waiting for `agreement` agreeing reads
+        self.chars = []
+        self.templates = None
+
+    def is_trained(self):
+        return REQUIRED_GLYPHS.issubset(self.counts)
+
+    def learn(self, crop, text):
+        """
+        Adds the glyphs of crop under the characters of text. A new character becomes a
+        template once `agreement` of its glyphs agree; a known one only absorbs glyphs that
+        look like its template.
+        """
+        chars = [c for c in text if not c.isspace()]
+        glyphs, _ = segment_glyphs(crop)
+        if not chars or len(chars) != len(glyphs):
+            return False
+        for c, g in zip(chars, glyphs):
+            if c in self.counts:
+                pair = _normalize_rows(np.vstack([self.sums[c] / self.counts[c], g]))
+                if float(pair[0] @ pair[1]) >= AGREE_CORRELATION:
+                    self.sums[c] = self.sums[c] + g
+                    self.counts[c] += 1
+                continue
+            pending = self.pending.setdefault(c, [])
+            pending.append(g)
+            del pending[:-MAX_PENDING]
+            m = _normalize_rows(np.vstack(pending))
+            agree = (m @ m.T) >= AGREE_CORRELATION
+            best = agree[agree.sum(axis=1).argmax()]
+            if best.sum() >= self.agreement:
+                self.sums[c] = np.sum([p for p, ok in zip(pending, best) if ok], axis=0)
+                self.counts[c] = int(best.sum())
+                del self.pending[c]
+        self._rebuild()
+        return True
+
+    def forget(self, chars):
+        """
+        Drops the templates (and pending glyphs) of chars; they are learned again.
+        """
+        for c in chars:
+            self.sums.pop(c, None)
+            self.counts.pop(c, None)
+            self.pending.pop(c, None)
+        self._rebuild()
+
+    def _rebuild(self):
+        self.chars = sorted(self.sums)
+        self.templates = _normalize_rows(
+            np.vstack([self.sums[c] / self.counts[c] for c in self.chars])) if self.chars else None
+
+    def read_batch(self, crops):
+        if self.templates is None:
+            return ["" for _ in crops]
+        segmented = [segment_glyphs(c) for c in crops]
+        counts = [len(g) for g, _ in segmented]
+        if sum(counts) == 0:
+            return ["" for _ in crops]
+        scores = _normalize_rows(np.vstack([g for g, _ in segmented if len(g)])) @ self.templates.T
+        best = scores.argmax(axis=1)
+        conf = scores.max(axis=1)
+        texts = []
+        pos = 0
+        for (glyphs, gaps), n in zip(segmented, counts):
+            idx, c = best[pos:pos + n], conf[pos:pos + n]
+            pos += n
+            if n == 0 or c.min() < MIN_CORRELATION:
+                texts.append("")
+                continue
+            inner = [g for g in gaps[1:]]
+            space_gap = max(3, 2.5 * float(np.median(inner))) if inner else None
+            out = []
+            for k, (ci, gap) in enumerate(zip(idx, gaps)):
+                if k and space_gap is not None and gap > space_gap:
+                    out.append(" ")
+                out.append(self.chars[ci])
+            texts.append("".join(out))
+        return texts
+
+
+class HybridBackend(OcrBackend):
+    """
+    Template matching with a tesseract fallback. Crops the template matcher cannot read
+    (untrained or low confidence) go to the fallback in one batch; fallback reads that
+    parse as valid timestamps are fed back into the templates. One template read in
+    verify_every also goes to the fallback: where a valid fallback read disagrees, the
+    fallback's text is used and the characters involved are forgotten and learned again.
+    """
+    name = "auto"
+
+    def __init__(self, fallback=None, validate=None, verify_every=VERIFY_EVERY):
+        self.template = TemplateBackend(agreement=LEARN_AGREEMENT)
+        self.fallback = fallback if fallback else BatchedTesseractBackend()
+        self.validate = validate  # text -> normalized text or None
+        self.verify_every = verify_every
+        self.unverified = 0  # template reads since the last check
+        self.mismatches = 0
+
+    def read_batch(self, crops):
+        texts = self.template.read_batch(crops) if self.template.is_trained() else ["" for _ in crops]
+        if self.validate:
+            texts = [t if t and self.validate(t) else "" for t in texts]
+        missing = [i for i, t in enumerate(texts) if not t]
+        checks = []
+        for i, t in enumerate(texts):
+            if t:
+                self.unverified += 1
+                if self.unverified >= self.verify_every:
+                    checks.append(i)
+                    self.unverified = 0
+        ask = missing + checks
+        if ask:
+            for i, t in zip(ask, self.fallback.read_batch([crops[i] for i in ask])):
+                confirmed = self.validate(t) if self.validate else None
+                if texts[i]:
+                    self._verify(texts[i], t, confirmed)
+                    if confirmed:
+                        texts[i] = t
+                    continue
+                texts[i] = t
+                if confirmed:
+                    self.template.learn(crops[i], confirmed)
+        return texts
+
+    def _verify(self, text, fallback_text, confirmed):
+        mine = self.validate(text) if self.validate else text
+        theirs = confirmed if self.validate else fallback_text
+        if not theirs or mine == theirs:
+            return
+        self.mismatches += 1
+        if len(mine) == len(theirs):
+            wrong = {c for a, b in zip(mine, theirs) if a != b for c in (a, b)}
+        else:
+            wrong = set(mine) | set(theirs)
+        self.template.forget(wrong - {" "})
+
+    def learn(self, crop, text):
+        return self.template.learn(crop, text)
+
+
+BACKENDS = {
+    TesseractBackend.name: TesseractBackend,
+    BatchedTesseractBackend.name: BatchedTesseractBackend,
+    TemplateBackend.name: TemplateBackend,
+    HybridBackend.name: HybridBackend,
+}
+
+def make_backend(name, **kwargs):
+    try:
+        cls = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown OCR backend: {name} (choose from {', '.join(BACKENDS)})") from None
+    # Outside the try: a KeyError raised by the constructor is not an unknown name.
+    return cls(**kwargs)
+
+def measure_throughput(backend, crops, repeat=1):
+    """
+    Returns crops/second for backend.read_batch over crops.
+    """
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        backend.read_batch(crops)
+    elapsed = time.perf_counter() - t0
+    return len(crops) * repeat / elapsed if elapsed > 0 else float("inf")
@@ -0,0 +1,213 @@
+# utils/ocr_index.py
+
+"""
+Frame -> timestamp index built by OCR'ing sampled frames across a whole video.
+
+The index replaces the "first frame + fixed duration" assumption. Time jumps go through a
+robust piecewise-linear clock model (utils.timing_model) fitted to the sampled (frame, time)
+table; it rejects OCR misreads, follows clock drift and detects recording gaps. After the
+regular sampling pass, the builder OCRs extra frames only where the model is uncertain
+(gap boundaries, holes left by rejected samples, the whole-second changes that remove the
+overlay's rounding error). The OCR runs in the shared index pool (utils.index_pool), so
+indexing many videos at once never starts more workers than there are cores, and indexes
+are cached on disk (see utils.video_cache), so reopening a video syncs without running OCR
+again.
+"""
+
+import os
+from datetime import datetime, timedelta
+import cv2
+from utils.index_pool import index_pool
+from utils.keyframe_index import load_cached_keyframes
+from utils.ocr_utils import DEFAULT_OCR_BACKEND, create_ocr_backend, extract_times_from_rois
+from utils.time_sync import TIME_FORMAT
+from utils.timing_model import TimingModel
+from utils.video_cache import load_json, save_json
+from utils.video_reader import SequentialReader
+
+OCR_ROI = (0, 0, 250, 40)
+SAMPLE_INTERVAL_SECS = 10
+# Rounds of adaptive OCR after the regular pass (gap bisection needs ~log2 of the interval).
+REFINE_ROUNDS = 10
+# Frames OCR'd per backend call in a worker.
+OCR_BATCH = 32
+CACHE_KIND = "ocr"
+
+class TimestampIndex:
+    """
+    OCR'd (frame, time) samples of one video and the TimingModel fitted to them.
+    """
+    def __init__(self, frames, times, total_frames, fps):
+        self.frames = list(frames)
+        self.times = list(times)
+        self.total_frames = total_frames
+        self.fps = fps if fps > 0 else 25
+        self.refined = 0  # Frames OCR'd by adaptive refinement (see build_index).
+        self.origin = self.times[0] if self.times else None
+        secs = [(t - self.origin).total_seconds() for t in self.times]
+        self.model = TimingModel.fit(self.frames, secs, total_frames, self.fps)
+
+    @classmethod
+    def from_samples(cls, samples, total_frames, fps):
+        """
+        Builds an index from (frame, datetime or None) samples. Failed reads are dropped;
+        misreads are kept and rejected by the model, so a refit can reconsider them.
+        """
+        samples = sorted((s for s in samples if s[1] is not None), key=lambda s: s[0])
+        return cls([f for f, _ in samples], [t for _, t in samples], total_frames, fps)
+
+    def __len__(self):
+        return len(self.frames) if self.model else 0
+
+    @property
+    def start_time(self):
+        return self.frame_to_time(0) if self.model else None
+
+    @property
+    def end_time(self):
+        return self.frame_to_time(self.total_frames) if self.model else None
+
+    def time_to_frame(self, target_dt):
+        return self.locate(target_dt)[0]
+
+    def locate(self, target_dt):
+        """
+        (frame, expected error in seconds, gap) for target_dt; gap is a (start, end)
+        datetime pair when target_dt falls into a recording gap, else None.
+        """
+        if not self.model:
+            return None, None, None
+        fidx, err, gap = self.model.locate((target_dt - self.origin).total_seconds())
+        if gap is not None:
+            gap = (self.origin + timedelta(seconds=gap.secs_before),
+                   self.origin + timedelta(seconds=gap.secs_after))
+        return fidx, err, gap
+
+    def frame_to_time(self, frame_idx):
+        if not self.model:
+            return None
+        return self.origin + timedelta(seconds=self.model.frame_to_secs(frame_idx))
+
+    def frame_error(self, frame_idx):
+        return self.model.frame_error(frame_idx)
+
+    def describe(self):
+        return self.model.describe()
+
+    def to_json(self):
+        return {
+            "total_frames": self.total_frames,
+            "fps": self.fps,
+            "samples": [[f, t.strftime(TIME_FORMAT)] for f, t in zip(self.frames, self.times)],
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        frames = [s[0] for s in data["samples"]]
+        times = [datetime.strptime(s[1], TIME_FORMAT) for s in data["samples"]]
+        return cls(frames, times, data["total_frames"], data["fps"])
+
+
+def sample_step(fps, interval_secs=SAMPLE_INTERVAL_SECS):
+    return max(1, int(round((fps if fps > 0 else 25) * interval_secs)))
+
+def sample_frames(total_frames, fps, interval_secs=SAMPLE_INTERVAL_SECS):
+    step = sample_step(fps, interval_secs)
+    frames = list(range(0, total_frames, step))
+    if total_frames > 0 and frames[-1] != total_frames - 1:
+        frames.append(total_frames - 1)
+    return frames
+
+def ocr_frames(video_path, frame_indices, roi=OCR_ROI, backend_name=DEFAULT_OCR_BACKEND):
+    """
+    Worker: OCRs the given (sorted) frames of one video in batches of OCR_BATCH.
+    Returns [(frame, datetime or None)].
+    """
+    cap = cv2.VideoCapture(video_path)
+    results = []
+    pending = []
+    try:
+        backend = create_ocr_backend(backend_name)
+        reader = SequentialReader(cap, keyframes=load_cached_keyframes(video_path))
+        for fidx in frame_indices:
+            frame = reader.read(fidx) if cap.isOpened() else None
+            if frame is None:
+                results.append((fidx, None))
+                continue
+            pending.append((fidx, frame))
+            if len(pending) >= OCR_BATCH:
+                results.extend(_ocr_pending(pending, roi, backend))
+                pending = []
+        results.extend(_ocr_pending(pending, roi, backend))
+    except Exception as e:
+        # Some backend errors (pytesseract's) cannot be unpickled in the parent, which
+        # would break the shared pool for every other video.
+        raise RuntimeError(f"{type(e).__name__}: {e}") from None
+    finally:
+        cap.release()
+    return results
+
+def _ocr_pending(pending, roi, backend):
+    if not pending:
+        return []
+    times = extract_times_from_rois([f for _, f in pending], roi=roi, backend=backend)
+    return [(fidx, t) for (fidx, _), t in zip(pending, times)]
+
+def ocr_in_pool(pool, workers, video_path, frames, roi, backend_name):
+    """
+    OCRs frames (sorted) in the pool; returns [(frame, datetime or None)].
+    """
+    # Contiguous chunks keep each worker's reads moving forward through the file.
+    chunk = (len(frames) + workers - 1) // workers
+    chunks = [frames[i:i + chunk] for i in range(0, len(frames), chunk)]
+    futures = [pool.submit(ocr_frames, video_path, c, roi, backend_name) for c in chunks]
+    samples = []
+    for fut in futures:
+        samples.extend(fut.result())
+    return samples
+
+def build_index(video_path, roi=OCR_ROI, workers=None, interval_secs=SAMPLE_INTERVAL_SECS,
+                backend_name=DEFAULT_OCR_BACKEND):
+    """
+    OCRs frames sampled every interval_secs across the video, split into `workers` chunks
+    (default: one per core) on the shared index pool, then up to REFINE_ROUNDS rounds of
+    extra frames where the timing model is uncertain (TimingModel.refinement_frames).
+    Returns a TimestampIndex (possibly empty if no frame could be read).
+    """
+    cap = cv2.VideoCapture(video_path)
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    cap.release()
+    keyframes = load_cached_keyframes(video_path)
+    if keyframes and len(keyframes):
+        # The container's frame count is often an estimate; the scan has the real one.
+        total_frames = len(keyframes)
+    frames = sample_frames(total_frames, fps, interval_secs)
+    if not frames:
+        return TimestampIndex([], [], total_frames, fps)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(frames)))
+    tried = set(frames)
+    pool = index_pool()
+    samples = ocr_in_pool(pool, workers, video_path, frames, roi, backend_name)
+    for _ in range(REFINE_ROUNDS):
+        index = TimestampIndex.from_samples(samples, total_frames, fps)
+        extra = index.model.refinement_frames(tried, sample_step(fps, interval_secs))
+        if not extra or not len(index):
+            break
+        tried.update(extra)
+        samples.extend(ocr_in_pool(pool, min(workers, len(extra)), video_path, extra, roi, backend_name))
+    index = TimestampIndex.from_samples(samples, total_frames, fps)
+    index.refined = len(tried) - len(frames)
+    return index
+
+def load_cached_index(video_path):
+    data = load_json(video_path, CACHE_KIND)
+    if not data:
+        return None
+    try:
+        return TimestampIndex.from_json(data)
+    except (KeyError, ValueError, TypeError):
+        return None
+
+def save_index(video_path, index):
+    return save_json(video_path, CACHE_KIND, index.to_json())
@@ -2,29 +2,96 @@
 # -*- coding: utf-8 -*-
 
 import cv2
-import pytesseract
 import re
 from datetime import datetime
+from utils.ocr_backends import HybridBackend, make_backend
+from utils.time_sync import TIME_FORMAT
+
+TIME_PATTERN = r"(\d{4}-\d{2}-\d{2}\s\d{2}:\d{2}:\d{2})"
+# "auto": template matching, falling back to batched tesseract until trained.
+DEFAULT_OCR_BACKEND = HybridBackend.name
 
 def extract_time_from_frame(frame, roi=(0,0,250,40)):
     """
     OCR识别 "YYYY-MM-DD HH:MM:SS"
     """
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-    x,y,w,h = roi
-    roi_frame = gray[y:y+h, x:x+w]
+    return extract_time_from_roi(frame, roi=roi)
 
-    _, thresh = cv2.threshold(roi_frame, 128,255, cv2.THRESH_BINARY)
-    text = pytesseract.image_to_string(thresh)
-    # debug
-    #print("[DEBUG] OCR raw:", repr(text))
+def normalize_ocr_text(text):
+    # Replace various dash characters with ASCII '-' and normalize whitespace.
+    text = text.replace('—','-').replace('–','-').replace('－','-')
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip()
 
-    pattern = r"(\d{4}-\d{2}-\d{2}\s\d{2}:\d{2}:\d{2})"
-    m = re.search(pattern, text)
-    if m:
+def prepare_roi(frame, roi=(0, 0, 250, 40)):
+    """
+    Crops the ROI and binarizes it; this is the input every OCR backend expects.
+    """
+    x, y, w, h = roi
+    roi_frame = frame[y:y+h, x:x+w]
+    gray = cv2.cvtColor(roi_frame, cv2.COLOR_BGR2GRAY)
+    _, thresh = cv2.threshold(gray, 128, 255, cv2.THRESH_BINARY)
+    return thresh
+
+def confirmed_time_text(text):
+    """
+    Returns the canonical "YYYY-MM-DD HH:MM:SS" string found in text, or None.
+    """
+    match = re.search(TIME_PATTERN, normalize_ocr_text(text))
+    if match:
         try:
-            dt= datetime.strptime(m.group(1), "%Y-%m-%d %H:%M:%S")
-            return dt
-        except:
-            return None
+            return datetime.strptime(match.group(1), TIME_FORMAT).strftime(TIME_FORMAT)
+        except ValueError:
+            pass
     return None
+
+def parse_time_text(text):
+    confirmed = confirmed_time_text(text)
+    return datetime.strptime(confirmed, TIME_FORMAT) if confirmed else None
+
+def create_ocr_backend(name=DEFAULT_OCR_BACKEND):
+    """
+    Creates a backend by name; the hybrid backend validates its reads with
+    confirmed_time_text so it only learns glyphs from real timestamps.
+    """
+    if name == HybridBackend.name:
+        return HybridBackend(validate=confirmed_time_text)
+    return make_backend(name)
+
+_backend = None
+
+def get_ocr_backend():
+    global _backend
+    if _backend is None:
+        _backend = create_ocr_backend()
+    return _backend
+
+def set_ocr_backend(backend):
+    global _backend
+    _backend = backend
+
+def extract_time_from_roi(frame, roi=(0, 0, 250, 40), log_func=None, backend=None):
+    """
+    Attempts to extract a time string "YYYY-MM-DD HH:MM:SS" from the given ROI.
+    Logs the raw and normalized OCR text if log_func is provided.
+    Uses the process-wide OCR backend unless one is given.
+    """
+    backend = backend if backend else get_ocr_backend()
+    text = backend.read(prepare_roi(frame, roi))
+    if log_func:
+        log_func(f"<font color='black'>[OCR Raw]: {repr(text)}</font>")
+    
+    text = normalize_ocr_text(text)
+    if log_func:
+        log_func(f"<font color='black'>[OCR Normalized]: {repr(text)}</font>")
+    
+    return parse_time_text(text)
+
+def extract_times_from_rois(frames, roi=(0, 0, 250, 40), backend=None):
+    """
+    Batched variant of extract_time_from_roi: one backend call for all frames.
+    Returns a list of datetime or None, one per frame.
+    """
+    backend = backend if backend else get_ocr_backend()
+    texts = backend.read_batch([prepare_roi(f, roi) for f in frames])
+    return [parse_time_text(t) for t in texts]
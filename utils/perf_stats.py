@@ -0,0 +1,216 @@
+# utils/perf_stats.py
+
+"""
+Per-camera timing of the hot stages of the player (seek, read, convert, paint, OCR,
+imwrite), for the performance panel (player.perf_panel) and offline analysis.
+
+Recording is off by default. While off, clock() returns None, lap() and record() return
+after one attribute check and timer() hands out a shared no-op context manager, so the
+hooks in the decode and display paths cost next to nothing. While on, every (source,
+stage) keeps its last WINDOW durations with their time stamps in a ring (rolling
+percentiles, a log-scale histogram and the rate over the last RATE_WINDOW_SECS) plus a
+lifetime count and total. Sources are video paths; counters (e.g. dropped frames) and
+gauges (e.g. queue depths) are kept per source as well, whether recording is on or not:
+they are updated on rare events only, and the panel shows them at all times. Snapshots
+export as CSV or JSON.
+"""
+
+import csv
+import json
+import threading
+import time
+import numpy as np
+
+STAGES = ("seek", "read", "convert", "paint", "ocr", "ocr_index", "imwrite")
+# Durations kept per (source, stage) for percentiles and histograms.
+WINDOW = 512
+# Span of the effective-rate estimate (e.g. displayed frames per second from "paint").
+RATE_WINDOW_SECS = 2.0
+# Upper bucket edges of the histograms; the last bucket counts everything slower.
+HISTOGRAM_EDGES_MS = (0.25, 0.5, 1, 2, 4, 8, 16, 33, 66, 133, 266, 533, 1066)
+CSV_FIELDS = ["source", "kind", "name", "count", "total_s", "mean_ms", "p50_ms", "p95_ms",
+              "p99_ms", "max_ms", "rate_per_s", "value"]
+
+
+class StageStats:
+    """
+    Rolling window of one stage's durations (seconds) and when they were recorded.
+    """
+    def __init__(self, window=WINDOW):
+        self.durations = np.zeros(window)
+        self.stamps = np.zeros(window)
+        self.pos = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, secs, now):
+        i = self.pos % len(self.durations)
+        self.durations[i] = secs
+        self.stamps[i] = now
+        self.pos += 1
+        self.total += secs
+        if secs > self.max:
+            self.max = secs
+
+    def summary(self, now):
+        n = min(self.pos, len(self.durations))
+        window = self.durations[:n] * 1000
+        recent = int(np.count_nonzero(self.stamps[:n] >= now - RATE_WINDOW_SECS))
+        result = {"count": self.pos, "total_s": round(self.total, 4),
+                  "rate_per_s": round(recent / RATE_WINDOW_SECS, 2),
+                  "max_ms": round(self.max * 1000, 3)}
+        if n:
+            p50, p95, p99 = np.percentile(window, (50, 95, 99))
+            result.update({"mean_ms": round(float(window.mean()), 3), "p50_ms": round(float(p50), 3),
+                           "p95_ms": round(float(p95), 3), "p99_ms": round(float(p99), 3)})
+            counts = np.bincount(np.searchsorted(HISTOGRAM_EDGES_MS, window),
+                                 minlength=len(HISTOGRAM_EDGES_MS) + 1)
+            result["histogram"] = [int(c) for c in counts]
+        return result
+
+
+class StageTimer:
+    __slots__ = ("stats", "source", "stage", "t0")
+
+    def __init__(self, stats, source, stage):
+        self.stats, self.source, self.stage = stats, source, stage
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.stats.record(self.source, self.stage, time.perf_counter() - self.t0)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+NULL_TIMER = _NullTimer()
+
+
+class PerfStats:
+    """
+    Process-wide store of stage timings, counters and gauges. Thread-safe: decode threads,
+    the screenshot pool and the GUI thread record concurrently.
+    """
+    def __init__(self):
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.stages = {}  # (source, stage) -> StageStats
+        self.counters = {}  # (source, name) -> int
+        self.gauges = {}  # source -> {name: value}
+        self.since = time.time()
+
+    def set_enabled(self, enabled):
+        self.enabled = bool(enabled)
+
+    def reset(self):
+        with self.lock:
+            self.stages = {}
+            self.counters = {}
+            self.gauges = {}
+            self.since = time.time()
+
+    # ---------- Hooks ----------
+    def clock(self):
+        """
+        Start time for lap(), or None while disabled.
+        """
+        return time.perf_counter() if self.enabled else None
+
+    def lap(self, source, stage, t0):
+        """
+        Records the time since t0 (from clock() or a previous lap) and returns now, so
+        consecutive stages can be timed with one clock read each.
+        """
+        if t0 is None:
+            return None
+        now = time.perf_counter()
+        self.record(source, stage, now - t0, now)
+        return now
+
+    def timer(self, source, stage):
+        """
+        Context manager timing its block (a no-op while disabled).
+        """
+        return StageTimer(self, source, stage) if self.enabled else NULL_TIMER
+
+    def record(self, source, stage, secs, now=None):
+        if not self.enabled:
+            return
+        now = time.perf_counter() if now is None else now
+        with self.lock:
+            stats = self.stages.get((source, stage))
+            if stats is None:
+                stats = self.stages[(source, stage)] = StageStats()
+            stats.add(secs, now)
+
+    def count(self, source, name, n=1):
+        """
+        Adds n to a counter; unlike timings, counters are kept while recording is off.
+        """
+        with self.lock:
+            self.counters[(source, name)] = self.counters.get((source, name), 0) + n
+
+    def set_gauges(self, source, values):
+        with self.lock:
+            self.gauges[source] = dict(values)
+
+    # ---------- Reading ----------
+    def snapshot(self):
+        """
+        {"since", "time", "enabled", "histogram_edges_ms", "sources": {source: {"stages":
+        {stage: summary}, "counters": {...}, "gauges": {...}}}}
+        """
+        now = time.perf_counter()
+        sources = {}
+
+        def node(source):
+            return sources.setdefault(source, {"stages": {}, "counters": {}, "gauges": {}})
+
+        with self.lock:
+            for (source, stage), stats in self.stages.items():
+                node(source)["stages"][stage] = stats.summary(now)
+            for (source, name), n in self.counters.items():
+                node(source)["counters"][name] = n
+            for source, values in self.gauges.items():
+                node(source)["gauges"] = dict(values)
+        return {"since": self.since, "time": time.time(), "enabled": self.enabled,
+                "histogram_edges_ms": list(HISTOGRAM_EDGES_MS), "sources": sources}
+
+
+def write_json(path, snapshot):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, indent=2)
+
+
+def write_csv(path, snapshot):
+    """
+    One row per stage (timings), counter and gauge of every source.
+    """
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        for source, data in sorted(snapshot["sources"].items(), key=lambda kv: str(kv[0])):
+            for stage, summary in data["stages"].items():
+                writer.writerow(dict(summary, source=source, kind="stage", name=stage))
+            for name, n in data["counters"].items():
+                writer.writerow({"source": source, "kind": "counter", "name": name, "value": n})
+            for name, value in data["gauges"].items():
+                writer.writerow({"source": source, "kind": "gauge", "name": name, "value": value})
+
+
+_stats = None
+
+def perf_stats():
+    global _stats
+    if _stats is None:
+        _stats = PerfStats()
+    return _stats
@@ -0,0 +1,116 @@
+# utils/session.py
+
+"""
+Session files: the list of videos of a multi-camera review with what is known about each
+(remark, start/end time, OCR index, playhead, stream properties), plus a few player
+settings. A session opens lazily: the player creates its items from these entries
+without touching the video files and opens captures only as items are needed, so opening
+a session costs the same however many videos it lists.
+
+Video paths are stored absolute and relative to the session file; a session moved
+together with its videos still resolves.
+"""
+
+import json
+import os
+from collections import namedtuple
+from datetime import datetime
+from utils.ocr_index import TimestampIndex
+from utils.time_sync import TIME_FORMAT
+
+SESSION_VERSION = 1
+SESSION_EXT = ".mcsession"
+
+# start_time/end_time are datetimes (or None); ts_index a TimestampIndex (or None); fps,
+# total_frames, width and height are 0 when the video was never opened.
+SessionEntry = namedtuple("SessionEntry", [
+    "path", "remark", "start_time", "end_time", "ts_index", "frame",
+    "fps", "total_frames", "width", "height",
+])
+
+
+class SessionError(Exception):
+    pass
+
+
+def _format_time(dt):
+    return dt.strftime(TIME_FORMAT) if dt else None
+
+def _parse_time(text):
+    return datetime.strptime(text, TIME_FORMAT) if text else None
+
+def entry_to_json(entry, base_dir):
+    path = os.path.abspath(entry.path)
+    try:
+        relative = os.path.relpath(path, base_dir)
+    except ValueError:
+        # Different drive (Windows).
+        relative = None
+    return {
+        "path": path,
+        "relative_path": relative,
+        "remark": entry.remark,
+        "start_time": _format_time(entry.start_time),
+        "end_time": _format_time(entry.end_time),
+        "ocr_index": entry.ts_index.to_json() if entry.ts_index is not None else None,
+        "frame": entry.frame,
+        "fps": entry.fps,
+        "total_frames": entry.total_frames,
+        "width": entry.width,
+        "height": entry.height,
+    }
+
+def entry_from_json(data, base_dir):
+    path = data["path"]
+    relative = data.get("relative_path")
+    if not os.path.exists(path) and relative:
+        moved = os.path.normpath(os.path.join(base_dir, relative))
+        if os.path.exists(moved):
+            path = moved
+    index = data.get("ocr_index")
+    return SessionEntry(
+        path=path,
+        remark=data.get("remark") or "",
+        start_time=_parse_time(data.get("start_time")),
+        end_time=_parse_time(data.get("end_time")),
+        ts_index=TimestampIndex.from_json(index) if index else None,
+        frame=int(data.get("frame") or 0),
+        fps=float(data.get("fps") or 0),
+        total_frames=int(data.get("total_frames") or 0),
+        width=int(data.get("width") or 0),
+        height=int(data.get("height") or 0),
+    )
+
+def save_session(path, entries, settings=None):
+    """
+    Writes entries (SessionEntry) and settings (JSON-serializable dict) to path, atomically.
+    """
+    base_dir = os.path.dirname(os.path.abspath(path))
+    data = {
+        "version": SESSION_VERSION,
+        "saved": datetime.now().strftime(TIME_FORMAT),
+        "settings": settings or {},
+        "videos": [entry_to_json(e, base_dir) for e in entries],
+    }
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=1)
+    os.replace(tmp, path)
+
+def load_session(path):
+    """
+    Returns (entries, settings). Raises SessionError if the file cannot be read or parsed.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        raise SessionError(f"Cannot read session {path}: {e}")
+    if not isinstance(data, dict) or data.get("version") != SESSION_VERSION:
+        raise SessionError(f"Unsupported session file: {path}")
+    base_dir = os.path.dirname(os.path.abspath(path))
+    try:
+        entries = [entry_from_json(v, base_dir) for v in data.get("videos", [])]
+    except (KeyError, ValueError, TypeError) as e:
+        raise SessionError(f"Invalid video entry in {path}: {e}")
+    return entries, data.get("settings") or {}
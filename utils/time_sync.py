@@ -0,0 +1,108 @@
+# utils/time_sync.py
+
+"""
+Mapping between OCR/wall-clock time and frame indices.
+"""
+
+from datetime import timedelta
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+def linear_time_to_frame(start_time, end_time, total_frames, target_dt):
+    """
+    Maps target_dt to a frame index assuming frames are spread evenly between
+    start_time and end_time. Returns None if the time range is invalid.
+    """
+    total_secs = (end_time - start_time).total_seconds()
+    if total_secs <= 0:
+        return None
+    delta_secs = (target_dt - start_time).total_seconds()
+    ratio = delta_secs / total_secs
+    ratio = max(0, min(1, ratio))
+    return int(ratio * total_frames)
+
+def linear_frame_to_time(start_time, end_time, total_frames, frame_idx):
+    """
+    Inverse of linear_time_to_frame.
+    """
+    if total_frames <= 0:
+        return start_time
+    return start_time + (end_time - start_time) * (frame_idx / total_frames)
+
+def first_frame_time_range(first_dt, total_frames, fps):
+    """
+    (start, end) estimated from the OCR'd first frame: the video is assumed to run for
+    total_frames / fps seconds (5 minutes if fps is unknown).
+    """
+    if fps > 0:
+        duration = timedelta(seconds=total_frames / fps)
+    else:
+        duration = timedelta(minutes=5)
+    return first_dt, first_dt + duration
+
+def map_time_to_frame(target_dt, start_time, end_time, total_frames, ts_index=None):
+    """
+    Frame index showing target_dt: from the OCR index when available, otherwise linear
+    between start_time and end_time. None if there is no usable mapping.
+    """
+    if ts_index:
+        return ts_index.time_to_frame(target_dt)
+    if not (start_time and end_time):
+        return None
+    return linear_time_to_frame(start_time, end_time, total_frames, target_dt)
+
+def map_frame_to_time(frame_idx, start_time, end_time, total_frames, ts_index=None):
+    if ts_index:
+        return ts_index.frame_to_time(frame_idx)
+    if not (start_time and end_time) or end_time <= start_time:
+        return None
+    return linear_frame_to_time(start_time, end_time, total_frames, frame_idx)
+
+def locate_time(target_dt, start_time, end_time, total_frames, ts_index=None):
+    """
+    (frame, expected error in seconds, recording gap) for target_dt. Only an OCR index
+    knows its error and gaps; with the linear start/end mapping both are None.
+    """
+    if ts_index:
+        return ts_index.locate(target_dt)
+    return map_time_to_frame(target_dt, start_time, end_time, total_frames), None, None
+
+def describe_location(error, gap):
+    """
+    Log text for the error and gap returned by locate_time.
+    """
+    if gap is not None:
+        return (f"in a recording gap {gap[0].strftime(TIME_FORMAT)} ~ {gap[1].strftime(TIME_FORMAT)}, "
+                f"showing the first frame after it")
+    if error is None:
+        return "error unknown (linear start/end mapping)"
+    return f"expected error ±{error:.2f}s"
+
+class VideoTiming:
+    """
+    Time mapping of one video, resolved without any GUI (mirrors the VideoItem fields).
+    """
+    def __init__(self, video_path, total_frames, fps, start_time=None, end_time=None, ts_index=None):
+        self.video_path = video_path
+        self.total_frames = total_frames
+        self.fps = fps
+        self.start_time = start_time
+        self.end_time = end_time
+        self.ts_index = ts_index
+
+    def is_valid(self):
+        return bool(self.ts_index) or bool(self.start_time and self.end_time)
+
+    def time_to_frame(self, target_dt):
+        return map_time_to_frame(target_dt, self.start_time, self.end_time, self.total_frames, self.ts_index)
+
+    def locate(self, target_dt):
+        return locate_time(target_dt, self.start_time, self.end_time, self.total_frames, self.ts_index)
+
+    def frame_to_time(self, frame_idx):
+        return map_frame_to_time(frame_idx, self.start_time, self.end_time, self.total_frames, self.ts_index)
+
+    def covers(self, target_dt):
+        start = self.frame_to_time(0)
+        end = self.frame_to_time(self.total_frames - 1)
+        return start is not None and start <= target_dt <= end
@@ -0,0 +1,424 @@
+# utils/timing_model.py
+
+"""
+Robust piecewise-linear model of a video's on-screen clock, fitted to sparse OCR samples.
+
+DVR exports rarely run at exactly their nominal frame rate (clock drift), and they drop
+segments or pause recording, so the overlay clock jumps. The model handles this as follows:
+- OCR misreads are rejected. A sample is dropped when its clock offset (OCR seconds minus
+  frame * rate) is more than OUTLIER_SECS from the median offset of its neighbours.
+- The remaining samples are split into runs at gaps. A gap is a place where the clock
+  moves GAP_SECS more (or less) than the frame count between two samples implies.
+- Each run is a continuous piecewise-linear least-squares fit. Knots (changes in drift)
+  are added while they explain clearly more than the whole-second resolution of the
+  overlay does.
+- The overlay truncates to whole seconds, so a single reading only says the clock lies
+  somewhere in that second. Where two adjacent frames read consecutive seconds, the
+  clock passed the second between them: such second changes are exact to one frame and
+  dominate the fit. refinement_frames bisects for one near each end of every run, which
+  pins both the offset and the drift; a run without them keeps a whole-second rounding
+  term in its expected error.
+- Every mapping comes with an expected error. refinement_frames lists the frames whose
+  OCR would reduce that error, so the index builder samples densely only there.
+
+All times are seconds relative to an arbitrary origin; utils.ocr_index.TimestampIndex
+converts to and from datetimes.
+"""
+
+import bisect
+import math
+import statistics
+import numpy as np
+
+# Offset from the neighbours' median beyond which an OCR sample is a misread.
+OUTLIER_SECS = 1.5
+OUTLIER_WINDOW = 5
+# Clock jump between consecutive samples (beyond the frame count) that marks a gap.
+GAP_SECS = 1.5
+# A knot is added to a run when it lowers the squared error by more than this many
+# quantization variances, with at least MIN_PIECE_SAMPLES samples between knots.
+KNOT_CHI2 = 25
+MIN_PIECE_SAMPLES = 3
+KNOT_CANDIDATES = 48
+# The overlay truncates to whole seconds: a sample reading s means the clock was in
+# [s, s + 1). Samples are fitted at s + 0.5 with this standard deviation. Samples taken at
+# the same point of every second share one rounding error of up to half a second, so a
+# run not pinned by second changes keeps this much error however many samples it has.
+QUANT_SECS = 1 / math.sqrt(12)
+# Located second changes a run needs before its rounding error counts as resolved.
+MIN_SECOND_CHANGES = 2
+# Relative rate uncertainty assumed for a run with too few samples to fit a slope.
+RATE_UNCERTAINTY = 0.01
+# Frames per unit of the design matrix (keeps the least-squares problem well conditioned).
+FRAME_SCALE = 1000.0
+
+
+class Run:
+    """
+    Continuous piecewise-linear fit of a gap-free stretch of samples, with knots at
+    sample frames. In the model a run extends to the first frame of the next run.
+    """
+    def __init__(self, frames, secs, rate, knots=(), weights=None, readings=None):
+        self.frames = list(frames)
+        self.first, self.last = self.frames[0], self.frames[-1]
+        self.n = len(self.frames)
+        self.rate = rate
+        self.knots = sorted(knots)
+        self.weights = list(weights) if weights is not None else [1.0] * self.n
+        # Whole seconds shown by the overlay at each sample frame.
+        self.readings = list(readings) if readings is not None else [math.floor(x) for x in secs]
+        self.changes = sum(1 for w in self.weights if w > 1) // 2  # Second changes located.
+        self.coef, self.sse, self.cov = fit_hinges(self.frames, secs, self.knots, self.weights)
+        if self.coef is None:
+            # One sample (or all on one frame): the clock offset is known, the slope assumed.
+            self.coef = np.array([secs[0], rate * FRAME_SCALE])
+        dof = self.n - len(self.coef)
+        rms = math.sqrt(self.sse / dof) if dof > 0 else 0.0
+        self.sigma = max(QUANT_SECS, rms)
+
+    def design(self, frame):
+        x = (frame - self.first) / FRAME_SCALE
+        return np.array([1.0, x] + [max(0.0, x - (k - self.first) / FRAME_SCALE) for k in self.knots])
+
+    def at(self, frame):
+        return float(self.design(frame) @ self.coef)
+
+    def error(self, frame):
+        """
+        Standard error (seconds) of at(frame), including the shared rounding error of the
+        samples unless second changes pin the run (MIN_SECOND_CHANGES).
+        """
+        if self.cov is None:
+            drift = RATE_UNCERTAINTY * self.rate * abs(frame - self.first)
+            return math.sqrt(QUANT_SECS ** 2 + drift ** 2)
+        x = self.design(frame)
+        err = self.sigma * math.sqrt(max(0.0, float(x @ self.cov @ x)))
+        if self.changes < MIN_SECOND_CHANGES:
+            err = math.sqrt(err ** 2 + QUANT_SECS ** 2)
+        return err
+
+    def frame_at(self, secs, lo, hi):
+        """
+        Frame in [lo, hi) where the clock reads secs, or None. Stretches whose slope is not
+        positive (a stalled clock) never match.
+        """
+        bounds = [lo] + [k for k in self.knots if lo < k < hi] + [hi]
+        for a, b in zip(bounds, bounds[1:]):
+            sa, sb = self.at(a), self.at(b)
+            if sb > sa and sa <= secs < sb:
+                return a + (secs - sa) / (sb - sa) * (b - a)
+        return None
+
+    def second_change_spans(self):
+        """
+        (lo, hi) frame brackets still to bisect for the second change after the first
+        reading and the one before the last reading of the run; empty once both are
+        found (adjacent frames) or the run shows a single second.
+        """
+        spans = []
+        first, last = self.readings[0], self.readings[-1]
+        if first == last:
+            return spans
+        i = next(i for i, r in enumerate(self.readings) if r != first)
+        spans.append((self.frames[i - 1], self.frames[i]))
+        j = next(j for j in range(self.n - 1, -1, -1) if self.readings[j] != last)
+        spans.append((self.frames[j], self.frames[j + 1]))
+        return [(lo, hi) for lo, hi in spans if hi - lo > 1]
+
+    def mean_slope(self):
+        if self.last > self.first:
+            return (self.at(self.last) - self.at(self.first)) / (self.last - self.first)
+        return self.rate
+
+
+class Gap:
+    """
+    A clock discontinuity between the samples at frame_before and frame_after. It is
+    localized to one frame once frame_after == frame_before + 1.
+    """
+    def __init__(self, frame_before, frame_after, secs_before, secs_after):
+        self.frame_before = frame_before
+        self.frame_after = frame_after
+        # Clock at frame_after as extrapolated from before the gap, and as fitted after it.
+        self.secs_before = secs_before
+        self.secs_after = secs_after
+
+    @property
+    def jump(self):
+        """
+        Seconds the clock skips at the gap (negative if it steps back).
+        """
+        return self.secs_after - self.secs_before
+
+    def localized(self):
+        return self.frame_after - self.frame_before <= 1
+
+
+class TimingModel:
+    """
+    Piecewise-linear frame <-> clock mapping with per-mapping error estimates.
+    Built with TimingModel.fit; an empty model (no samples) maps nothing.
+    """
+    def __init__(self, runs, gaps, outliers, rate, nominal, total_frames):
+        self.runs = runs
+        self.gaps = gaps
+        self.outliers = outliers  # Frames whose OCR was rejected.
+        self.rate = rate  # Robust seconds-per-frame estimate across the whole video.
+        self.nominal = nominal  # Seconds per frame at the container's frame rate.
+        self.total_frames = total_frames
+        self.firsts = [r.first for r in runs]
+
+    @classmethod
+    def fit(cls, frames, secs, total_frames, fps):
+        nominal = 1 / (fps if fps > 0 else 25)
+        samples = sorted(dict(zip(frames, secs)).items())
+        if not samples:
+            return cls([], [], [], nominal, nominal, total_frames)
+        readings = dict(samples)
+        samples = [(f, s + 0.5) for f, s in samples]
+        rate = robust_rate(samples, nominal)
+        inliers, outliers = reject_outliers(samples, rate)
+        groups = [[inliers[0]]]
+        for prev, cur in zip(inliers, inliers[1:]):
+            if abs((cur[1] - prev[1]) - (cur[0] - prev[0]) * rate) > GAP_SECS:
+                groups.append([])
+            groups[-1].append(cur)
+        runs = []
+        for g in groups:
+            frames = [f for f, _ in g]
+            secs, weights = second_changes(frames, [readings[f] for f in frames], rate)
+            runs.append(fit_run(frames, secs, rate, weights, [readings[f] for f in frames]))
+        gaps = [Gap(a.last, b.first, a.at(b.first), b.at(b.first)) for a, b in zip(runs, runs[1:])]
+        return cls(runs, gaps, outliers, rate, nominal, total_frames)
+
+    def __bool__(self):
+        return bool(self.runs)
+
+    def run_index(self, frame_idx):
+        return max(0, bisect.bisect_right(self.firsts, frame_idx) - 1)
+
+    def frame_to_secs(self, frame_idx):
+        if not self.runs:
+            return None
+        return self.runs[self.run_index(frame_idx)].at(frame_idx)
+
+    def frame_error(self, frame_idx):
+        """
+        Expected error (seconds, one standard deviation) of the clock at frame_idx. Inside
+        a gap that has not been localized, the frame may belong to either side, so the
+        error is at least the size of the jump.
+        """
+        if not self.runs:
+            return None
+        err = self.runs[self.run_index(frame_idx)].error(frame_idx)
+        for gap in self.gaps:
+            if gap.frame_before < frame_idx < gap.frame_after:
+                err = max(err, abs(gap.jump))
+        return err
+
+    def locate(self, secs):
+        """
+        (frame, expected error in seconds, gap or None) for the clock reading secs.
+        A time inside a recording gap maps to the first frame after the gap, and that
+        Gap is returned. Times before or after the recording clamp to its ends. The frame
+        shown at a time started up to one frame earlier; the error includes that.
+        """
+        if not self.runs:
+            return None, None, None
+        last = max(0, self.total_frames - 1)
+        for i, run in enumerate(self.runs):
+            lo = 0 if i == 0 else run.first
+            hi = self.runs[i + 1].first if i + 1 < len(self.runs) else self.total_frames
+            if secs < run.at(lo):
+                if i == 0:
+                    return 0, run.error(0), None
+                return lo, self.frame_error(lo), self.gaps[i - 1]
+            fidx = run.frame_at(secs, lo, hi)
+            if fidx is not None:
+                fidx = int(max(0, min(last, fidx)))
+                return fidx, math.hypot(self.frame_error(fidx), run.mean_slope() / math.sqrt(3)), None
+        return last, self.frame_error(last), None
+
+    def refinement_frames(self, tried, interval_frames):
+        """
+        Frames whose OCR would reduce the model's uncertainty (frames in `tried` excluded):
+        - the midpoint of every gap not yet localized to one frame (bisection);
+        - the midpoint of holes in the sampling (rejected or unreadable samples) wider
+          than 1.5 sampling intervals;
+        - a frame next to every rejected sample without an accepted sample close by
+          (a misread is then outvoted, a short genuine segment gains samples);
+        - midpoints inside runs with fewer than MIN_PIECE_SAMPLES samples;
+        - bisection towards the second change near each end of every run
+          (Run.second_change_spans), which removes the rounding error;
+        - midpoints of the sampling intervals on both sides of every knot, until they
+          are a quarter interval wide, so drift changes are pinned down more closely.
+        """
+        spans = []
+        for gap in self.gaps:
+            if not gap.localized():
+                spans.append((gap.frame_before, gap.frame_after))
+        for run in self.runs:
+            if run.n < MIN_PIECE_SAMPLES and run.last > run.first:
+                spans.append((run.first, run.last))
+            spans.extend(run.second_change_spans())
+            for k in run.knots:
+                i = run.frames.index(k)
+                for a, b in ((run.frames[i - 1], k), (k, run.frames[i + 1])):
+                    if b - a > interval_frames // 4:
+                        spans.append((a, b))
+        hole = max(2, int(1.5 * interval_frames))
+        sampled = [f for run in self.runs for f in run.frames]
+        for a, b in zip([-1] + sampled, sampled + [self.total_frames]):
+            if b - a > hole:
+                spans.append((a, b))
+        # A rejected sample is settled once an accepted one lies close to it.
+        near = max(1, interval_frames // 8)
+        for f in self.outliers:
+            i = bisect.bisect_left(sampled, f)
+            if any(abs(sampled[j] - f) <= near for j in (i - 1, i) if 0 <= j < len(sampled)):
+                continue
+            lo = sampled[i - 1] if i > 0 else -1
+            hi = sampled[i] if i < len(sampled) else self.total_frames
+            spans.append((max(lo, f - interval_frames), min(hi, f + interval_frames)))
+        frames = set()
+        for lo, hi in spans:
+            fidx = untried_near((lo + hi) // 2, lo, hi, tried)
+            if fidx is not None:
+                frames.add(fidx)
+        return sorted(frames)
+
+    def describe(self):
+        """
+        One-line summary for logs: gaps, drift changes, rejected samples and mean drift.
+        """
+        if not self.runs:
+            return "no samples"
+        slope = sum(r.mean_slope() * r.n for r in self.runs) / sum(r.n for r in self.runs)
+        drift = slope / self.nominal - 1
+        knots = sum(len(r.knots) for r in self.runs)
+        jumps = ", ".join(f"{g.jump:+.0f}s@{g.frame_after}" for g in self.gaps)
+        return (f"{len(self.gaps)} gap(s)" + (f" [{jumps}]" if jumps else "") +
+                f", {knots} drift change(s), {len(self.outliers)} OCR outlier(s) rejected, "
+                f"clock drift {drift * 100:+.2f}%")
+
+
+def robust_rate(samples, nominal):
+    """
+    Median seconds-per-frame over sample pairs about five seconds apart, so that dense
+    refinement samples (where whole-second OCR says nothing about the rate) and the few
+    pairs straddling a gap do not bias it. Falls back to the nominal rate.
+    """
+    base = 5 / nominal
+    rates = []
+    j = 0
+    for i, (f0, s0) in enumerate(samples):
+        j = max(j, i + 1)
+        while j < len(samples) and samples[j][0] - f0 < base:
+            j += 1
+        if j == len(samples):
+            break
+        f1, s1 = samples[j]
+        rates.append((s1 - s0) / (f1 - f0))
+    if not rates:
+        return nominal
+    rate = statistics.median(rates)
+    return rate if nominal / 2 <= rate <= nominal * 2 else nominal
+
+def reject_outliers(samples, rate):
+    """
+    Splits samples into (inliers, outlier frames) by the running median of the clock offset.
+    A median window keeps gap steps intact while removing isolated misreads.
+    """
+    offsets = [s - f * rate for f, s in samples]
+    k = OUTLIER_WINDOW // 2
+    inliers, outliers = [], []
+    for i, (f, s) in enumerate(samples):
+        med = statistics.median(offsets[max(0, i - k):i + k + 1])
+        if abs(offsets[i] - med) > OUTLIER_SECS:
+            outliers.append(f)
+        else:
+            inliers.append((f, s))
+    if not inliers:
+        return list(samples), []
+    return inliers, outliers
+
+def second_changes(frames, readings, rate):
+    """
+    Fit values and weights of a run's samples. Two adjacent frames reading consecutive
+    seconds bracket a second change: the clock is within half a frame of it on both, so
+    they are fitted there, weighted by how much more exact that is than a plain reading
+    (fitted at s + 0.5, weight 1).
+    """
+    secs = [r + 0.5 for r in readings]
+    weights = [1.0] * len(frames)
+    exact = (QUANT_SECS / (rate / math.sqrt(12))) ** 2
+    for i in range(len(frames) - 1):
+        if frames[i + 1] - frames[i] == 1 and readings[i + 1] - readings[i] == 1:
+            secs[i] = readings[i + 1] - rate / 2
+            secs[i + 1] = readings[i + 1] + rate / 2
+            weights[i] = weights[i + 1] = exact
+    return secs, weights
+
+def fit_hinges(frames, secs, knots, weights=None):
+    """
+    Weighted least squares of secs on [1, x, (x - knot)+ ...]; returns
+    (coef, weighted sse, (X'WX)^-1), or (None, 0, None) when the frames do not determine
+    a slope.
+    """
+    if len(set(frames)) < 2:
+        return None, 0.0, None
+    first = frames[0]
+    x = (np.asarray(frames, dtype=np.float64) - first) / FRAME_SCALE
+    cols = [np.ones_like(x), x] + [np.maximum(0.0, x - (k - first) / FRAME_SCALE) for k in knots]
+    X = np.stack(cols, axis=1)
+    y = np.asarray(secs, dtype=np.float64)
+    w = np.ones_like(y) if weights is None else np.asarray(weights, dtype=np.float64)
+    sw = np.sqrt(w)
+    coef, *_ = np.linalg.lstsq(X * sw[:, None], y * sw, rcond=None)
+    r = y - X @ coef
+    return coef, float(w @ (r * r)), np.linalg.pinv(X.T @ (X * w[:, None]))
+
+def fit_run(frames, secs, rate, weights=None, readings=None):
+    """
+    Gap-free samples -> Run. Knots are added greedily at the sample frame that lowers the
+    squared error most, while the gain exceeds KNOT_CHI2 quantization variances.
+    """
+    knots = []
+    _, sse, _ = fit_hinges(frames, secs, knots, weights)
+
+    def try_knots(indices, best):
+        for i in indices:
+            cand = fit_hinges(frames, secs, knots + [frames[i]], weights)[1]
+            if best is None or cand < best[0]:
+                best = (cand, i)
+        return best
+
+    while True:
+        bounds = [0] + sorted(frames.index(k) for k in knots) + [len(frames) - 1]
+        best = None
+        for lo, hi in zip(bounds, bounds[1:]):
+            lo, hi = lo + MIN_PIECE_SAMPLES, hi - MIN_PIECE_SAMPLES
+            if lo > hi:
+                continue
+            # Coarse pass over at most ~KNOT_CANDIDATES positions, then the neighbourhood
+            # of the best one, to keep long videos (thousands of samples) fast.
+            step = max(1, (hi - lo) // KNOT_CANDIDATES)
+            seg_best = try_knots(range(lo, hi + 1, step), None)
+            i = seg_best[1]
+            seg_best = try_knots(range(max(lo, i - step + 1), min(hi, i + step - 1) + 1), seg_best)
+            if best is None or seg_best[0] < best[0]:
+                best = seg_best
+        if best is None or sse - best[0] <= KNOT_CHI2 * QUANT_SECS ** 2:
+            return Run(frames, secs, rate, knots, weights, readings)
+        sse = best[0]
+        knots.append(frames[best[1]])
+
+def untried_near(frame_idx, lo, hi, tried):
+    """
+    The untried frame strictly between lo and hi that is closest to frame_idx, or None.
+    """
+    for d in range(hi - lo):
+        for f in (frame_idx + d, frame_idx - d):
+            if lo < f < hi and f not in tried:
+                return f
+    return None
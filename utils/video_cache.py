@@ -0,0 +1,59 @@
+# utils/video_cache.py
+
+"""
+On-disk cache for per-video metadata (OCR index, keyframes, thumbnails, ...).
+
+Entries are keyed by the video's absolute path, size and mtime, so a file that is
+replaced or modified is re-analyzed automatically. They live in a per-user cache directory
+(MULTICAM_CACHE_DIR overrides it), whatever directory the program is started from.
+"""
+
+import hashlib
+import json
+import os
+import sys
+
+def user_cache_dir():
+    """
+    Per-user cache directory of the platform, e.g. ~/.cache/multicam-sync on Linux.
+    """
+    override = os.environ.get("MULTICAM_CACHE_DIR")
+    if override:
+        return os.path.abspath(os.path.expanduser(override))
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser(r"~\AppData\Local")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "multicam-sync")
+
+CACHE_DIR = user_cache_dir()
+
+def video_key(video_path):
+    st = os.stat(video_path)
+    ident = f"{os.path.abspath(video_path)}|{st.st_size}|{int(st.st_mtime_ns)}"
+    return hashlib.sha1(ident.encode("utf-8")).hexdigest()[:16]
+
+def cache_path(video_path, kind, ext="json"):
+    """
+    Path of the cache entry `kind` for video_path, e.g. "~/.cache/multicam-sync/cam1_ab12....ocr.json".
+    """
+    stem = os.path.splitext(os.path.basename(video_path))[0]
+    return os.path.join(CACHE_DIR, f"{stem}_{video_key(video_path)}.{kind}.{ext}")
+
+def load_json(video_path, kind):
+    try:
+        with open(cache_path(video_path, kind), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_json(video_path, kind, data):
+    path = cache_path(video_path, kind)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+    return path
@@ -0,0 +1,87 @@
+# utils/video_reader.py
+
+import time
+import cv2
+
+# Forward gaps up to this many frames are skipped with grab() instead of a seek.
+SEQUENTIAL_GRAB_LIMIT = 12
+# OpenCV's FFmpeg backend seeks to the keyframe before (target - this many frames) and
+# decodes forward to the target, so the cheapest frames to seek to lie this far after a
+# keyframe (one keyframe plus this many frames decoded).
+SEEK_BACKOFF_FRAMES = 16
+# Limit for batch extraction, where decoding forward through a GOP is cheaper than
+# seeking back to its keyframe for every requested frame.
+FORWARD_DECODE_LIMIT = 300
+
+class SequentialReader:
+    """
+    Wraps a cv2.VideoCapture and remembers its position, so that reading the next frame
+    (or a frame up to grab_limit ahead) never triggers a seek. Skipped frames are only
+    grabbed, not retrieved (no color conversion).
+
+    With a utils.keyframe_index.KeyframeIndex, forward gaps that do not cross the target's
+    keyframe are always grabbed (a seek would decode at least as many frames), and every
+    seek is verified against the scanned presentation timestamp of the target. If the
+    backend landed on the wrong frame, the reader seeks to the preceding keyframe and
+    decodes forward, so a seek never decodes more than one GOP beyond the backend's own
+    seek. Seek counts and latencies are kept for reporting (seek_stats).
+    """
+    def __init__(self, cap, grab_limit=SEQUENTIAL_GRAB_LIMIT, keyframes=None):
+        self.cap = cap
+        self.grab_limit = grab_limit
+        self.keyframes = keyframes
+        self.pos = 0  # Index of the frame the next cap.read() will return.
+        self.seeks = 0
+        self.seek_secs_total = 0.0
+        self.seek_secs_max = 0.0
+        self.seek_frames_max = 0  # Most frames grabbed forward after a keyframe seek.
+        self.inexact_seeks = 0  # Backend seeks that landed on the wrong frame.
+
+    def read(self, frame_idx):
+        gap = frame_idx - self.pos
+        keyframe = None
+        if self.keyframes is not None and self.keyframes.has_keyframes():
+            keyframe = self.keyframes.keyframe_before(frame_idx)
+        if self.pos < 0 or gap < 0 or (gap > self.grab_limit and (keyframe is None or keyframe > self.pos)):
+            frame = self._seek_read(frame_idx, keyframe)
+        else:
+            for _ in range(gap):
+                if not self.cap.grab():
+                    break
+            ret, frame = self.cap.read()
+        if frame is None:
+            # Position is unknown after a failed read; force a seek next time.
+            self.pos = -1
+            return None
+        self.pos = frame_idx + 1
+        return frame
+
+    def _seek_read(self, frame_idx, keyframe):
+        t0 = time.perf_counter()
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+        ret, frame = self.cap.read()
+        distance = 0
+        expected = self.keyframes.frame_msec(frame_idx) if keyframe is not None else None
+        if ret and expected is not None and abs(self.cap.get(cv2.CAP_PROP_POS_MSEC) - expected) > 0.5:
+            # Inexact backend seek: restart at the keyframe and decode a known distance.
+            self.inexact_seeks += 1
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, keyframe)
+            distance = frame_idx - keyframe
+            for _ in range(distance):
+                if not self.cap.grab():
+                    break
+            ret, frame = self.cap.read()
+        secs = time.perf_counter() - t0
+        self.seeks += 1
+        self.seek_secs_total += secs
+        self.seek_secs_max = max(self.seek_secs_max, secs)
+        self.seek_frames_max = max(self.seek_frames_max, distance)
+        return frame if ret else None
+
+    def seek_stats(self):
+        """
+        {"seeks", "inexact", "mean_ms", "max_ms", "max_frames"} of the seeks done so far.
+        """
+        mean = self.seek_secs_total / self.seeks if self.seeks else 0.0
+        return {"seeks": self.seeks, "inexact": self.inexact_seeks, "mean_ms": mean * 1000,
+                "max_ms": self.seek_secs_max * 1000, "max_frames": self.seek_frames_max}